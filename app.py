@@ -1,16 +1,17 @@
+import json
+import time
+import uuid
+import numpy as np
 import streamlit as st
-import requests
 from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
+from itertools import product
+
+import engine
+from engine import CENTRAL, SCANS, book_map, market_labels, normalize_config, run_batch, sports_map
 
 # --- PAGE CONFIG ---
 st.set_page_config(page_title="Promo Converter", layout="wide")
 
-# --- CONSTANTS ---
-CENTRAL      = ZoneInfo("America/Chicago")
-CONV_NOSWEAT = 0.65
-CONV_BETGET  = 0.65
-
 st.markdown("""
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&family=Roboto+Mono&display=swap');
@@ -81,498 +82,235 @@ st.markdown("""
 # --- UTILS ---
 API_KEY = st.secrets.get("ODDS_API_KEY", "")
 
-def get_multiplier(american_odds):
-    return (american_odds / 100) if american_odds > 0 else (100 / abs(american_odds))
 
-book_map = {
-    "DraftKings":      "draftkings",
-    "FanDuel":         "fanduel",
-    "theScore / ESPN": "espnbet",
-    "BetMGM":          "betmgm"
-}
-
-sports_map = {
-    "WNBA":           "basketball_wnba",
-    "MLB":            "baseball_mlb",
-    "FIFA World Cup": "soccer_fifa_world_cup"
+# --- CACHED API FETCHING ---
+# Odds live in a SQLite file so every replica and restart shares them; the
+# scheduler decides per sport when a cached payload is too old to reuse.
+CACHE_PATH    = st.secrets.get("ODDS_CACHE_PATH", ".cache/odds.sqlite")
+HOURLY_BUDGET = st.secrets.get("ODDS_HOURLY_BUDGET", engine.scheduler.HOURLY_BUDGET)
+
+# Odds are requested for these bookmaker keys only; set ODDS_BOOKMAKERS to an
+# empty list to pull every book in the US regions (billed per region). The
+# engines hedge at whatever books come back.
+BOOKMAKERS = st.secrets.get("ODDS_BOOKMAKERS", list(book_map.values())) or None
+
+# ODDS_REPLAY_DIR serves a recorded capture instead of the API, bypassing the
+# cache and scheduler; ODDS_RECORD_DIR saves every live response for later replay.
+REPLAY_DIR = st.secrets.get("ODDS_REPLAY_DIR")
+RECORD_DIR = st.secrets.get("ODDS_RECORD_DIR")
+
+# Every live pull is also appended to a price history for line movement and
+# backtests; set ODDS_HISTORY_PATH to "" to turn it off.
+HISTORY_PATH = st.secrets.get("ODDS_HISTORY_PATH", ".cache/history.sqlite")
+
+# Scans keep only their best RESULT_LIMIT opportunities; the renderers page
+# through them without re-running the scan.
+RESULT_LIMIT = 150
+
+# Shown stakes are rounded to what the books accept; "Exact" shows the raw hedge.
+STAKE_ROUNDING = {"$1": 1.0, "$0.50": 0.5, "Exact": None}
+
+# Boost and soccer results can be re-ranked by a fill simulation (engine.simulate_risk).
+RISK_RANKING = {"Nominal profit": None, "Expected profit": "expected", "Worst case (5th pct)": "worst"}
+
+SWEEP_LABELS = {
+    "boost_val": "Boost %", "wager": "Wager $", "wager1": "Bet 1 Stake $",
+    "cap1_val": "Bet 1 Cap $", "cap2_val": "Bet 2 Cap $", "cap3_val": "Bet 3 Cap $",
 }
 
+@st.cache_resource
+def get_odds_cache():
+    return engine.SQLiteSnapshotCache(CACHE_PATH, ttl=engine.STALE_TTL)
+
+@st.cache_resource
+def get_odds_source():
+    if REPLAY_DIR:
+        return engine.OddsReplay(REPLAY_DIR).fetch
+    if RECORD_DIR:
+        return engine.OddsRecorder(RECORD_DIR, request_odds).fetch
+    return None
+
+# Scan results are memoized per config and odds content, shared by every
+# session; resubmitting a form over unchanged odds skips the engines.
+@st.cache_resource
+def get_result_cache():
+    return engine.ResultCache()
+
+@st.cache_resource
+def get_history():
+    return engine.OddsHistory(HISTORY_PATH) if HISTORY_PATH else None
+
+# Single games are re-fetched from the live event endpoint; while recording,
+# whole sports are re-fetched instead so the capture stays complete.
+@st.cache_resource
+def get_scheduler():
+    history     = get_history()
+    fetch       = history.wrap(fetch_odds) if history else fetch_odds
+    fetch_event = None
+    if get_odds_source() is None:
+        fetch_event = history.wrap_event(fetch_event_odds) if history else fetch_event_odds
+    return engine.FetchScheduler(fetch, get_odds_cache(), hourly_budget=HOURLY_BUDGET,
+                                 cost=lambda market: engine.request_cost(market, BOOKMAKERS),
+                                 fetch_event=fetch_event)
+
+def request_odds(sport_key, market='h2h'):
+    return engine.request_odds(sport_key, API_KEY, market, bookmakers=BOOKMAKERS)
 
-# --- CACHED API FETCHING ---
-@st.cache_data(ttl=300)
 def fetch_odds(sport_key, market='h2h'):
-    url = f"https://api.the-odds-api.com/v4/sports/{sport_key}/odds/"
-    params = {
-        'apiKey':     API_KEY,
-        'regions':    'us,us2',
-        'markets':    market,
-        'oddsFormat': 'american'
-    }
-    try:
-        res = requests.get(url, params=params, timeout=10)
-        if res.status_code == 200:
-            return res.json(), res.headers.get('x-requests-remaining', "0")
-        return None, "Error"
-    except requests.exceptions.RequestException:
-        return None, "Error"
-
-
-# --- FLAT ODDS HELPERS ---
-
-def _get_market(bm, market_key):
-    return next((m for m in bm['markets'] if m['key'] == market_key), None)
-
-def build_flat_odds_h2h(game, allowed_keys):
-    """All h2h outcomes as-is — works for both 2-way and 3-way."""
-    flat = []
-    for bm in game['bookmakers']:
-        if bm['key'] not in allowed_keys:
-            continue
-        market = _get_market(bm, 'h2h')
-        if not market:
-            continue
-        for o in market['outcomes']:
-            flat.append({
-                'book_key':   bm['key'],
-                'book_title': bm['title'],
-                'team':       o['name'],
-                'price':      o['price']
-            })
-    return flat
-
-def build_flat_odds_3way(game, allowed_keys):
-    """Only bookmakers offering exactly 3 h2h outcomes (Match Result with Draw)."""
-    flat = []
-    for bm in game['bookmakers']:
-        if bm['key'] not in allowed_keys:
-            continue
-        market = _get_market(bm, 'h2h')
-        if not market or len(market['outcomes']) != 3:
-            continue
-        for o in market['outcomes']:
-            flat.append({
-                'book_key':   bm['key'],
-                'book_title': bm['title'],
-                'team':       o['name'],
-                'price':      o['price']
-            })
-    return flat
-
-
-# ================================================================
-# MAIN BOOST ENGINE
-# ================================================================
-def run_promo_scan(p):
-    if not p['hedge_books']:
-        allowed_hedge_keys = [v for k, v in book_map.items() if v != book_map[p['book']]]
-    else:
-        allowed_hedge_keys = [book_map[b] for b in p['hedge_books'] if book_map[b] != book_map[p['book']]]
-
-    source_book_key = book_map[p['book']]
-    allowed_keys    = [source_book_key] + allowed_hedge_keys
-
-    today_date = datetime.now(CENTRAL).date()
-    all_opps   = []
-
-    with st.status("Running scan...", expanded=False) as status:
-        for sport_label in p['sports']:
-            sport_key = sports_map[sport_label]
-            games, remaining = fetch_odds(sport_key, market='h2h')
-
-            if not games:
-                st.error(f"Could not fetch data for {sport_label}")
-                continue
-
-            st.session_state.api_quota = remaining
-
-            for game in games:
-                commence_time   = datetime.fromisoformat(game['commence_time'].replace('Z', '+00:00'))
-                game_date_local = commence_time.astimezone(CENTRAL).date()
-
-                if not (today_date <= game_date_local <= today_date + timedelta(days=3)):
-                    continue
-
-                flat_odds = build_flat_odds_h2h(game, allowed_keys)
-                if not flat_odds:
-                    continue
-
-                game_label      = f"{game.get('away_team', 'Away')} vs {game.get('home_team', 'Home')}"
-                game_time       = commence_time.astimezone(CENTRAL).strftime("%m/%d %I:%M %p")
-                unique_outcomes = list(set(o['team'] for o in flat_odds))
-
-                # --- 2-WAY BRANCH ---
-                if len(unique_outcomes) == 2:
-                    source_odds = [o for o in flat_odds if o['book_key'] == source_book_key]
-                    hedge_odds  = [o for o in flat_odds if o['book_key'] in allowed_hedge_keys]
-
-                    for s in source_odds:
-                        hedge_teams = [t for t in unique_outcomes if t != s['team']]
-                        if not hedge_teams: continue
-                        opp_team = hedge_teams[0]
-                        eligible = [h for h in hedge_odds if h['team'] == opp_team]
-                        if not eligible: continue
-                        best_h = max(eligible, key=lambda x: x['price'])
-                        sm = get_multiplier(s['price'])
-                        hm = get_multiplier(best_h['price'])
-
-                        if p['strat'] == "Profit Boost (%)":
-                            sm_eff        = sm * (1 + p['boost_val'] / 100)
-                            target_payout = p['wager'] * (1 + sm_eff)
-                            raw_h         = target_payout / (1 + hm)
-                            exact_profit  = target_payout - p['wager'] - raw_h
-                        elif p['strat'] == "Bonus Bet":
-                            target_payout = p['wager'] * sm
-                            raw_h         = target_payout / (1 + hm)
-                            exact_profit  = target_payout - raw_h
-                        else:
-                            target_payout = p['wager'] * (1 + sm)
-                            raw_h         = (target_payout - p['wager'] * CONV_NOSWEAT) / (1 + hm)
-                            exact_profit  = target_payout - p['wager'] - raw_h
-
-                        if exact_profit > -10.0:
-                            all_opps.append({
-                                "game": game_label, "sport": sport_label,
-                                "market_type": "2-way", "market_label": "Match Result",
-                                "time": game_time, "exact_profit": exact_profit,
-                                "exact_hedge": raw_h, "s_team": s['team'],
-                                "s_book": s['book_title'], "s_price": s['price'],
-                                "h_book": best_h['book_title'], "h_team": best_h['team'],
-                                "h_price": best_h['price'], "wager": p['wager'],
-                                "strat": p['strat'],
-                                "used_boost": p['boost_val'] if p['strat'] == "Profit Boost (%)" else 0
-                            })
-
-                # --- 3-WAY BRANCH ---
-                elif len(unique_outcomes) == 3:
-                    outcome_groups = {
-                        team: [o for o in flat_odds if o['team'] == team]
-                        for team in unique_outcomes
-                    }
-                    outcome_list = list(outcome_groups.items())
-
-                    for i, (_, odds_t1) in enumerate(outcome_list):
-                        for j, (_, odds_t2) in enumerate(outcome_list):
-                            if j == i: continue
-                            for k, (_, odds_t3) in enumerate(outcome_list):
-                                if k == i or k == j: continue
-                                for o1 in odds_t1:
-                                    for o2 in odds_t2:
-                                        for o3 in odds_t3:
-                                            books_used = [o1['book_key'], o2['book_key'], o3['book_key']]
-                                            if len(set(books_used)) != 3: continue
-                                            if source_book_key not in books_used: continue
-
-                                            all_legs = [o1, o2, o3]
-                                            src_idx  = next(n for n, o in enumerate(all_legs) if o['book_key'] == source_book_key)
-                                            src_o    = all_legs[src_idx]
-                                            hedge_os = [o for n, o in enumerate(all_legs) if n != src_idx]
-                                            ho1, ho2 = hedge_os[0], hedge_os[1]
-
-                                            sm  = get_multiplier(src_o['price'])
-                                            hm1 = get_multiplier(ho1['price'])
-                                            hm2 = get_multiplier(ho2['price'])
-
-                                            if p['strat'] == "Profit Boost (%)":
-                                                sm_eff       = sm * (1 + p['boost_val'] / 100)
-                                                target_pay   = p['wager'] * (1 + sm_eff)
-                                                h1_stake     = target_pay / (1 + hm1)
-                                                h2_stake     = target_pay / (1 + hm2)
-                                                exact_profit = target_pay - p['wager'] - h1_stake - h2_stake
-                                            elif p['strat'] == "Bonus Bet":
-                                                target_pay   = p['wager'] * sm
-                                                h1_stake     = target_pay / (1 + hm1)
-                                                h2_stake     = target_pay / (1 + hm2)
-                                                exact_profit = target_pay - h1_stake - h2_stake
-                                            else:
-                                                target_pay   = p['wager'] * (1 + sm)
-                                                h1_stake     = (target_pay - p['wager'] * CONV_NOSWEAT) / (1 + hm1)
-                                                h2_stake     = (target_pay - p['wager'] * CONV_NOSWEAT) / (1 + hm2)
-                                                exact_profit = target_pay - p['wager'] - h1_stake - h2_stake
-
-                                            if exact_profit > -10.0:
-                                                all_opps.append({
-                                                    "game": game_label, "sport": sport_label,
-                                                    "market_type": "3-way", "market_label": "Match Result",
-                                                    "time": game_time, "exact_profit": exact_profit,
-                                                    "wager": p['wager'], "strat": p['strat'],
-                                                    "s_team": src_o['team'], "s_book": src_o['book_title'],
-                                                    "s_price": src_o['price'], "exact_w1": p['wager'],
-                                                    "h1_book": ho1['book_title'], "h1_team": ho1['team'],
-                                                    "h1_price": ho1['price'], "exact_hedge1": h1_stake,
-                                                    "h2_book": ho2['book_title'], "h2_team": ho2['team'],
-                                                    "h2_price": ho2['price'], "exact_hedge2": h2_stake,
-                                                    "used_boost": p['boost_val'] if p['strat'] == "Profit Boost (%)" else 0
-                                                })
-
-        status.update(label="Scan complete.", state="complete")
-
-    # Deduplicate
-    seen = {}
-    for op in all_opps:
-        if op['market_type'] == '3-way':
-            key = (op['game'], op['s_book'], frozenset([op['s_book'], op['h1_book'], op['h2_book']]))
-        else:
-            key = (op['game'], op['s_book'], op['h_book'])
-        if key not in seen or op['exact_profit'] > seen[key]['exact_profit']:
-            seen[key] = op
-    return list(seen.values())
-
-
-# ================================================================
-# 3-WAY SOCCER ENGINE
-# ================================================================
-def run_multi_book_soccer_scan(sc):
-    book1_key  = book_map[sc['book1']]
-    book2_keys = [book_map[b] for b in sc['book2']] if sc['book2'] else list(book_map.values())
-    book3_keys = [book_map[b] for b in sc['book3']] if sc['book3'] else list(book_map.values())
-    allowed_keys = list(book_map.values())
-
-    today_date = datetime.now(CENTRAL).date()
-    end_date   = sc['lookahead_end_date']
-
-    soccer_opps = []
-
-    with st.status("Running scan...", expanded=False) as status:
-        for league_label in sc['leagues']:
-            sport_key = sports_map[league_label]
-            games, remaining = fetch_odds(sport_key, market='h2h')
-            if not games:
-                continue
-
-            st.session_state.api_quota = remaining
-
-            for game in games:
-                commence_time   = datetime.fromisoformat(game['commence_time'].replace('Z', '+00:00'))
-                game_date_local = commence_time.astimezone(CENTRAL).date()
-
-                if not (today_date <= game_date_local <= end_date):
-                    continue
-
-                flat_odds = build_flat_odds_3way(game, allowed_keys)
-                if not flat_odds:
-                    continue
-
-                unique_outcomes = list(set(o['team'] for o in flat_odds))
-                if len(unique_outcomes) != 3:
-                    continue
-
-                t1, t2, draw = unique_outcomes[0], unique_outcomes[1], unique_outcomes[2]
-                odds_t1   = [o for o in flat_odds if o['team'] == t1]
-                odds_t2   = [o for o in flat_odds if o['team'] == t2]
-                odds_draw = [o for o in flat_odds if o['team'] == draw]
-
-                for o1 in odds_t1:
-                    for o2 in odds_t2:
-                        for o3 in odds_draw:
-                            if o1['book_key'] == o2['book_key'] or \
-                               o1['book_key'] == o3['book_key'] or \
-                               o2['book_key'] == o3['book_key']:
-                                continue
-                            if o1['book_key'] != book1_key:      continue
-                            if o2['book_key'] not in book2_keys: continue
-                            if o3['book_key'] not in book3_keys: continue
-
-                            def leg_payout(w_total, strat, boost_pct, m_raw, cap_val):
-                                m_boosted = m_raw * (1 + boost_pct / 100) if strat == "Profit Boost (%)" else m_raw
-                                if strat != "Straight Cash" and cap_val > 0 and w_total > cap_val:
-                                    w_promo = cap_val
-                                    w_cash  = w_total - cap_val
-                                else:
-                                    w_promo = w_total if strat != "Straight Cash" else 0.0
-                                    w_cash  = 0.0    if strat != "Straight Cash" else w_total
-                                if strat == "Bonus Bet":
-                                    raw_pay = (w_promo * m_boosted) + (w_cash * (1 + m_raw))
-                                    outlay  = w_cash
-                                elif strat == "No-Sweat Bet":
-                                    raw_pay = (w_promo * (1 + m_raw)) + (w_cash * (1 + m_raw))
-                                    outlay  = w_total
-                                else:
-                                    raw_pay = (w_promo * (1 + m_boosted)) + (w_cash * (1 + m_raw))
-                                    outlay  = w_total
-                                return raw_pay, outlay, w_promo, w_cash
-
-                            m1_raw = get_multiplier(o1['price'])
-                            target_pay, outlay1, w1_promo, w1_cash = leg_payout(
-                                sc['wager1'], sc['strat1'], sc['boost1'], m1_raw, sc['cap1_val']
-                            )
-                            w1_total = sc['wager1']
-
-                            m2_raw     = get_multiplier(o2['price'])
-                            m2_boosted = m2_raw * (1 + sc['boost2'] / 100) if sc['strat2'] == "Profit Boost (%)" else m2_raw
-                            div_promo2 = m2_boosted if sc['strat2'] == "Bonus Bet" else (1 + m2_boosted)
-                            div_cash2  = 1 + m2_raw
-
-                            if sc['strat2'] != "Straight Cash" and sc['cap2_val'] > 0:
-                                max_promo_pay2 = sc['cap2_val'] * div_promo2
-                                if target_pay > max_promo_pay2:
-                                    w2_promo = sc['cap2_val']
-                                    w2_cash  = (target_pay - max_promo_pay2) / div_cash2
-                                else:
-                                    w2_promo = target_pay / div_promo2
-                                    w2_cash  = 0.0
-                            elif sc['strat2'] == "Straight Cash":
-                                w2_promo, w2_cash = 0.0, target_pay / div_cash2
-                            else:
-                                w2_promo, w2_cash = target_pay / div_promo2, 0.0
-
-                            w2_total = w2_promo + w2_cash
-                            outlay2  = w2_cash if sc['strat2'] == "Bonus Bet" else w2_total
-
-                            m3_raw     = get_multiplier(o3['price'])
-                            m3_boosted = m3_raw * (1 + sc['boost3'] / 100) if sc['strat3'] == "Profit Boost (%)" else m3_raw
-                            div_promo3 = m3_boosted if sc['strat3'] == "Bonus Bet" else (1 + m3_boosted)
-                            div_cash3  = 1 + m3_raw
-
-                            if sc['strat3'] != "Straight Cash" and sc['cap3_val'] > 0:
-                                max_promo_pay3 = sc['cap3_val'] * div_promo3
-                                if target_pay > max_promo_pay3:
-                                    w3_promo = sc['cap3_val']
-                                    w3_cash  = (target_pay - max_promo_pay3) / div_cash3
-                                else:
-                                    w3_promo = target_pay / div_promo3
-                                    w3_cash  = 0.0
-                            elif sc['strat3'] == "Straight Cash":
-                                w3_promo, w3_cash = 0.0, target_pay / div_cash3
-                            else:
-                                w3_promo, w3_cash = target_pay / div_promo3, 0.0
-
-                            w3_total = w3_promo + w3_cash
-                            outlay3  = w3_cash if sc['strat3'] == "Bonus Bet" else w3_total
-
-                            net_profit = target_pay - (outlay1 + outlay2 + outlay3)
-
-                            soccer_opps.append({
-                                "game":     f"{game.get('away_team')} vs {game.get('home_team')}",
-                                "time":     commence_time.astimezone(CENTRAL).strftime("%m/%d %I:%M %p"),
-                                "net_profit": net_profit,
-                                "o1_book":  o1['book_title'], "o1_team": o1['team'], "o1_price": o1['price'],
-                                "o1_wager": w1_total, "o1_promo": w1_promo, "o1_cash": w1_cash,
-                                "o1_strat": sc['strat1'], "o1_boost": sc['boost1'] if sc['strat1'] == "Profit Boost (%)" else 0,
-                                "o2_book":  o2['book_title'], "o2_team": o2['team'], "o2_price": o2['price'],
-                                "o2_wager": w2_total, "o2_promo": w2_promo, "o2_cash": w2_cash,
-                                "o2_strat": sc['strat2'], "o2_boost": sc['boost2'] if sc['strat2'] == "Profit Boost (%)" else 0,
-                                "o3_book":  o3['book_title'], "o3_team": o3['team'], "o3_price": o3['price'],
-                                "o3_wager": w3_total, "o3_promo": w3_promo, "o3_cash": w3_cash,
-                                "o3_strat": sc['strat3'], "o3_boost": sc['boost3'] if sc['strat3'] == "Profit Boost (%)" else 0,
-                            })
-
-        status.update(label="Scan complete.", state="complete")
-
-    seen = {}
-    for op in soccer_opps:
-        key = (op['game'], frozenset([op['o1_book'], op['o2_book'], op['o3_book']]))
-        if key not in seen or op['net_profit'] > seen[key]['net_profit']:
-            seen[key] = op
-    return list(seen.values())
-
+    source = get_odds_source()
+    if source is not None:
+        return source(sport_key, market)
+    return engine.fetch_odds(sport_key, API_KEY, market, bookmakers=BOOKMAKERS)
+
+def fetch_event_odds(sport_key, event_id, market='h2h'):
+    return engine.fetch_event_odds(sport_key, event_id, API_KEY, market, bookmakers=BOOKMAKERS)
+
+def snapshot_fetch():
+    return get_odds_source() if REPLAY_DIR else get_scheduler().fetch
+
+def load_snapshot(sport_labels, markets=('h2h',)):
+    return engine.load_snapshot(sport_labels, snapshot_fetch(), engine.markets_param(markets), stream=True)
+
+def report_snapshot(snapshot, show_errors=False):
+    snapshot.wait()
+    st.session_state.books_seen = {**st.session_state.get('books_seen', {}), **snapshot.books()}
+    if show_errors:
+        for sport_label, reason in snapshot.errors.items():
+            st.error(f"Could not fetch data for {sport_label} ({reason})")
+    throttled_at = get_scheduler().throttled_at
+    if throttled_at and time.time() - throttled_at < 60:
+        st.warning("Request budget reached — some odds are served from cache and may be stale.")
+    show_quota()
+
+def book_choices():
+    """book_map names, then every other bookmaker the loaded odds have shown."""
+    seen = st.session_state.get('books_seen', {})
+    return list(book_map) + [title for key, title in seen.items() if key not in book_map.values()]
+
+def show_quota():
+    quota = get_odds_cache().latest_quota()
+    if quota is not None:
+        st.session_state.api_quota = quota
+    quota_slot.metric("API Quota Remaining", st.session_state.api_quota)
+
+
+# --- LIVE POLLING ---
+# Live scans check every LIVE_INTERVAL; the scheduler still decides when a sport is re-fetched.
+# One poller serves every session. A session's watches are dropped once its
+# panel has not been rendered for LIVE_IDLE (the tab was closed), and the
+# poller thread exits when no session is watching.
+LIVE_INTERVAL = 30
+LIVE_IDLE     = 300
+
+@st.cache_resource
+def get_poller():
+    return engine.OddsPoller(snapshot_fetch(), interval=LIVE_INTERVAL, idle=LIVE_IDLE)
+
+def live_owner():
+    """This browser session's key for its watches on the shared poller."""
+    if 'live_owner' not in st.session_state:
+        st.session_state.live_owner = uuid.uuid4().hex
+    return st.session_state.live_owner
+
+def go_live(name, kind, config):
+    poller = get_poller()
+    poller.watch(name, kind, config, owner=live_owner())
+    poller.start()
+
+
+# --- EVENT REFRESH ---
+def refresh_games(kind, opps, config):
+    """Re-fetch the chosen games of a saved scan and re-rank it before hedging.
+
+    Only those events are pulled (or their sport, when that costs fewer
+    credits) and patched into the cached odds; the result cache then
+    re-scans just the games that changed.
+    """
+    if REPLAY_DIR or not opps:
+        return
+    games    = {op['game_id']: op for op in opps}
+    pick_key = f"{kind}_refresh_games"
+    if pick_key in st.session_state:   # a new scan or refresh may have dropped picked games
+        st.session_state[pick_key] = [game_id for game_id in st.session_state[pick_key] if game_id in games]
+    picked = st.multiselect("Refresh games", list(games), key=pick_key,
+                            format_func=lambda game_id: f"{games[game_id]['time']} | {games[game_id]['game']}",
+                            help="Re-fetch just these games' odds before placing the hedge.")
+    if not st.button("Refresh odds", key=f"{kind}_refresh", disabled=not picked):
+        return
 
-# ================================================================
-# BET & GET ENGINE
-# ================================================================
-def run_bet_get_scan(bg):
-    source_book_key    = book_map[bg['book']]
-    allowed_hedge_keys = [v for k, v in book_map.items() if v != source_book_key]
-    allowed_keys       = [source_book_key] + allowed_hedge_keys
-
-    today_date = datetime.now(CENTRAL).date()
-    bg_opps    = []
-    projected_bonus_value = bg['bonus_val'] * CONV_BETGET
-
-    with st.status("Running scan...", expanded=False) as status:
-        for sport_label in bg['sports']:
-            sport_key = sports_map[sport_label]
-            games, remaining = fetch_odds(sport_key, market='h2h')
-            if not games:
-                continue
-
-            st.session_state.api_quota = remaining
-
-            for game in games:
-                commence_time   = datetime.fromisoformat(game['commence_time'].replace('Z', '+00:00'))
-                game_date_local = commence_time.astimezone(CENTRAL).date()
-
-                if not (today_date <= game_date_local <= today_date + timedelta(days=3)):
-                    continue
-
-                flat_odds = build_flat_odds_h2h(game, allowed_keys)
-                if not flat_odds:
-                    continue
-
-                unique_outcomes = list(set(o['team'] for o in flat_odds))
-                game_label = f"{game.get('away_team')} vs {game.get('home_team')}"
-                game_time  = commence_time.astimezone(CENTRAL).strftime("%m/%d %I:%M %p")
-
-                if len(unique_outcomes) == 3:
-                    odds_t1   = [o for o in flat_odds if o['team'] == unique_outcomes[0]]
-                    odds_t2   = [o for o in flat_odds if o['team'] == unique_outcomes[1]]
-                    odds_draw = [o for o in flat_odds if o['team'] == unique_outcomes[2]]
-
-                    for o1 in odds_t1:
-                        for o2 in odds_t2:
-                            for o3 in odds_draw:
-                                if o1['book_key'] == o2['book_key'] or \
-                                   o1['book_key'] == o3['book_key'] or \
-                                   o2['book_key'] == o3['book_key']:
-                                    continue
-                                if o1['book_key'] != source_book_key:
-                                    continue
-                                sm  = get_multiplier(o1['price'])
-                                hm1 = get_multiplier(o2['price'])
-                                hm2 = get_multiplier(o3['price'])
-                                target_payout   = bg['wager'] * (1 + sm)
-                                h1_stake        = target_payout / (1 + hm1)
-                                h2_stake        = target_payout / (1 + hm2)
-                                qualifying_loss = target_payout - bg['wager'] - h1_stake - h2_stake
-                                net_promo_value = projected_bonus_value + qualifying_loss
-                                bg_opps.append({
-                                    "game": game_label, "sport": sport_label,
-                                    "market_type": "3-way", "time": game_time,
-                                    "qualifying_loss": qualifying_loss, "net_value": net_promo_value,
-                                    "s_book": o1['book_title'], "s_team": o1['team'], "s_price": o1['price'], "s_wager": bg['wager'],
-                                    "h1_book": o2['book_title'], "h1_team": o2['team'], "h1_price": o2['price'], "h1_wager": h1_stake,
-                                    "h2_book": o3['book_title'], "h2_team": o3['team'], "h2_price": o3['price'], "h2_wager": h2_stake,
-                                })
-
-                elif len(unique_outcomes) == 2:
-                    source_odds = [o for o in flat_odds if o['book_key'] == source_book_key]
-                    hedge_odds  = [o for o in flat_odds if o['book_key'] in allowed_hedge_keys]
-
-                    for s in source_odds:
-                        opp_team = [t for t in unique_outcomes if t != s['team']]
-                        if not opp_team: continue
-                        eligible_hedges = [h for h in hedge_odds if h['team'] == opp_team[0]]
-                        if not eligible_hedges: continue
-                        best_h          = max(eligible_hedges, key=lambda x: x['price'])
-                        sm              = get_multiplier(s['price'])
-                        hm              = get_multiplier(best_h['price'])
-                        target_payout   = bg['wager'] * (1 + sm)
-                        h_stake         = target_payout / (1 + hm)
-                        qualifying_loss = target_payout - bg['wager'] - h_stake
-                        net_promo_value = projected_bonus_value + qualifying_loss
-                        bg_opps.append({
-                            "game": game_label, "sport": sport_label,
-                            "market_type": "2-way", "time": game_time,
-                            "qualifying_loss": qualifying_loss, "net_value": net_promo_value,
-                            "s_book": s['book_title'], "s_team": s['team'], "s_price": s['price'], "s_wager": bg['wager'],
-                            "h1_book": best_h['book_title'], "h1_team": best_h['team'], "h1_price": best_h['price'], "h1_wager": h_stake,
-                        })
-
-        status.update(label="Scan complete.", state="complete")
-    return bg_opps
+    by_sport = {}
+    for game_id in picked:
+        by_sport.setdefault(games[game_id]['sport'], []).append(game_id)
+    markets = [config.get('market', 'h2h')]
+    with st.status("Refreshing odds...", expanded=False) as status:
+        for sport_label, event_ids in by_sport.items():
+            get_scheduler().refresh_events(sports_map[sport_label], event_ids, engine.markets_param(markets))
+        snapshot = load_snapshot(config[engine.SCANS[kind].sports_key], markets)
+        results  = get_result_cache().run_scan(kind, config, snapshot, top_k=RESULT_LIMIT)
+        report_snapshot(snapshot)
+        status.update(label="Odds refreshed.", state="complete")
+    view = saved_results()[kind][0]
+    saved_results()[kind] = (view, results, config)
+    st.rerun()
 
 
 # ================================================================
 # RENDER FUNCTIONS
 # ================================================================
-def display_results(all_opps, p):
+def saved_results():
+    """Last scan output per engine, so paging reruns render without re-scanning."""
+    if 'scan_results' not in st.session_state:
+        st.session_state.scan_results = {}
+    return st.session_state.scan_results
+
+def paginate(opps, page_size, key):
+    """(offset, page) for the selected page of already-ranked `opps`."""
+    n_pages  = max(1, -(-len(opps) // page_size))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > n_pages:   # a new scan came back shorter
+        st.session_state[page_key] = 1
+    page = 1
+    if n_pages > 1:
+        page = st.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, step=1, key=page_key)
+    start = (page - 1) * page_size
+    shown = opps[start:start + page_size]
+    if n_pages > 1:
+        st.caption(f"Showing {start + 1}–{start + len(shown)} of {len(opps)}")
+    return start, shown
+
+def rounded(kind, config, page):
+    """The shown page with bettable stakes added, when rounding is on."""
+    step = STAKE_ROUNDING[st.session_state.get("stake_rounding", "$1")]
+    return engine.round_stakes(kind, config, page, step) if step and page else page
+
+def risk_ranked(kind, config, opps):
+    """`opps` re-ranked by simulated profit, when a risk ranking is selected."""
+    by = RISK_RANKING[st.session_state.get("risk_rank", "Nominal profit")]
+    if not by or not opps:
+        return opps
+    with engine.span("risk"):
+        return engine.rank_by_risk(engine.simulate_risk(kind, config, opps), by)
+
+def risk_caption(op):
+    if 'risk_expected' in op:
+        st.caption(f"Simulated fills: expected ${op['risk_expected']:.2f} · 5th percentile ${op['risk_p05']:.2f} · "
+                   f"loss chance {op['risk_loss_chance']:.0%} · 1% adverse move on the worst leg ${op['risk_sensitivity']:+.2f}")
+
+def bet_at(op, field):
+    """' → bet $X' after an exact stake once the page has been rounded."""
+    return f" → bet **${op[field]:.2f}**" if field in op else ""
+
+
+def display_results(all_opps, p, key="promo"):
     st.markdown(f"<div class='promo-header'><h3>Results for {p['book']} — {p['strat']}</h3></div>", unsafe_allow_html=True)
-    sorted_opps = sorted(all_opps, key=lambda x: x['exact_profit'], reverse=True)
 
-    if not sorted_opps:
+    if not all_opps:
         st.warning("No profitable matches found.")
         return
 
-    for i, op in enumerate(sorted_opps[:15]):
+    start, page = paginate(risk_ranked("promo", p, all_opps), 15, key)
+    page        = rounded("promo", p, page)
+    for i, op in enumerate(page, start):
         boost_str   = f" | +{op['used_boost']}% Boost" if op.get('used_boost', 0) > 0 else ""
         profit      = op['exact_profit']
         profit_sign = '+' if profit >= 0 else ''
@@ -582,38 +320,42 @@ def display_results(all_opps, p):
             conv_str    = f" ({conv_rate:.1f}% conv)"
         else:
             conv_str = ""
-        header = f"#{i+1} | {op['time']} | {op['game']}{boost_str} | {profit_sign}${profit:.2f}{conv_str}"
+        market_str  = f" | {op['market_label']}" if op['market_label'] != "Match Result" else ""
+        header = f"#{i+1} | {op['time']} | {op['game']}{market_str}{boost_str} | {profit_sign}${profit:.2f}{conv_str}"
 
         with st.expander(header):
             if op.get('market_type') == "3-way":
                 c1, c2, c3 = st.columns(3)
                 with c1: st.info(f"**{op['s_book'].upper()}**\n\nStake: **${op['exact_w1']:.2f}**\n\nLine: **{op['s_team']}** @ **{op['s_price']:+}**")
-                with c2: st.success(f"**{op['h1_book'].upper()}**\n\nStake: **${op['exact_hedge1']:.2f}**\n\nLine: **{op['h1_team']}** @ **{op['h1_price']:+}**")
-                with c3: st.success(f"**{op['h2_book'].upper()}**\n\nStake: **${op['exact_hedge2']:.2f}**\n\nLine: **{op['h2_team']}** @ **{op['h2_price']:+}**")
+                with c2: st.success(f"**{op['h1_book'].upper()}**\n\nStake: **${op['exact_hedge1']:.2f}**{bet_at(op, 'rounded_hedge1')}\n\nLine: **{op['h1_team']}** @ **{op['h1_price']:+}**")
+                with c3: st.success(f"**{op['h2_book'].upper()}**\n\nStake: **${op['exact_hedge2']:.2f}**{bet_at(op, 'rounded_hedge2')}\n\nLine: **{op['h2_team']}** @ **{op['h2_price']:+}**")
             else:
                 c_main, c_hedge = st.columns([1.5, 2])
                 with c_main:  st.info(f"**{op['s_book'].upper()}**\n\nStake: **${op['wager']:.2f}**\n\nLine: **{op['s_team']}** @ **{op['s_price']:+}**")
-                with c_hedge: st.success(f"**{op['h_book'].upper()}**\n\nStake: **${op['exact_hedge']:.2f}**\n\nLine: **{op['h_team']}** @ **{op['h_price']:+}**")
+                with c_hedge: st.success(f"**{op['h_book'].upper()}**\n\nStake: **${op['exact_hedge']:.2f}**{bet_at(op, 'rounded_hedge')}\n\nLine: **{op['h_team']}** @ **{op['h_price']:+}**")
             st.metric("Net Arbitrage Profit", f"${op['exact_profit']:.2f}")
+            if 'rounded_profit' in op:
+                st.caption(f"Worst case at the rounded stakes: ${op['rounded_profit']:.2f}")
+            risk_caption(op)
 
 
-def display_soccer_results(opps):
+def display_soccer_results(opps, sc, key="soccer"):
     st.markdown("<div class='soccer-header'><h3>3-Way Soccer Engine Results</h3></div>", unsafe_allow_html=True)
-    sorted_opps = sorted(opps, key=lambda x: x['net_profit'], reverse=True)
 
-    if not sorted_opps:
+    if not opps:
         st.warning("No matches found for your designated book criteria.")
         return
 
-    for i, op in enumerate(sorted_opps[:10]):
+    start, page = paginate(risk_ranked("soccer", sc, opps), 10, key)
+    page        = rounded("soccer", sc, page)
+    for i, op in enumerate(page, start):
         profit      = op['net_profit']
         profit_sign = "+" if profit >= 0 else ""
-        header      = f"#{i+1} | {op['time']} | {op['game']} | {profit_sign}${profit:.2f}"
+        league      = f" ({op['sport']})" if len(sc['leagues']) > 1 else ""
+        header      = f"#{i+1} | {op['time']} | {op['game']}{league} | {profit_sign}${profit:.2f}"
 
         with st.expander(header):
-            cl1, cl2, cl3 = st.columns(3)
-
-            def leg_card(col, label, book, strat, boost, wager, promo, cash, team, price, color_fn):
+            def leg_card(col, label, book, strat, boost, wager, promo, cash, team, price, color_fn, bet=""):
                 if boost > 0:
                     promo_label = f"{strat} +{boost}%"
                     promo_help  = f"Profit boost of {boost}% applied to this leg's odds."
@@ -626,7 +368,7 @@ def display_soccer_results(opps):
                     }.get(strat, "")
                 show_breakdown = strat != "Straight Cash"
                 sep  = "\n\n"
-                body = f"**{book}**" + sep + f"*{promo_label}*" + sep + f"Total Bet: **${wager:.2f}**" + sep
+                body = f"**{book}**" + sep + f"*{promo_label}*" + sep + f"Total Bet: **${wager:.2f}**{bet}" + sep
                 if show_breakdown:
                     body += f"\u21b3 Promo Stake: `${promo:.2f}`" + sep
                     if cash > 0:
@@ -636,12 +378,12 @@ def display_soccer_results(opps):
                     color_fn(body)
                     st.caption(f"**{label}** — {promo_help}")
 
-            leg_card(cl1, "BET 1", op['o1_book'], op['o1_strat'], op['o1_boost'],
-                     op['o1_wager'], op['o1_promo'], op['o1_cash'], op['o1_team'], op['o1_price'], st.info)
-            leg_card(cl2, "BET 2", op['o2_book'], op['o2_strat'], op['o2_boost'],
-                     op['o2_wager'], op['o2_promo'], op['o2_cash'], op['o2_team'], op['o2_price'], st.success)
-            leg_card(cl3, "BET 3", op['o3_book'], op['o3_strat'], op['o3_boost'],
-                     op['o3_wager'], op['o3_promo'], op['o3_cash'], op['o3_team'], op['o3_price'], st.warning)
+            n_legs = engine.leg_count(sc)
+            colors = [st.info, st.success, st.warning]
+            for n, col in enumerate(st.columns(n_legs), 1):
+                leg_card(col, f"BET {n}", op[f'o{n}_book'], op[f'o{n}_strat'], op[f'o{n}_boost'],
+                         op[f'o{n}_wager'], op[f'o{n}_promo'], op[f'o{n}_cash'], op[f'o{n}_team'], op[f'o{n}_price'],
+                         colors[(n - 1) % len(colors)], bet_at(op, f'o{n}_rounded') if n > 1 else "")
 
             banner_color  = "#16a34a" if profit >= 0 else "#dc2626"
             banner_bg     = "#f0fdf4" if profit >= 0 else "#fef2f2"
@@ -655,36 +397,97 @@ def display_soccer_results(opps):
                 f"</div>",
                 unsafe_allow_html=True
             )
+            if 'rounded_profit' in op:
+                st.caption(f"Worst case at the rounded stakes: ${op['rounded_profit']:.2f}")
+            risk_caption(op)
 
 
-def display_bet_get_results(opps, bg):
+def display_bet_get_results(opps, bg, key="bet_get"):
     st.markdown(f"<div class='betget-header'><h3>Bet and Get Engine — {bg['book']}</h3></div>", unsafe_allow_html=True)
-    sorted_opps = sorted(opps, key=lambda x: x['net_value'], reverse=True)
 
-    if not sorted_opps:
+    if not opps:
         st.warning("No tight lines found for qualification.")
         return
 
-    for i, op in enumerate(sorted_opps[:10]):
+    start, page = paginate(opps, 10, key)
+    page        = rounded("bet_get", bg, page)
+    for i, op in enumerate(page, start):
         sign   = "+" if op['net_value'] >= 0 else ""
         header = f"#{i+1} | {op['time']} | {op['game']} | {sign}${op['net_value']:.2f}"
 
         with st.expander(header):
-            st.caption(f"**League:** {op['sport']} | Market: {op['market_type'].upper()}")
+            st.caption(f"**League:** {op['sport']} | Market: {op['market_label']} ({op['market_type']})")
 
             if op['market_type'] == "3-way":
                 c1, c2, c3 = st.columns(3)
                 with c1: st.info(f"**REQUIRED (QUALIFIER)**\n\n**{op['s_book']}**\n\nBet: **${op['s_wager']:.2f}**\n\n{op['s_team']} @ {op['s_price']:+}")
-                with c2: st.success(f"**HEDGE LEG 1**\n\n**{op['h1_book']}**\n\nBet: **${op['h1_wager']:.2f}**\n\n{op['h1_team']} @ {op['h1_price']:+}")
-                with c3: st.success(f"**HEDGE LEG 2**\n\n**{op['h2_book']}**\n\nBet: **${op['h2_wager']:.2f}**\n\n{op['h2_team']} @ {op['h2_price']:+}")
+                with c2: st.success(f"**HEDGE LEG 1**\n\n**{op['h1_book']}**\n\nBet: **${op['h1_wager']:.2f}**{bet_at(op, 'h1_rounded')}\n\n{op['h1_team']} @ {op['h1_price']:+}")
+                with c3: st.success(f"**HEDGE LEG 2**\n\n**{op['h2_book']}**\n\nBet: **${op['h2_wager']:.2f}**{bet_at(op, 'h2_rounded')}\n\n{op['h2_team']} @ {op['h2_price']:+}")
             else:
                 c1, c2 = st.columns(2)
                 with c1: st.info(f"**REQUIRED (QUALIFIER)**\n\n**{op['s_book']}**\n\nBet: **${op['s_wager']:.2f}**\n\n{op['s_team']} @ {op['s_price']:+}")
-                with c2: st.success(f"**HEDGE LEG**\n\n**{op['h1_book']}**\n\nBet: **${op['h1_wager']:.2f}**\n\n{op['h1_team']} @ {op['h1_price']:+}")
+                with c2: st.success(f"**HEDGE LEG**\n\n**{op['h1_book']}**\n\nBet: **${op['h1_wager']:.2f}**{bet_at(op, 'h1_rounded')}\n\n{op['h1_team']} @ {op['h1_price']:+}")
 
             mc1, mc2 = st.columns(2)
             with mc1: st.metric("Qualifying Cost (Loss)", f"${op['qualifying_loss']:.2f}")
             with mc2: st.metric("Net Value Lock (Est. 65% Convert)", f"${op['net_value']:.2f}")
+            if 'rounded_value' in op:
+                st.caption(f"At the rounded stakes: qualifying cost ${op['rounded_loss']:.2f}, net value ${op['rounded_value']:.2f}")
+
+
+def sweep_values(text):
+    """Numbers from a comma-separated sweep box; empty means the field is not swept."""
+    return [float(v) for v in text.replace(" ", "").split(",") if v]
+
+def display_sweep(surface, key="sweep"):
+    """Best locked profit at every grid point, over all games or for one of them."""
+    st.markdown("<div class='promo-header'><h3>Parameter Sweep</h3></div>", unsafe_allow_html=True)
+    games = surface['games']
+    if not games:
+        st.warning("No games to sweep.")
+        return
+
+    choice = st.selectbox("Game", range(len(games) + 1), key=f"{key}_game",
+                          format_func=lambda n: "Best across games" if n == 0 else
+                          f"{games[n - 1]['time']} | {games[n - 1]['game']}")
+    grid   = surface['best'] if choice == 0 else games[choice - 1]['profit']
+    fields, values = surface['fields'], surface['values']
+    labels = [SWEEP_LABELS[field] for field in fields]
+
+    best = np.unravel_index(np.nanargmax(grid), grid.shape)
+    st.caption("Best: " + ", ".join(f"{label} {values[i][n]:g}" for i, (label, n) in enumerate(zip(labels, best)))
+               + f" → ${grid[best]:.2f}")
+    rows = []
+    for point in product(*(range(len(v)) for v in values[:-1])):
+        row = {label: values[i][n] for i, (label, n) in enumerate(zip(labels, point))}
+        row.update({f"{labels[-1]} {v:g}": f"${grid[point + (n,)]:.2f}" for n, v in enumerate(values[-1])})
+        rows.append(row)
+    st.dataframe(rows, hide_index=True)
+
+
+RENDERERS = {
+    "promo":   lambda opps, config, key: display_results(opps, config, key),
+    "soccer":  lambda opps, config, key: display_soccer_results(opps, config, key),
+    "bet_get": lambda opps, config, key: display_bet_get_results(opps, config, key),
+}
+
+
+def show_profile(prof):
+    if not st.session_state.get("debug"):
+        return
+    report = prof.to_dict()
+    with st.expander(f"Scan profile — {report['wall_s'] * 1000:.0f} ms"):
+        st.caption("Self time excludes nested spans. Fetch and decode run on worker threads, overlapping fetch_wait.")
+        st.dataframe([
+            {"span": name, "calls": s['calls'], "self (ms)": s['self_s'] * 1000, "total (ms)": s['total_s'] * 1000}
+            for name, s in report['spans'].items()
+        ], hide_index=True)
+        metric_cols = st.columns(max(len(report['counters']), 1))
+        for col, (name, value) in zip(metric_cols, report['counters'].items()):
+            with col: st.metric(name.replace('_', ' ').title(), f"{value:,}")
+        d1, d2 = st.columns(2)
+        with d1: st.download_button("Export JSON", prof.to_json(), f"{prof.name}.json", "application/json", key=f"prof_json_{prof.name}")
+        with d2: st.download_button("Export Prometheus", prof.to_prometheus(), f"{prof.name}.prom", "text/plain", key=f"prof_prom_{prof.name}")
 
 
 # ================================================================
@@ -696,7 +499,13 @@ with c_title:
 with c_quota:
     if 'api_quota' not in st.session_state:
         st.session_state.api_quota = "—"
-    st.metric("API Quota Remaining", st.session_state.api_quota)
+    quota_slot = st.empty()
+    show_quota()
+    st.toggle("Profiling", key="debug", help="Show a timing report under each scan.")
+    st.selectbox("Round stakes to", list(STAKE_ROUNDING), key="stake_rounding",
+                 help="Hedge stakes are rounded to what the books accept, keeping the worst case as high as possible.")
+    st.selectbox("Rank by", list(RISK_RANKING), key="risk_rank",
+                 help="Re-rank boost and soccer results by simulating price moves and failed fills on the later legs.")
 
 st.divider()
 
@@ -708,7 +517,7 @@ with st.expander("Main Boost Engine", expanded=True):
         col1, col2, col3, col4 = st.columns([2, 2, 2, 2])
         with col1:
             with st.container(border=True):
-                b = st.selectbox("Source Book", list(book_map.keys()))
+                b = st.selectbox("Source Book", book_choices())
                 s = st.selectbox("Promo Type", ["Profit Boost (%)", "Bonus Bet", "No-Sweat Bet"])
         with col2:
             with st.container(border=True):
@@ -720,21 +529,66 @@ with st.expander("Main Boost Engine", expanded=True):
                 )
         with col3:
             with st.container(border=True):
-                hb = st.multiselect("Hedge Book(s)", list(book_map.keys()), placeholder="All Books")
+                hb = st.multiselect("Hedge Book(s)", book_choices(), placeholder="All Books")
+                xb = st.multiselect("Exclude Book(s)", book_choices(), placeholder="None", key="promo_exclude")
+                pm = st.selectbox("Market", list(market_labels), format_func=market_labels.get, key="promo_market",
+                                  help="Spreads and totals hedge against the opposite side of the same line.")
         with col4:
             with st.container(border=True):
                 sp = st.multiselect("Sports Filter", list(sports_map.keys()), default=[], placeholder="Select sports...")
 
-        promo_submit = st.form_submit_button("Scan")
+        bw1, bw2 = st.columns(2)
+        with bw1: sweep_boosts = st.text_input("Sweep boosts (%)", placeholder="e.g. 25, 50, 100", key="sweep_boosts")
+        with bw2: sweep_wagers = st.text_input("Sweep wagers ($)", placeholder="e.g. 10, 25, 50", key="sweep_wagers")
 
-    if promo_submit:
-        active_sports = sp if sp else list(sports_map.keys())
-        p_config = {
-            "book": b, "strat": s, "boost_val": main_boost_val,
-            "wager": w, "hedge_books": hb, "sports": active_sports
-        }
-        results = run_promo_scan(p_config)
-        display_results(results, p_config)
+        promo_live   = st.checkbox("Keep live", key="promo_live", help="Re-scan in the background as prices move.")
+        pf1, pf2     = st.columns(2)
+        with pf1: promo_submit = st.form_submit_button("Scan")
+        with pf2: promo_sweep  = st.form_submit_button("Sweep", help="Best profit per game at every boost and wager listed above.")
+
+    active_sports = sp if sp else list(sports_map.keys())
+    p_config = {
+        "book": b, "strat": s, "boost_val": main_boost_val,
+        "wager": w, "hedge_books": hb, "exclude_books": xb, "sports": active_sports, "market": pm
+    }
+    if promo_sweep:
+        try:
+            grid = {field: vals for field, vals in (("boost_val", sweep_values(sweep_boosts)),
+                                                    ("wager", sweep_values(sweep_wagers))) if vals}
+        except ValueError:
+            grid = None
+        if not grid:
+            st.error("List the boosts and/or wagers to sweep, separated by commas.")
+        else:
+            with engine.profile("Main Boost Sweep") as prof:
+                with st.status("Running sweep...", expanded=False) as status:
+                    snapshot = load_snapshot(p_config['sports'], [pm])
+                    surface  = engine.sweep("promo", p_config, snapshot, grid)
+                    report_snapshot(snapshot, show_errors=True)
+                    status.update(label="Sweep complete.", state="complete")
+                saved_results()["promo"] = (display_sweep, surface, "promo_sweep")
+                with engine.span("render"):
+                    display_sweep(surface, "promo_sweep")
+            show_profile(prof)
+    elif promo_submit:
+        with engine.profile("Main Boost Engine") as prof:
+            with st.status("Running scan...", expanded=False) as status:
+                snapshot = load_snapshot(p_config['sports'], [pm])
+                results  = get_result_cache().run_scan("promo", p_config, snapshot, top_k=RESULT_LIMIT)
+                report_snapshot(snapshot, show_errors=True)
+                status.update(label="Scan complete.", state="complete")
+            saved_results()["promo"] = (display_results, results, p_config)
+            with engine.span("render"):
+                display_results(results, p_config)
+        show_profile(prof)
+        refresh_games("promo", results, p_config)
+        if promo_live:
+            go_live("Main Boost Engine", "promo", p_config)
+    elif "promo" in saved_results():
+        view, *args = saved_results()["promo"]
+        view(*args)
+        if view.__name__ == "display_results":   # saved by an earlier run, so not this run's function
+            refresh_games("promo", *args)
 
 
 # ================================================================
@@ -745,46 +599,95 @@ with st.expander("3-Way Soccer Engine", expanded=False):
         today         = datetime.now(CENTRAL).date()
         lookahead_end = today + timedelta(days=3)
 
+        sl1, sl2, sl3 = st.columns([3, 2, 1])
+        with sl1: s_leagues = st.multiselect("Leagues", list(sports_map.keys()), default=["FIFA World Cup"], key="sc_leagues")
+        with sl2: s_exclude = st.multiselect("Exclude Book(s)", book_choices(), placeholder="None", key="sc_exclude",
+                                             help="Never used for Bet 2 onward, even when no books are selected.")
+        with sl3: s_legs    = st.selectbox("Legs", [3, 2], key="sc_legs",
+                                           format_func=lambda n: "3 (win / draw / win)" if n == 3 else "2 (moneyline)",
+                                           help="One leg per outcome. With 2 legs, Bet 3 is ignored.")
+
         st.divider()
 
         sc1, sc2, sc3 = st.columns(3)
         with sc1:
             with st.container(border=True):
                 st.subheader("Bet 1")
-                sb1   = st.selectbox("Book", list(book_map.keys()), index=0, key="sc_book1")
+                sb1   = st.selectbox("Book", book_choices(), index=0, key="sc_book1")
                 ss1   = st.selectbox("Promo Type", ["Straight Cash", "Profit Boost (%)", "Bonus Bet", "No-Sweat Bet"], index=0, key="sc_type1")
                 sbv1  = st.number_input("Boost %", min_value=0, value=0, step=5, key="sc_boost1")
                 sw1   = st.number_input("Stake ($)", min_value=0.0, value=0.0, step=5.0, key="sc_stake1")
                 scap1 = st.number_input("Promo Cap ($)", min_value=0.0, value=0.0, help="Max stake eligible for promo. 0 = no cap.", key="sc_cap1")
+                ssw1  = st.text_input("Sweep caps ($)", placeholder="e.g. 10, 25, 50", key="sc_capsweep1")
         with sc2:
             with st.container(border=True):
                 st.subheader("Bet 2")
-                sb2   = st.multiselect("Book(s)", list(book_map.keys()), default=[], placeholder="Select books...", key="sc_book2")
+                sb2   = st.multiselect("Book(s)", book_choices(), default=[], placeholder="All Books", key="sc_book2")
                 ss2   = st.selectbox("Promo Type", ["Straight Cash", "Profit Boost (%)", "Bonus Bet", "No-Sweat Bet"], index=0, key="sc_type2")
                 sbv2  = st.number_input("Boost %", min_value=0, value=0, step=5, key="sc_boost2")
                 sw2   = st.number_input("Stake ($)", min_value=0.0, value=0.0, step=5.0, key="sc_stake2")
                 scap2 = st.number_input("Promo Cap ($)", min_value=0.0, value=0.0, help="Max stake eligible for promo. 0 = no cap.", key="sc_cap2")
+                ssw2  = st.text_input("Sweep caps ($)", placeholder="e.g. 10, 25, 50", key="sc_capsweep2")
         with sc3:
             with st.container(border=True):
                 st.subheader("Bet 3")
-                sb3   = st.multiselect("Book(s)", list(book_map.keys()), default=[], placeholder="Select books...", key="sc_book3")
+                sb3   = st.multiselect("Book(s)", book_choices(), default=[], placeholder="All Books", key="sc_book3")
                 ss3   = st.selectbox("Promo Type", ["Straight Cash", "Profit Boost (%)", "Bonus Bet", "No-Sweat Bet"], index=0, key="sc_type3")
                 sbv3  = st.number_input("Boost %", min_value=0, value=0, step=5, key="sc_boost3")
                 sw3   = st.number_input("Stake ($)", min_value=0.0, value=0.0, step=5.0, key="sc_stake3")
                 scap3 = st.number_input("Promo Cap ($)", min_value=0.0, value=0.0, help="Max stake eligible for promo. 0 = no cap.", key="sc_cap3")
+                ssw3  = st.text_input("Sweep caps ($)", placeholder="e.g. 10, 25, 50", key="sc_capsweep3")
 
-        soccer_submit = st.form_submit_button("Scan")
+        soccer_live   = st.checkbox("Keep live", key="soccer_live", help="Re-scan in the background as prices move.")
+        sf1, sf2      = st.columns(2)
+        with sf1: soccer_submit = st.form_submit_button("Scan")
+        with sf2: soccer_sweep  = st.form_submit_button("Sweep", help="Best profit per game at every combination of the caps listed above.")
 
-    if soccer_submit:
+    if soccer_submit or soccer_sweep:
         soccer_config = {
             "book1": sb1, "strat1": ss1, "boost1": sbv1, "wager1": sw1, "cap1_val": scap1,
-            "book2": sb2 if sb2 else list(book_map.keys()), "strat2": ss2, "boost2": sbv2, "wager2": sw2, "cap2_val": scap2,
-            "book3": sb3 if sb3 else list(book_map.keys()), "strat3": ss3, "boost3": sbv3, "wager3": sw3, "cap3_val": scap3,
-            "leagues": ["FIFA World Cup"],
+            "book2": sb2, "strat2": ss2, "boost2": sbv2, "wager2": sw2, "cap2_val": scap2,
+            "book3": sb3, "strat3": ss3, "boost3": sbv3, "wager3": sw3, "cap3_val": scap3,
+            "legs": s_legs, "exclude_books": s_exclude, "leagues": s_leagues if s_leagues else ["FIFA World Cup"],
             "lookahead_end_date": lookahead_end
         }
-        soccer_results = run_multi_book_soccer_scan(soccer_config)
-        display_soccer_results(soccer_results)
+    if soccer_sweep:
+        try:
+            grid = {f"cap{n}_val": vals for n, vals in enumerate(map(sweep_values, (ssw1, ssw2, ssw3)[:s_legs]), 1) if vals}
+        except ValueError:
+            grid = None
+        if not grid:
+            st.error("List the caps to sweep for at least one bet, separated by commas.")
+        else:
+            with engine.profile("3-Way Soccer Sweep") as prof:
+                with st.status("Running sweep...", expanded=False) as status:
+                    snapshot = load_snapshot(soccer_config['leagues'])
+                    surface  = engine.sweep("soccer", soccer_config, snapshot, grid)
+                    report_snapshot(snapshot)
+                    status.update(label="Sweep complete.", state="complete")
+                saved_results()["soccer"] = (display_sweep, surface, "soccer_sweep")
+                with engine.span("render"):
+                    display_sweep(surface, "soccer_sweep")
+            show_profile(prof)
+    elif soccer_submit:
+        with engine.profile("3-Way Soccer Engine") as prof:
+            with st.status("Running scan...", expanded=False) as status:
+                snapshot       = load_snapshot(soccer_config['leagues'])
+                soccer_results = get_result_cache().run_scan("soccer", soccer_config, snapshot, top_k=RESULT_LIMIT)
+                report_snapshot(snapshot)
+                status.update(label="Scan complete.", state="complete")
+            saved_results()["soccer"] = (display_soccer_results, soccer_results, soccer_config)
+            with engine.span("render"):
+                display_soccer_results(soccer_results, soccer_config)
+        show_profile(prof)
+        refresh_games("soccer", soccer_results, soccer_config)
+        if soccer_live:
+            go_live("3-Way Soccer Engine", "soccer", soccer_config)
+    elif "soccer" in saved_results():
+        view, *args = saved_results()["soccer"]
+        view(*args)
+        if view.__name__ == "display_soccer_results":
+            refresh_games("soccer", *args)
 
 
 # ================================================================
@@ -795,16 +698,204 @@ with st.expander("Bet and Get Engine", expanded=False):
         bgc1, bgc2 = st.columns(2)
         with bgc1:
             with st.container(border=True):
-                bg_b = st.selectbox("Book", list(book_map.keys()))
+                bg_b = st.selectbox("Book", book_choices())
                 bg_w = st.number_input("Qual. Stake ($)", min_value=0.0, value=0.0, step=5.0)
+                bg_m = st.selectbox("Market", list(market_labels), format_func=market_labels.get, key="bg_market")
         with bgc2:
             with st.container(border=True):
                 bg_v  = st.number_input("Bonus Value ($)", min_value=0.0, value=0.0, step=5.0)
-                bg_sp = st.multiselect("Sports", list(sports_map.keys()), default=[])
+                bg_sp = st.multiselect("Sports", list(sports_map.keys()), default=[], placeholder="All Sports")
+                bg_hb = st.multiselect("Hedge Book(s)", book_choices(), placeholder="All Books", key="bg_hedge")
+                bg_xb = st.multiselect("Exclude Book(s)", book_choices(), placeholder="None", key="bg_exclude")
 
+        bg_live   = st.checkbox("Keep live", key="bg_live", help="Re-scan in the background as prices move.")
         bg_submit = st.form_submit_button("Scan")
 
     if bg_submit:
-        bg_config = {"book": bg_b, "wager": bg_w, "bonus_val": bg_v, "sports": bg_sp}
-        bg_results = run_bet_get_scan(bg_config)
-        display_bet_get_results(bg_results, bg_config)
+        bg_config = {"book": bg_b, "wager": bg_w, "bonus_val": bg_v, "sports": bg_sp or list(sports_map), "market": bg_m,
+                     "hedge_books": bg_hb, "exclude_books": bg_xb}
+        with engine.profile("Bet and Get Engine") as prof:
+            with st.status("Running scan...", expanded=False) as status:
+                snapshot   = load_snapshot(bg_config['sports'], [bg_m])
+                bg_results = get_result_cache().run_scan("bet_get", bg_config, snapshot, top_k=RESULT_LIMIT)
+                report_snapshot(snapshot)
+                status.update(label="Scan complete.", state="complete")
+            saved_results()["bet_get"] = (display_bet_get_results, bg_results, bg_config)
+            with engine.span("render"):
+                display_bet_get_results(bg_results, bg_config)
+        show_profile(prof)
+        refresh_games("bet_get", bg_results, bg_config)
+        if bg_live:
+            go_live("Bet and Get Engine", "bet_get", bg_config)
+    elif "bet_get" in saved_results():
+        view, *args = saved_results()["bet_get"]
+        view(*args)
+        refresh_games("bet_get", *args)
+
+
+# ================================================================
+# BATCH MODE
+# ================================================================
+BATCH_EXAMPLE = """[
+  {"name": "DK 50% boost", "kind": "promo", "config": {"book": "DraftKings", "boost_val": 50, "wager": 25}},
+  {"name": "DK bonus bet", "kind": "promo", "config": {"book": "DraftKings", "strat": "Bonus Bet", "wager": 25}}
+]"""
+
+def display_batch(promos, configs, batch):
+    for i, (promo, config) in enumerate(zip(promos, configs)):
+        st.subheader(promo['name'])
+        RENDERERS[promo['kind']](batch[promo['name']], config, f"batch_{i}")
+
+def display_portfolio(promos, configs, portfolio):
+    assignments = portfolio['assignments']
+    pc1, pc2 = st.columns(2)
+    with pc1: st.metric("Total Guaranteed Profit", f"${portfolio['total_profit']:.2f}")
+    with pc2: st.metric("Promos Assigned", f"{len(assignments)} / {len(promos)}")
+    if not portfolio['optimal']:
+        st.caption("The search hit its time limit; this is the best assignment it found.")
+    if portfolio['unassigned']:
+        st.caption(f"No profitable opportunity left for: {', '.join(portfolio['unassigned'])}")
+    if not assignments:
+        return
+
+    st.dataframe([{
+        "Promo":  a['name'],
+        "Game":   a['opp']['game'],
+        "Time":   a['opp']['time'],
+        "Stakes": " · ".join(f"{book} ${stake:.2f}" for book, stake in engine.opp_exposure(a['kind'], a['opp']).items()),
+        "Profit": f"${a['profit']:.2f}"
+    } for a in assignments], hide_index=True)
+    st.dataframe([{"Book": book, "Total Stake": f"${stake:.2f}"} for book, stake in portfolio['exposure'].items()],
+                 hide_index=True)
+
+    config_of = {promo['name']: config for promo, config in zip(promos, configs)}
+    for i, a in enumerate(assignments):
+        st.subheader(a['name'])
+        RENDERERS[a['kind']]([a['opp']], config_of[a['name']], f"portfolio_{i}")
+
+with st.expander("Batch Mode", expanded=False):
+    st.caption("Run a list of saved promos against one odds pull. Each entry needs a name, "
+               "a kind (promo, soccer or bet_get) and the same config fields as the forms above.")
+    batch_file   = st.file_uploader("Promo list (JSON)", type=["json"], key="batch_file")
+    batch_text   = st.text_area("...or paste it here", value=BATCH_EXAMPLE, height=160, key="batch_text")
+
+    with st.container(border=True):
+        st.caption("Portfolio limits: total stake per book across every promo (0 = no limit), "
+                   "and how many promos may land on one game.")
+        limit_cols      = st.columns(len(book_map) + 1)
+        exposure_limits = {}
+        for col, book in zip(limit_cols, book_map):
+            with col:
+                exposure_limits[book] = st.number_input(book, min_value=0.0, value=0.0, step=50.0, key=f"limit_{book}")
+        with limit_cols[-1]:
+            per_game = st.number_input("Promos per game", min_value=0, value=1, step=1, key="per_game",
+                                       help="0 = no limit")
+
+    bb1, bb2 = st.columns(2)
+    with bb1: batch_submit     = st.button("Run Batch", key="batch_submit")
+    with bb2: portfolio_submit = st.button("Optimize Portfolio", key="portfolio_submit",
+                                           help="Use each promo at most once, on the games that lock in the most total profit.")
+
+    if batch_submit or portfolio_submit:
+        try:
+            promos  = json.loads(batch_file.getvalue() if batch_file else batch_text)
+            configs = [normalize_config(promo['kind'], promo['config']) for promo in promos]
+        except (ValueError, KeyError, TypeError) as e:
+            st.error(f"Could not read promo list: {e}")
+        else:
+            sport_labels = list(dict.fromkeys(
+                s for promo, config in zip(promos, configs) for s in config[SCANS[promo['kind']].sports_key]
+            ))
+            with engine.profile("Batch Mode" if batch_submit else "Portfolio") as prof:
+                with st.status(f"Running {len(promos)} promos...", expanded=False) as status:
+                    snapshot = load_snapshot(sport_labels, [engine.config_market(config) for config in configs])
+                    if batch_submit:
+                        batch = run_batch(promos, snapshot, top_k=RESULT_LIMIT)
+                    else:
+                        batch = engine.optimize_portfolio(promos, snapshot, exposure_limits, per_game or None)
+                    report_snapshot(snapshot, show_errors=True)
+                    status.update(label="Batch complete.", state="complete")
+                view = display_batch if batch_submit else display_portfolio
+                saved_results()["batch"] = (view, promos, configs, batch)
+                with engine.span("render"):
+                    view(promos, configs, batch)
+            show_profile(prof)
+    elif "batch" in saved_results():
+        view, *args = saved_results()["batch"]
+        view(*args)
+
+
+# ================================================================
+# LINE MOVEMENT
+# ================================================================
+def outcome_line(row):
+    """(outcome, point) a history row prices; spreads and totals repeat names across lines."""
+    return row['outcome'], row['point']
+
+def line_label(line, market):
+    name, point = line
+    if point is None:
+        return name
+    return f"{name} {point:+g}" if market == "spreads" else f"{name} {point:g}"
+
+def price_chart(rows, line):
+    """One column per book, forward-filled across every recorded change of one (outcome, point) line."""
+    points, last = [], {}
+    for row in rows:
+        if outcome_line(row) != line:
+            continue
+        last[row['book_title']] = row['price']
+        points.append({"time": datetime.fromtimestamp(row['time'], CENTRAL), **last})
+    return points
+
+if get_history() is not None:
+    with st.expander("Line Movement", expanded=False):
+        lm1, lm2, lm3 = st.columns([1, 2, 1])
+        with lm1: lm_sport  = st.selectbox("Sport", list(sports_map), key="lm_sport")
+        games = get_history().games(sports_map[lm_sport], since=time.time() - 86400)
+        if not games:
+            st.caption("No recorded odds for this sport in the last day.")
+        else:
+            with lm2: lm_game   = st.selectbox("Game", games, key="lm_game",
+                                               format_func=lambda g: f"{g['away_team']} vs {g['home_team']}")
+            with lm3: lm_market = st.selectbox("Market", list(market_labels), key="lm_market", format_func=market_labels.get)
+            rows = get_history().line_history(lm_game['id'], lm_market)
+            if not rows:
+                st.caption("No prices recorded for this market.")
+            else:
+                lines   = list(dict.fromkeys(map(outcome_line, rows)))
+                lm_line = st.radio("Outcome", lines, key="lm_line", horizontal=True,
+                                   format_func=lambda line: line_label(line, lm_market))
+                st.line_chart(price_chart(rows, lm_line), x="time")
+                st.caption(f"{len(rows)} price changes recorded.")
+
+
+# ================================================================
+# LIVE OPPORTUNITIES
+# ================================================================
+@st.fragment(run_every=5)
+def live_panel():
+    poller = get_poller()
+    if poller.polled_at is None:
+        st.caption("Waiting for the first poll...")
+    else:
+        polled = datetime.fromtimestamp(poller.polled_at, CENTRAL).strftime("%I:%M:%S %p")
+        st.caption(f"Last poll {polled} CT — every {poller.interval}s")
+    if poller.last_error:
+        st.error(f"Poller error: {poller.last_error}")
+    for sport_label, reason in poller.errors.items():
+        st.error(f"Could not fetch data for {sport_label} ({reason})")
+
+    for name, watch in poller.watches(live_owner()).items():
+        c_name, c_stop = st.columns([4, 1])
+        with c_name:
+            st.subheader(name)
+        with c_stop:
+            if st.button("Stop", key=f"stop_{name}"):
+                poller.unwatch(name, live_owner())
+                st.rerun()
+        RENDERERS[watch.kind](poller.table(name, live_owner()), watch.config, f"live_{name}")
+
+if get_poller().watches(live_owner()):
+    with st.expander("Live Opportunities", expanded=True):
+        live_panel()
@@ -0,0 +1,25 @@
+"""Headless scan engine behind the Promo Converter UI — no Streamlit imports."""
+from .batch import run_batch
+from .cache import MemorySnapshotCache, SQLiteSnapshotCache, SnapshotCache
+from .columnar import ColumnarOdds
+from .configs import book_key, leg_count, normalize_config
+from .constants import CENTRAL, CONV_BETGET, CONV_NOSWEAT, book_map, market_labels, sports_map
+from .history import OddsHistory, conversion_backtest
+from .memo import ResultCache, game_digest
+from .odds import (
+    OddsSnapshot, build_flat_odds_3way, build_flat_odds_h2h, commence_local, fetch_event_odds,
+    fetch_odds, load_snapshot, markets_param, odds_result, patch_games, request_event_odds, request_odds,
+)
+from .parallel import MAX_PROCESSES, PARALLEL_MIN_GAMES, run_scan
+from .poller import OddsPoller
+from .portfolio import opp_exposure, optimize_portfolio
+from .pricing import get_multiplier
+from .profiling import ScanProfile, count, profile, span
+from .replay import OddsRecorder, OddsReplay, load_recording
+from .risk import rank_by_risk, simulate_risk
+from .rounding import STAKE_STEP, round_stakes
+from .results import BetGetOpp, PromoOpp, SoccerOpp
+from .scans import SCANS, config_market, rank_opps, run_bet_get_scan, run_multi_book_soccer_scan, run_promo_scan
+from .scheduler import STALE_TTL, FetchScheduler, refresh_interval, request_cost
+from .sweep import SWEEP_FIELDS, sweep, sweep_fields
+from .synthetic import synthetic_games, synthetic_snapshot
@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from .configs import normalize_config
+from .constants import CENTRAL
+from .scans import SCANS, legs_fields, rank_opps
+
+
+# ================================================================
+# BATCH EVALUATION
+# ================================================================
+def _freeze(value):
+    return tuple(value) if isinstance(value, list) else value
+
+
+def legs_key(kind, config):
+    """Configs with equal keys enumerate exactly the same legs."""
+    return (kind,) + tuple(_freeze(config[f]) for f in legs_fields(kind, config))
+
+
+def run_batch(promos, snapshot, today=None, top_k=None):
+    """Evaluate many saved promos against one snapshot in a single pass.
+
+    `promos` is a list of {"name", "kind", "config"} dicts. Leg enumeration
+    runs once per distinct set of books and sports and is reused by every
+    promo that shares it; only pricing runs per promo. Returns
+    {name: ranked opportunities} in input order, each cut to `top_k` if given.
+    """
+    today   = today or datetime.now(CENTRAL).date()
+    legs    = {}
+    results = {}
+    for promo in promos:
+        kind   = promo['kind']
+        config = normalize_config(kind, promo['config'], today)
+        key    = legs_key(kind, config)
+        if key not in legs:
+            legs[key] = SCANS[kind].legs(config, snapshot, today)
+        results[promo['name']] = rank_opps(kind, SCANS[kind].price(config, legs[key], top_k))
+    return results
@@ -0,0 +1,194 @@
+"""Engine benchmarks over synthetic boards.
+
+    python -m engine.bench                                  # default grid
+    python -m engine.bench --games 10 100 --books 4 30 --save-baseline bench.json
+    python -m engine.bench --baseline bench.json            # exit 1 on regression
+    python -m engine.bench --games 100 400 1000 --workers 1 4   # serial against sharded
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .configs import normalize_config
+from .constants import CENTRAL
+from .odds import OddsSnapshot, build_flat_odds_3way, build_flat_odds_h2h
+from .parallel import run_scan
+from .scans import SCANS
+from .synthetic import synthetic_books, synthetic_snapshot
+
+BENCH_START = datetime(2026, 6, 15, 16, tzinfo=timezone.utc)   # fixed so every run sees the same board
+BENCH_GAMES = [10, 100, 1000]
+BENCH_BOOKS = [4, 8, 16, 30]
+REPEAT      = 5
+MAX_SECONDS = 10.0
+TOLERANCE   = 0.25
+
+
+# ================================================================
+# CASES
+# ================================================================
+def _flat(build):
+    def run(snapshot, sport_label, today, book_keys, workers):
+        return [build(game, book_keys) for game in snapshot.games[sport_label]]
+    return run
+
+def _scan(kind, fields):
+    """One engine on the case's sport; with more than one worker, sharded
+    through run_scan whatever the board size."""
+    def run(snapshot, sport_label, today, book_keys, workers):
+        config = normalize_config(kind, dict(fields, **{SCANS[kind].sports_key: [sport_label]}), today)
+        if workers > 1:
+            return run_scan(kind, config, snapshot, today, workers=workers, min_games=1)
+        return SCANS[kind].run(config, snapshot, today)
+    return run
+
+_promo   = _scan("promo", {"book": "DraftKings", "boost_val": 50, "wager": 25.0})
+_soccer  = _scan("soccer", {"book1": "DraftKings", "strat1": "Bonus Bet", "wager1": 25.0})
+_bet_get = _scan("bet_get", {"book": "DraftKings", "wager": 50.0, "bonus_val": 25.0})
+
+# case -> (run, sport label, outcomes per market; None counts rows instead of slips).
+# `run` gets the board's book keys for the flat builders; the engines find
+# every book on the board by themselves.
+CASES = {
+    "build_flat_odds_h2h":  (_flat(build_flat_odds_h2h), "MLB", None),
+    "build_flat_odds_3way": (_flat(build_flat_odds_3way), "FIFA World Cup", None),
+    "promo_2way":           (_promo, "MLB", 2),
+    "promo_3way":           (_promo, "FIFA World Cup", 3),
+    "soccer":               (_soccer, "FIFA World Cup", 3),
+    "bet_get":              (_bet_get, "MLB", 2),
+    "bet_get_3way":         (_bet_get, "FIFA World Cup", 3),
+}
+
+
+def board_combinations(snapshot, sport_label, outcomes):
+    """Distinct one-leg-per-outcome slips on the board — what the nested loops walk.
+    With `outcomes=None`, the number of price rows instead."""
+    cols  = snapshot.columns(sport_label)
+    if outcomes is None:
+        return len(cols.row_price)
+    total = 0
+    for g in range(len(cols.games)):
+        lo, hi = cols.offsets[g], cols.offsets[g + 1]
+        keep   = cols.row_size[lo:hi] == outcomes
+        counts = np.bincount(cols.row_outcome[lo:hi][keep])
+        counts = counts[counts > 0]
+        if len(counts) == outcomes:
+            total += int(np.prod(counts))
+    return total
+
+
+# ================================================================
+# RUNNER
+# ================================================================
+def bench_case(case, n_games, n_books, repeat=REPEAT, workers=1):
+    """Time one case on a fresh snapshot per run, so columnar builds are included.
+
+    With `workers` above one, engine cases run sharded across that many
+    processes; the pool is warmed first so its startup is not timed.
+    """
+    run, sport_label, outcomes = CASES[case]
+    today = BENCH_START.astimezone(CENTRAL).date()
+    board = synthetic_snapshot(n_games, n_books, seed=0, start=BENCH_START, sport_labels=[sport_label])
+    keys  = [key for key, _ in synthetic_books(n_books)]
+
+    combos  = board_combinations(board, sport_label, outcomes)
+    timings = []
+    if workers > 1:
+        run(OddsSnapshot(games=board.games), sport_label, today, keys, workers)
+    for _ in range(repeat):
+        snapshot = OddsSnapshot(games=board.games)
+        t0 = time.perf_counter()
+        run(snapshot, sport_label, today, keys, workers)
+        timings.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    run(OddsSnapshot(games=board.games), sport_label, today, keys, workers)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    p50, p90, p99 = np.percentile(timings, [50, 90, 99])
+    return {
+        "case": case, "games": n_games, "books": n_books, "workers": workers, "repeat": repeat,
+        "p50_ms": p50 * 1e3, "p90_ms": p90 * 1e3, "p99_ms": p99 * 1e3,
+        "combos": combos, "combos_per_s": combos / p50 if p50 else float('inf'),
+        "peak_mib": peak / 2**20
+    }
+
+
+def run_grid(cases, games, books, repeat=REPEAT, max_seconds=MAX_SECONDS, report=print, workers=(1,)):
+    """Every case at every size and worker count, smallest first; once a size
+    takes longer than `max_seconds` per run, larger sizes of that case are
+    skipped. The flat builders only run on one worker."""
+    results, too_slow = [], {}
+    for case in cases:
+        for n_games in sorted(games):
+            for n_books in sorted(books):
+                for n_workers in sorted(workers):
+                    limit = too_slow.get((case, n_workers))
+                    if limit and n_games >= limit[0] and n_books >= limit[1]:
+                        continue
+                    if n_workers > 1 and CASES[case][2] is None:
+                        continue
+                    row = bench_case(case, n_games, n_books, repeat, n_workers)
+                    results.append(row)
+                    report(format_row(row))
+                    if row['p50_ms'] / 1e3 > max_seconds:
+                        too_slow[(case, n_workers)] = (n_games, n_books)
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Rows whose p50 is more than `tolerance` slower than the baseline's same case and size."""
+    base = {(r['case'], r['games'], r['books'], r.get('workers', 1)): r for r in baseline}
+    regressions = []
+    for row in results:
+        old = base.get((row['case'], row['games'], row['books'], row['workers']))
+        if old and row['p50_ms'] > old['p50_ms'] * (1 + tolerance):
+            regressions.append((row, old))
+    return regressions
+
+
+def format_row(row):
+    return (f"{row['case']:<22}{row['games']:>6} games {row['books']:>3} books {row['workers']:>2} workers  "
+            f"p50 {row['p50_ms']:>10.2f} ms  p90 {row['p90_ms']:>10.2f} ms  p99 {row['p99_ms']:>10.2f} ms  "
+            f"{row['combos_per_s']:>14,.0f} combos/s  peak {row['peak_mib']:>8.2f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scan engines on synthetic boards.")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--games", nargs="+", type=int, default=BENCH_GAMES)
+    parser.add_argument("--books", nargs="+", type=int, default=BENCH_BOOKS)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1],
+                        help="also time the engines sharded across this many processes")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS,
+                        help="skip larger sizes of a case once one run takes this long")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results as the new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="allowed p50 slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    results = run_grid(args.cases, args.games, args.books, args.repeat, args.max_seconds, workers=args.workers)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for row, old in regressions:
+            print(f"REGRESSION {row['case']} {row['games']} games {row['books']} books: "
+                  f"{old['p50_ms']:.2f} -> {row['p50_ms']:.2f} ms", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import closing
+
+from .profiling import span
+
+CACHE_TTL         = 300
+CACHE_MAX_ENTRIES = 256
+
+
+# ================================================================
+# SNAPSHOT CACHES
+# ================================================================
+class SnapshotCache(ABC):
+    """Odds payloads keyed by (sport_key, market), with TTL expiry and LRU eviction.
+
+    Each entry keeps the `x-requests-remaining` value it was fetched with, and
+    the cache tracks the most recently observed quota across all entries; a
+    None (unknown) value never replaces a known one.
+    """
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl         = ttl
+        self.max_entries = max_entries
+
+    @abstractmethod
+    def entry(self, key):
+        """Returns (games, remaining, fetched_at) or None when missing or expired."""
+
+    def get(self, key):
+        """Returns (games, remaining) or None when missing or expired."""
+        entry = self.entry(key)
+        return entry[:2] if entry is not None else None
+
+    @abstractmethod
+    def put(self, key, games, remaining):
+        """Store a freshly fetched payload."""
+
+    @abstractmethod
+    def patch(self, key, games, remaining):
+        """Swap an entry's games in place, keeping its fetched_at; False when it is missing.
+
+        For event-level refreshes: the other games on the board are no newer
+        than before, so the entry must not look freshly fetched.
+        """
+
+    @abstractmethod
+    def latest_quota(self):
+        """The most recently seen quota, or None before any is known."""
+
+    def wrap(self, fetch):
+        """Turn `fetch(sport_key, market)` into a cached fetch; failures are never stored."""
+        def cached_fetch(sport_key, market='h2h'):
+            key = f"{sport_key}:{market}"
+            hit = self.get(key)
+            if hit is not None:
+                return hit
+            games, remaining = fetch(sport_key, market)
+            if games is not None:
+                self.put(key, games, remaining)
+            return games, remaining
+        return cached_fetch
+
+
+class MemorySnapshotCache(SnapshotCache):
+    """Per-process cache — the old `st.cache_data` behaviour, minus cached failures."""
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        super().__init__(ttl, max_entries)
+        self._entries = OrderedDict()
+        self._quota   = None
+        self._lock    = threading.Lock()
+
+    def entry(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[2] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, games, remaining):
+        with self._lock:
+            self._entries[key] = (games, remaining, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if remaining is not None:
+                self._quota = remaining
+
+    def patch(self, key, games, remaining):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            self._entries[key] = (games, remaining, entry[2])
+            if remaining is not None:
+                self._quota = remaining
+            return True
+
+    def latest_quota(self):
+        return self._quota
+
+
+class SQLiteSnapshotCache(SnapshotCache):
+    """Cache in a local SQLite file, shared by every process and replica that opens it."""
+
+    def __init__(self, path, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        super().__init__(ttl, max_entries)
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS odds (
+                key TEXT PRIMARY KEY, payload BLOB NOT NULL, remaining TEXT,
+                fetched_at REAL NOT NULL, used_at REAL NOT NULL)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS odds_used_at ON odds (used_at)")
+            conn.execute("""CREATE TABLE IF NOT EXISTS quota (
+                id INTEGER PRIMARY KEY CHECK (id = 0), remaining TEXT, seen_at REAL NOT NULL)""")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def entry(self, key):
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT payload, remaining, fetched_at FROM odds WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            payload, remaining, fetched_at = row
+            if now - fetched_at > self.ttl:
+                conn.execute("DELETE FROM odds WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE odds SET used_at = ? WHERE key = ?", (now, key))
+        with span("decode"):
+            games = json.loads(zlib.decompress(payload))
+        return games, remaining, fetched_at
+
+    def put(self, key, games, remaining):
+        now     = time.time()
+        payload = zlib.compress(json.dumps(games, separators=(',', ':')).encode())
+        with closing(self._connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO odds VALUES (?, ?, ?, ?, ?)", (key, payload, remaining, now, now))
+            conn.execute("DELETE FROM odds WHERE fetched_at < ?", (now - self.ttl,))
+            conn.execute("""DELETE FROM odds WHERE key IN (
+                SELECT key FROM odds ORDER BY used_at DESC LIMIT -1 OFFSET ?)""", (self.max_entries,))
+            self._note_quota(conn, remaining, now)
+
+    def patch(self, key, games, remaining):
+        now     = time.time()
+        payload = zlib.compress(json.dumps(games, separators=(',', ':')).encode())
+        with closing(self._connect()) as conn, conn:
+            patched = conn.execute("UPDATE odds SET payload = ?, remaining = ?, used_at = ? WHERE key = ?",
+                                   (payload, remaining, now, key)).rowcount
+            self._note_quota(conn, remaining, now)
+        return patched > 0
+
+    def _note_quota(self, conn, remaining, now):
+        if remaining is None:
+            return
+        conn.execute("""INSERT INTO quota VALUES (0, ?, ?) ON CONFLICT (id) DO UPDATE
+            SET remaining = excluded.remaining, seen_at = excluded.seen_at
+            WHERE excluded.seen_at >= quota.seen_at""", (remaining, now))
+
+    def latest_quota(self):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT remaining FROM quota WHERE id = 0").fetchone()
+        return row[0] if row else None
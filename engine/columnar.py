@@ -0,0 +1,159 @@
+import numpy as np
+
+from .odds import _get_market, commence_local
+from .profiling import count, span
+
+
+# ================================================================
+# COLUMNAR ODDS
+# ================================================================
+class ColumnarOdds:
+    """One sport's odds for one market, flattened once per fetch and shared by every engine.
+
+    Each row is one bookmaker's price on one outcome. Books and outcomes are
+    interned to small ints; rows for game `g` are `offsets[g]:offsets[g + 1]`,
+    in the same order `build_flat_odds_h2h` would have produced them.
+
+    `row_line` is the row's point signed so that both sides of one line share
+    it: a spread's away handicap is negated (away +3.5 and home -3.5 are both
+    -3.5), a total is kept as-is (Over and Under 8.5 are both 8.5) and match
+    results have none (0.0).
+    """
+
+    def __init__(self, games, market_key='h2h'):
+        self.games         = games
+        self.market_key    = market_key
+        self.book_keys     = []
+        self.book_titles   = []
+        self.book_ids      = {}
+        self.outcome_names = []
+        self.outcome_ids   = {}
+
+        offsets, books, outcomes, prices, sizes, points, lines = [0], [], [], [], [], [], []
+        for game in games:
+            for bm in game['bookmakers']:
+                market = _get_market(bm, market_key)
+                if not market:
+                    continue
+                book = self._intern_book(bm)
+                for o in market['outcomes']:
+                    books.append(book)
+                    outcomes.append(self._intern_outcome(o['name']))
+                    prices.append(o['price'])
+                    sizes.append(len(market['outcomes']))
+                    points.append(o.get('point', np.nan))
+                    lines.append(side_line(market_key, game, o))
+            offsets.append(len(prices))
+
+        self.offsets      = np.array(offsets, dtype=np.int32)
+        self.row_book     = np.array(books, dtype=np.int16)
+        self.row_outcome  = np.array(outcomes, dtype=np.int32)
+        self.row_price    = np.array(prices, dtype=np.float64)
+        self.row_size     = np.array(sizes, dtype=np.int8)
+        self.row_point    = np.array(points, dtype=np.float64)
+        self.row_line     = np.array(lines, dtype=np.float64)
+        self.local_times  = [commence_local(game) for game in games]
+        self._legs        = {}
+
+    def _intern_book(self, bm):
+        book = self.book_ids.get(bm['key'])
+        if book is None:
+            book = self.book_ids[bm['key']] = len(self.book_keys)
+            self.book_keys.append(bm['key'])
+            self.book_titles.append(bm['title'])
+        return book
+
+    def _intern_outcome(self, name):
+        outcome = self.outcome_ids.get(name)
+        if outcome is None:
+            outcome = self.outcome_ids[name] = len(self.outcome_names)
+            self.outcome_names.append(name)
+        return outcome
+
+    def book_id(self, name):
+        """Id of the book with Odds API key or title `name`, or None if it quotes nothing here."""
+        book = self.book_ids.get(name)
+        if book is None and name in self.book_titles:
+            book = self.book_titles.index(name)
+        return book
+
+    def book_mask(self, book_keys, exclude=()):
+        """Boolean lookup over book ids for book keys or titles, less `exclude`.
+
+        `book_keys=None` selects every book on the board, so books are
+        discovered from the odds rather than a fixed list.
+        """
+        mask = np.full(len(self.book_keys), book_keys is None)
+        for names, value in ((book_keys or (), True), (exclude, False)):
+            for name in names:
+                book = self.book_id(name)
+                if book is not None:
+                    mask[book] = value
+        return mask
+
+    def games_between(self, start_date, end_date):
+        """Indices of games whose local kickoff date falls in [start_date, end_date]."""
+        with span("date_filter"):
+            games = [g for g, t in enumerate(self.local_times) if start_date <= t.date() <= end_date]
+        count("games_considered", len(self.local_times))
+        count("games_in_window", len(games))
+        return games
+
+    def rows(self, g, book_mask, outcome_count=None):
+        """Row indices of game `g` quoted by books in `book_mask`, optionally only
+        from markets listing exactly `outcome_count` outcomes."""
+        lo, hi = self.offsets[g], self.offsets[g + 1]
+        keep = book_mask[self.row_book[lo:hi]]
+        if outcome_count is not None:
+            keep &= self.row_size[lo:hi] == outcome_count
+        return (np.flatnonzero(keep) + lo).tolist()
+
+    def best_by_side(self, rows):
+        """{(outcome id, line): best-priced row} over `rows`; ties keep the first row.
+
+        A leg's hedge is the best row on the other outcome at the same line,
+        so matching a leg is one lookup rather than a pass over every row.
+        """
+        best, best_price = {}, {}
+        for row, outcome, line, price in zip(rows, self.row_outcome[rows].tolist(),
+                                             self.row_line[rows].tolist(), self.row_price[rows].tolist()):
+            side = (outcome, line)
+            if side not in best or price > best_price[side]:
+                best[side], best_price[side] = row, price
+        return best
+
+    def teams(self, rows):
+        """Distinct outcome names for `rows`, in order of first appearance.
+
+        Fixed order rather than set order, so every process (and every shard of
+        a parallel scan) assigns the same outcome to each soccer leg.
+        """
+        names = self.outcome_names
+        return list(dict.fromkeys(names[o] for o in self.row_outcome[rows].tolist()))
+
+    def leg(self, row):
+        """The row as the flat-odds dict the result rows are built from."""
+        leg = self._legs.get(row)
+        if leg is None:
+            price = self.row_price[row].item()
+            leg = self._legs[row] = {
+                'book_key':   self.book_keys[self.row_book[row]],
+                'book_title': self.book_titles[self.row_book[row]],
+                'team':       self.outcome_names[self.row_outcome[row]],
+                'price':      int(price) if price.is_integer() else price
+            }
+            point = self.row_point[row].item()
+            if point == point:   # not NaN: spreads and totals name the line with the outcome
+                leg['point'] = point
+                leg['team']  = f"{leg['team']} {point:+g}" if self.market_key == 'spreads' else f"{leg['team']} {point:g}"
+        return leg
+
+
+def side_line(market_key, game, outcome):
+    """The outcome's point as stored in `row_line`."""
+    point = outcome.get('point')
+    if point is None:
+        return 0.0
+    if market_key == 'spreads' and outcome['name'] == game.get('away_team'):
+        return -point
+    return point
@@ -0,0 +1,98 @@
+from datetime import date, datetime, timedelta
+
+from .constants import CENTRAL, book_map, market_labels, sports_map
+
+PROMO_TYPES = ["Profit Boost (%)", "Bonus Bet", "No-Sweat Bet"]
+LEG_TYPES   = ["Straight Cash"] + PROMO_TYPES
+
+SOCCER_LEAGUES = [label for label, key in sports_map.items() if key.startswith("soccer")]
+
+_LEG_DEFAULTS = {"strat{}": "Straight Cash", "boost{}": 0, "wager{}": 0.0, "cap{}_val": 0.0}
+
+
+def leg_count(config):
+    """Legs of a soccer-engine config: one per outcome of the markets it scans."""
+    return config.get("legs", 3)
+
+
+def book_key(name):
+    """Odds API key for a config book name.
+
+    book_map titles map to their keys; any other name is kept as given and
+    matched on the board by key or title, so every bookmaker a fetch
+    returns can be named without adding it to book_map.
+    """
+    return book_map.get(name, name)
+
+
+# ================================================================
+# CONFIG NORMALIZATION
+# ================================================================
+def normalize_config(kind, config, today=None):
+    """Fill defaults and validate a promo config the way the forms build it.
+
+    Lets configs come from JSON files or saved lists: missing fields take the
+    form defaults and `lookahead_end_date` may be an ISO date string. Empty
+    book lists mean every book on the board, less `exclude_books`, and empty
+    sports mean every sport (every soccer league for `leagues`). Raises
+    ValueError on malformed books or unknown sports, markets or promo types.
+    """
+    today = today or datetime.now(CENTRAL).date()
+    c = dict(config)
+    c["exclude_books"] = list(c.get("exclude_books") or [])
+
+    if kind == "promo":
+        c.setdefault("strat", PROMO_TYPES[0])
+        c.setdefault("boost_val", 0)
+        c.setdefault("wager", 0.0)
+        c.setdefault("hedge_books", [])
+        c.setdefault("market", "h2h")
+        c.setdefault("prune_dominated", True)
+        c["sports"] = list(c.get("sports") or sports_map)
+        _check_books([c["book"]] + c["hedge_books"] + c["exclude_books"])
+        _check_choice("strat", c["strat"], PROMO_TYPES)
+        _check_choice("market", c["market"], list(market_labels))
+    elif kind == "soccer":
+        c["legs"] = leg_count(c)
+        if not isinstance(c["legs"], int) or c["legs"] < 2:
+            raise ValueError(f"legs must be a whole number of at least 2, not '{c['legs']}'")
+        for n in range(1, c["legs"] + 1):
+            for field, default in _LEG_DEFAULTS.items():
+                c.setdefault(field.format(n), default)
+            _check_choice(f"strat{n}", c[f"strat{n}"], LEG_TYPES)
+            if n > 1:
+                c[f"book{n}"] = list(c.get(f"book{n}") or [])
+                _check_books(c[f"book{n}"])
+        c.setdefault("prune_dominated", True)
+        c["leagues"] = list(c.get("leagues") or SOCCER_LEAGUES)
+        _check_books([c["book1"]] + c["exclude_books"])
+        end = c.get("lookahead_end_date") or today + timedelta(days=3)
+        c["lookahead_end_date"] = end if isinstance(end, date) else date.fromisoformat(end)
+    elif kind == "bet_get":
+        c.setdefault("wager", 0.0)
+        c.setdefault("bonus_val", 0.0)
+        c.setdefault("hedge_books", [])
+        c.setdefault("market", "h2h")
+        c["sports"] = list(c.get("sports") or sports_map)
+        _check_books([c["book"]] + c["hedge_books"] + c["exclude_books"])
+        _check_choice("market", c["market"], list(market_labels))
+    else:
+        raise ValueError(f"Unknown engine '{kind}'")
+
+    _check_sports(c.get("sports") or c.get("leagues") or [])
+    return c
+
+
+def _check_books(books):
+    malformed = [b for b in books if not isinstance(b, str) or not b.strip()]
+    if malformed:
+        raise ValueError(f"Book names must be book titles or Odds API keys, not {', '.join(map(repr, malformed))}")
+
+def _check_sports(sports):
+    unknown = [s for s in sports if s not in sports_map]
+    if unknown:
+        raise ValueError(f"Unknown sport(s): {', '.join(map(str, unknown))}")
+
+def _check_choice(field, value, choices):
+    if value not in choices:
+        raise ValueError(f"{field} must be one of {', '.join(choices)}, not '{value}'")
@@ -0,0 +1,27 @@
+from zoneinfo import ZoneInfo
+
+# --- CONSTANTS ---
+CENTRAL      = ZoneInfo("America/Chicago")
+CONV_NOSWEAT = 0.65
+CONV_BETGET  = 0.65
+
+book_map = {
+    "DraftKings":      "draftkings",
+    "FanDuel":         "fanduel",
+    "theScore / ESPN": "espnbet",
+    "BetMGM":          "betmgm"
+}
+
+sports_map = {
+    "WNBA":           "basketball_wnba",
+    "MLB":            "baseball_mlb",
+    "FIFA World Cup": "soccer_fifa_world_cup"
+}
+
+# Odds API market key -> label shown on results. Also the order markets are
+# requested in, so equal sets of markets always make the same request.
+market_labels = {
+    "h2h":     "Match Result",
+    "spreads": "Spread",
+    "totals":  "Total"
+}
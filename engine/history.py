@@ -0,0 +1,226 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+
+from .configs import normalize_config
+from .constants import CENTRAL, sports_map
+from .odds import OddsSnapshot, commence_local
+from .parallel import run_scan
+
+
+# ================================================================
+# ODDS HISTORY
+# ================================================================
+# Prices are stored as a change log: a row is appended only when a
+# (game, book, outcome) price differs from the last one recorded, and a NULL
+# price marks an outcome that left the board. Games, books and outcomes are
+# interned into small integer ids, so each price row is five integers.
+
+class OddsHistory:
+    """Append-only record of every bookmaker price seen, in a local SQLite file.
+
+    Feed it with `record(sport_key, market, games)` or wrap a fetch with
+    `wrap(fetch)` (`wrap_event` for single-event fetches). Query it with `line_history` for one game's movement,
+    `snapshot_at` to rebuild the board as it stood at a past time, and
+    `pull_times` to list when each sport was fetched.
+    """
+
+    def __init__(self, path):
+        self.path  = path
+        self._ids  = {}   # (table, natural key) -> id
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""CREATE TABLE IF NOT EXISTS games (
+                id INTEGER PRIMARY KEY, event_id TEXT UNIQUE NOT NULL, sport_key TEXT NOT NULL,
+                commence REAL NOT NULL, home_team TEXT, away_team TEXT)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS games_sport_commence ON games (sport_key, commence)")
+            conn.execute("""CREATE TABLE IF NOT EXISTS books (
+                id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, title TEXT NOT NULL)""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS outcomes (
+                id INTEGER PRIMARY KEY, market TEXT NOT NULL, name TEXT NOT NULL, point REAL NOT NULL,
+                UNIQUE (market, name, point))""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS prices (
+                game INTEGER NOT NULL, book INTEGER NOT NULL, outcome INTEGER NOT NULL, ts INTEGER NOT NULL,
+                price INTEGER, PRIMARY KEY (game, book, outcome, ts)) WITHOUT ROWID""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS latest (
+                game INTEGER NOT NULL, book INTEGER NOT NULL, outcome INTEGER NOT NULL, ts INTEGER NOT NULL,
+                price INTEGER, PRIMARY KEY (game, book, outcome)) WITHOUT ROWID""")
+            conn.execute("""CREATE TABLE IF NOT EXISTS pulls (
+                sport_key TEXT NOT NULL, market TEXT NOT NULL, ts INTEGER NOT NULL,
+                games INTEGER NOT NULL, changes INTEGER NOT NULL)""")
+            conn.execute("CREATE INDEX IF NOT EXISTS pulls_sport_ts ON pulls (sport_key, ts)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def _intern(self, conn, table, key, insert, values):
+        """Id of a games / books / outcomes row, inserting it on first sight."""
+        cache_key = (table, key)
+        with self._lock:
+            if cache_key in self._ids:
+                return self._ids[cache_key]
+        conn.execute(insert, values)
+        where = {"games": "event_id = ?", "books": "key = ?", "outcomes": "market = ? AND name = ? AND point = ?"}[table]
+        row_id = conn.execute(f"SELECT id FROM {table} WHERE {where}", key).fetchone()[0]
+        with self._lock:
+            self._ids[cache_key] = row_id
+        return row_id
+
+    # --- RECORD ---
+    def record(self, sport_key, market, games, at=None, partial=False):
+        """Append the price changes in one API response; returns how many rows were written.
+
+        A `partial` response covers only the games in it (an event-level
+        pull), so the sport's other games are not marked as gone.
+        """
+        at      = int(at or time.time())
+        markets = market.split(',')
+        with closing(self._connect()) as conn, conn:
+            current, pulled = {}, set()
+            for game in games:
+                game_id = self._intern(conn, "games", (game['id'],),
+                    "INSERT OR IGNORE INTO games VALUES (NULL, ?, ?, ?, ?, ?)",
+                    (game['id'], sport_key, commence_local(game).timestamp(), game.get('home_team'), game.get('away_team')))
+                pulled.add(game_id)
+                for bm in game['bookmakers']:
+                    book_id = self._intern(conn, "books", (bm['key'],),
+                        "INSERT OR IGNORE INTO books VALUES (NULL, ?, ?)", (bm['key'], bm['title']))
+                    for mkt in bm['markets']:
+                        if mkt['key'] not in markets:
+                            continue
+                        for outcome in mkt['outcomes']:
+                            key = (mkt['key'], outcome['name'], float(outcome.get('point', 0.0)))
+                            outcome_id = self._intern(conn, "outcomes", key,
+                                "INSERT OR IGNORE INTO outcomes VALUES (NULL, ?, ?, ?)", key)
+                            current[(game_id, book_id, outcome_id)] = outcome['price']
+
+            marks    = ",".join("?" * len(markets))
+            previous = {row[:3]: row[3] for row in conn.execute(f"""
+                SELECT l.game, l.book, l.outcome, l.price FROM latest l
+                JOIN games g ON g.id = l.game JOIN outcomes o ON o.id = l.outcome
+                WHERE g.sport_key = ? AND o.market IN ({marks}) AND l.price IS NOT NULL""", (sport_key, *markets))}
+            changes  = [(*key, at, price) for key, price in current.items() if previous.get(key) != price]
+            changes += [(*key, at, None) for key in previous
+                        if key not in current and (not partial or key[0] in pulled)]
+
+            conn.executemany("INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?)", changes)
+            conn.executemany("INSERT OR REPLACE INTO latest VALUES (?, ?, ?, ?, ?)", changes)
+            conn.execute("INSERT INTO pulls VALUES (?, ?, ?, ?, ?)", (sport_key, market, at, len(games), len(changes)))
+        return len(changes)
+
+    def wrap(self, fetch):
+        """Turn `fetch(sport_key, market)` into a fetch that records every successful pull."""
+        def recorded_fetch(sport_key, market='h2h'):
+            games, remaining = fetch(sport_key, market)
+            if games:
+                self.record(sport_key, market, games)
+            return games, remaining
+        return recorded_fetch
+
+    def wrap_event(self, fetch_event):
+        """Turn `fetch_event(sport_key, event_id, market)` into a fetch that records every game it returns."""
+        def recorded_fetch_event(sport_key, event_id, market='h2h'):
+            game, remaining = fetch_event(sport_key, event_id, market)
+            if game:
+                self.record(sport_key, market, [game], partial=True)
+            return game, remaining
+        return recorded_fetch_event
+
+    # --- QUERY ---
+    def pull_times(self, sport_keys, since=None, until=None):
+        """Distinct times (epoch seconds) any of `sport_keys` was recorded, oldest first."""
+        marks = ",".join("?" * len(sport_keys))
+        rows  = self._query(f"""SELECT DISTINCT ts FROM pulls WHERE sport_key IN ({marks})
+            AND ts BETWEEN ? AND ? ORDER BY ts""", (*sport_keys, since or 0, until or 2 ** 62))
+        return [ts for ts, in rows]
+
+    def games(self, sport_key, since=None, until=None):
+        """Recorded games of a sport commencing in [since, until], as dicts, soonest first."""
+        rows = self._query("""SELECT event_id, commence, home_team, away_team FROM games
+            WHERE sport_key = ? AND commence BETWEEN ? AND ? ORDER BY commence""",
+            (sport_key, since or 0, until or 2 ** 62))
+        return [{"id": event_id, "commence": commence, "home_team": home, "away_team": away}
+                for event_id, commence, home, away in rows]
+
+    def line_history(self, event_id, market='h2h', book=None):
+        """Every recorded price change of one game, oldest first; `price` is None once an outcome left the board."""
+        sql = """SELECT p.ts, b.key, b.title, o.name, o.point, p.price FROM prices p
+            JOIN games g ON g.id = p.game JOIN books b ON b.id = p.book JOIN outcomes o ON o.id = p.outcome
+            WHERE g.event_id = ? AND o.market = ?"""
+        params = [event_id, market]
+        if book is not None:
+            sql += " AND b.key = ?"
+            params.append(book)
+        rows = self._query(sql + " ORDER BY p.ts, p.book, p.outcome", params)
+        return [{"time": ts, "book": key, "book_title": title, "outcome": name,
+                 "point": point if market != 'h2h' else None, "price": price}
+                for ts, key, title, name, point, price in rows]
+
+    def snapshot_at(self, at, sport_labels=None):
+        """The board as it stood at `at` (epoch seconds), as an OddsSnapshot for any engine."""
+        boards = {}
+        for sport_label in sport_labels or sports_map:
+            rows = self._query("""SELECT g.event_id, g.commence, g.home_team, g.away_team,
+                    b.key, b.title, o.market, o.name, o.point, p.price, p.ts
+                FROM prices p
+                JOIN games g ON g.id = p.game JOIN books b ON b.id = p.book JOIN outcomes o ON o.id = p.outcome
+                WHERE g.sport_key = ? AND p.ts = (SELECT MAX(q.ts) FROM prices q WHERE q.game = p.game
+                    AND q.book = p.book AND q.outcome = p.outcome AND q.ts <= ?)
+                ORDER BY g.commence, g.id, p.book, p.outcome""", (sports_map[sport_label], int(at)))
+            games = {}
+            for event_id, commence, home, away, book_key, title, market, name, point, price, ts in rows:
+                if price is None:
+                    continue
+                game = games.setdefault(event_id, {
+                    "id": event_id, "sport_key": sports_map[sport_label], "commence_time": _iso(commence),
+                    "home_team": home, "away_team": away, "bookmakers": {}})
+                bm = game['bookmakers'].setdefault(book_key, {"key": book_key, "title": title, "last_update": ts, "markets": {}})
+                bm['last_update'] = max(bm['last_update'], ts)
+                outcome = {"name": name, "price": price}
+                if market != 'h2h':
+                    outcome['point'] = point
+                bm['markets'].setdefault(market, {"key": market, "outcomes": []})['outcomes'].append(outcome)
+            for game in games.values():
+                game['bookmakers'] = [
+                    {**bm, "last_update": _iso(bm['last_update']), "markets": list(bm['markets'].values())}
+                    for bm in game['bookmakers'].values()]
+            if games:
+                boards[sport_label] = list(games.values())
+        return OddsSnapshot(games=boards)
+
+    def _query(self, sql, params):
+        with closing(self._connect()) as conn:
+            return conn.execute(sql, params).fetchall()
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+# ================================================================
+# BACKTESTS
+# ================================================================
+def conversion_backtest(history, book, sport_labels, since=None, until=None, hedge_books=()):
+    """Best bonus-bet conversion `book` offered at every recorded pull.
+
+    Replays a $100 Bonus Bet promo scan over `history.snapshot_at` each pull
+    time, giving the realized counterpart of the flat CONV_NOSWEAT and
+    CONV_BETGET rates. Returns [{time, conversion, game}] oldest first;
+    conversion is None when nothing could be hedged.
+    """
+    config = normalize_config("promo", {"book": book, "strat": "Bonus Bet", "wager": 100.0,
+                                        "sports": list(sport_labels), "hedge_books": list(hedge_books)})
+    out = []
+    for at in history.pull_times([sports_map[label] for label in sport_labels], since, until):
+        snapshot = history.snapshot_at(at, sport_labels)
+        today    = datetime.fromtimestamp(at, CENTRAL).date()
+        best     = run_scan("promo", config, snapshot, today=today, top_k=1, workers=1)
+        out.append({"time": at, "conversion": best[0]['exact_profit'] / config['wager'] if best else None,
+                    "game": best[0]['game'] if best else None})
+    return out
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import pickle
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from .configs import normalize_config
+from .constants import CENTRAL
+from .odds import OddsSnapshot
+from .parallel import game_label, run_scan
+from .profiling import count, span
+from .scans import SCANS
+
+MEMO_MAX_RESULTS = 64       # whole ranked results kept
+MEMO_MAX_UNITS   = 20_000   # per-label results kept for partial reuse
+
+
+def game_digest(sport_label, game):
+    """Content hash of one game's odds; equal digests mean identical payloads."""
+    return hashlib.blake2b(pickle.dumps((sport_label, game), protocol=5), digest_size=16).digest()
+
+
+class _Units:
+    """Games grouped by label as sports land, with each label's digest so far.
+
+    Engines dedup on the game label, so all games sharing a label are one
+    unit: its results depend on nothing else on the board. A game's board
+    position is (sport's place in the config, index in its payload), so
+    units and ties come out the same whatever order the sports land in.
+    """
+
+    def __init__(self, sport_labels):
+        self.order    = {label: i for i, label in enumerate(sport_labels)}
+        self.games    = {}   # label -> [(position, sport label, game, digest)], board order
+        self.digests  = {}   # label -> digest over its games landed so far
+        self.position = {}   # game id -> board position
+
+    def add(self, sport_label, games):
+        """File one landed sport; returns the labels it touched, in board order."""
+        touched = {}
+        for i, game in enumerate(games):
+            position = (self.order[sport_label], i)
+            label    = game_label(game)
+            self.games.setdefault(label, []).append((position, sport_label, game, game_digest(sport_label, game)))
+            self.position[game.get('id')] = position
+            touched[label] = None
+        for label in touched:
+            self.games[label].sort(key=lambda entry: entry[0])
+            self.digests[label] = hashlib.blake2b(b"".join(entry[3] for entry in self.games[label]),
+                                                  digest_size=16).digest()
+        return list(touched)
+
+    def snapshot(self, labels):
+        """An OddsSnapshot of just the games under `labels`, sports and games in board order."""
+        entries = sorted((entry for label in labels for entry in self.games[label]), key=lambda entry: entry[0])
+        games   = {}
+        for _, sport_label, game, _ in entries:
+            games.setdefault(sport_label, []).append(game)
+        return OddsSnapshot(games=games)
+
+    def board(self):
+        """Digest of the whole board: every label's digest in board order."""
+        labels = sorted(self.digests, key=lambda label: self.games[label][0][0])
+        return hashlib.blake2b(b"".join(self.digests[label] for label in labels), digest_size=16).digest()
+
+
+# ================================================================
+# RESULT CACHE
+# ================================================================
+class ResultCache:
+    """Ranked engine results memoized on the normalized config and the odds content.
+
+    A repeat of a scan over an unchanged board returns the stored ranking
+    without touching an engine. Results are also kept per game label, so
+    when only some games moved, only those labels are scanned again and
+    the rest are reused. Both stores evict least recently used entries.
+
+    A streaming snapshot is hashed and scanned sport by sport as payloads
+    land. A label that shows up again in a later sport is scanned again
+    with all of its games.
+    """
+
+    def __init__(self, max_results=MEMO_MAX_RESULTS, max_units=MEMO_MAX_UNITS):
+        self.max_results = max_results
+        self.max_units   = max_units
+        self._results    = OrderedDict()
+        self._units      = OrderedDict()
+        self._lock       = threading.Lock()
+
+    def _get(self, store, key):
+        with self._lock:
+            value = store.get(key)
+            if value is not None:
+                store.move_to_end(key)
+            return value
+
+    def _put(self, store, key, value, limit):
+        with self._lock:
+            store[key] = value
+            store.move_to_end(key)
+            while len(store) > limit:
+                store.popitem(last=False)
+
+    def run_scan(self, kind, config, snapshot, today=None, top_k=None, **scan_kwargs):
+        """`parallel.run_scan` for the normalized `config`, served from the cache where the odds allow.
+
+        Extra keyword arguments go to run_scan for the labels that need a scan.
+        Returns fresh dicts, so callers may annotate them.
+        """
+        today  = today or datetime.now(CENTRAL).date()
+        config = normalize_config(kind, config, today)
+        scope  = (kind, json.dumps(config, sort_keys=True, default=str), today)
+        units  = _Units(config[SCANS[kind].sports_key])
+
+        by_label, rescanned, n_scans = {}, set(), 0
+        for sport_label, games in snapshot.iter_sports(config[SCANS[kind].sports_key]):
+            with span("memo_hash"):
+                touched = units.add(sport_label, games)
+            stale = []
+            for label in touched:
+                opps = self._get(self._units, scope + (units.digests[label],))
+                if opps is None:
+                    stale.append(label)
+                else:
+                    by_label[label] = opps
+            if not stale:
+                continue
+            changed  = units.snapshot(stale)
+            label_of = {game.get('id'): game_label(game) for games in changed.games.values() for game in games}
+            scanned  = {label: [] for label in stale}
+            for op in run_scan(kind, config, changed, today, top_k=None, **scan_kwargs):
+                scanned[label_of[op['game_id']]].append(op)
+            for label, label_opps in scanned.items():
+                by_label[label] = tuple(label_opps)
+                self._put(self._units, scope + (units.digests[label],), by_label[label], self.max_units)
+            rescanned.update(stale)
+            n_scans += len(stale)
+        count("units_reused", len(by_label) - len(rescanned))
+        count("units_scanned", n_scans)
+
+        board = units.board()
+        opps  = self._get(self._results, scope + (top_k, board))
+        if opps is not None:
+            count("memo_hits")
+            return [dict(op) for op in opps]
+
+        # Ties rank in board order, as in one scan of the whole board.
+        with span("merge"):
+            rank_key = SCANS[kind].rank_key
+            opps     = sorted((op for label_opps in by_label.values() for op in label_opps),
+                              key=lambda op: (-op[rank_key], units.position[op['game_id']]))
+            opps     = tuple(opps[:top_k] if top_k else opps)
+        self._put(self._results, scope + (top_k, board), opps, self.max_results)
+        return [dict(op) for op in opps]
@@ -0,0 +1,264 @@
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .constants import CENTRAL, market_labels, sports_map
+from .profiling import count, span, with_profile
+
+
+# --- API FETCHING ---
+ODDS_URL    = "https://api.the-odds-api.com/v4/sports/{sport_key}/odds/"
+EVENT_URL   = "https://api.the-odds-api.com/v4/sports/{sport_key}/events/{event_id}/odds/"
+REGIONS     = 'us,us2'
+MAX_WORKERS = 4
+RETRY       = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=("GET",), raise_on_status=False)
+
+_session      = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """One keep-alive connection pool shared by every fetch in the process."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.mount("https://", HTTPAdapter(pool_connections=MAX_WORKERS,
+                                                   pool_maxsize=MAX_WORKERS, max_retries=RETRY))
+        return _session
+
+def odds_params(api_key, market='h2h', bookmakers=None):
+    """Query parameters shared by the sport and event odds endpoints."""
+    params = {
+        'apiKey':     api_key,
+        'regions':    REGIONS,
+        'markets':    market,
+        'oddsFormat': 'american'
+    }
+    if bookmakers:
+        del params['regions']
+        params['bookmakers'] = ','.join(bookmakers)
+    return params
+
+def request_odds(sport_key, api_key, market='h2h', bookmakers=None):
+    """The raw odds response. Passing `bookmakers` asks for just those books
+    instead of whole regions, which the API bills at one region per 10 books."""
+    return get_session().get(ODDS_URL.format(sport_key=sport_key),
+                             params=odds_params(api_key, market, bookmakers), timeout=10)
+
+def request_event_odds(sport_key, event_id, api_key, market='h2h', bookmakers=None):
+    """The raw odds response for one event; billed like a whole-sport call."""
+    return get_session().get(EVENT_URL.format(sport_key=sport_key, event_id=event_id),
+                             params=odds_params(api_key, market, bookmakers), timeout=10)
+
+def markets_param(markets):
+    """One `markets` value covering every market in `markets`. The API returns
+    them all in one response, and the fixed order gives equal sets one cache key."""
+    wanted = set(markets)
+    return ','.join([m for m in market_labels if m in wanted] + sorted(wanted - set(market_labels)))
+
+def odds_result(status, headers, body):
+    """(games, remaining) for a response; on failure games is None and remaining holds the reason.
+
+    `remaining` is None when the response carries no quota header: unknown, not spent.
+    """
+    if status == 200 and not isinstance(body, str):
+        return body, headers.get('x-requests-remaining')
+    if status == 200:
+        return None, "Invalid JSON"
+    return None, f"HTTP {status}"
+
+def fetch_odds(sport_key, api_key, market='h2h', bookmakers=None):
+    """Returns (games, remaining); on failure games is None and remaining holds the reason."""
+    try:
+        with span("fetch"):
+            res = request_odds(sport_key, api_key, market, bookmakers)
+        count("fetches")
+        with span("decode"):
+            body = res.json() if res.status_code == 200 else None
+        return odds_result(res.status_code, res.headers, body)
+    except requests.exceptions.RequestException as e:
+        return None, type(e).__name__
+
+def fetch_event_odds(sport_key, event_id, api_key, market='h2h', bookmakers=None):
+    """Returns (game, remaining) for one event, like `fetch_odds`; "HTTP 404" means it left the board."""
+    try:
+        with span("fetch"):
+            res = request_event_odds(sport_key, event_id, api_key, market, bookmakers)
+        count("fetches")
+        with span("decode"):
+            body = res.json() if res.status_code == 200 else None
+        return odds_result(res.status_code, res.headers, body)
+    except requests.exceptions.RequestException as e:
+        return None, type(e).__name__
+
+def patch_games(games, fresh, gone=()):
+    """`games` with each game in `fresh` ({id: game}) swapped in and the ids in `gone` dropped, order kept."""
+    return [fresh.get(game['id'], game) for game in games if game['id'] not in gone]
+
+
+# --- SNAPSHOT ---
+@dataclass
+class OddsSnapshot:
+    """Raw Odds API games keyed by sport label, plus the quota seen while fetching.
+
+    A snapshot returned by `load_snapshot` may still be streaming in: sports are
+    stored as their fetches complete, so engines can start on the first payload.
+    """
+    games:     dict = field(default_factory=dict)
+    remaining: str | None = None
+    errors:    dict = field(default_factory=dict)
+    _pending:  Iterator | None = field(default=None, repr=False)
+    _columns:  dict = field(default_factory=dict, repr=False)
+
+    def _store(self, sport_label, games, remaining):
+        if not games:
+            self.errors[sport_label] = remaining if games is None else "No events"
+            return
+        self.games[sport_label] = games
+        if self.remaining is None or _quota_value(remaining) < _quota_value(self.remaining):
+            self.remaining = remaining
+
+    def _next_pending(self):
+        try:
+            with span("fetch_wait"):
+                item = next(self._pending)
+        except StopIteration:
+            self._pending = None
+            return None
+        self._store(*item)
+        return item
+
+    @property
+    def streaming(self):
+        """True while some fetch has not landed yet."""
+        return self._pending is not None
+
+    def wait(self):
+        """Block until every pending fetch has landed."""
+        while self._pending is not None:
+            self._next_pending()
+        return self
+
+    def iter_sports(self, sport_labels):
+        """Yield (sport_label, games) for each requested sport, in arrival order."""
+        for sport_label in sport_labels:
+            if sport_label in self.games:
+                yield sport_label, self.games[sport_label]
+        while self._pending is not None:
+            item = self._next_pending()
+            if item and item[1] and item[0] in sport_labels:
+                yield item[0], item[1]
+
+    def sport_games(self, sport_label):
+        if sport_label not in self.games:
+            self.wait()
+        return self.games.get(sport_label) or []
+
+    def columns(self, sport_label, market_key='h2h'):
+        """The sport's ColumnarOdds, built on first use and shared by every engine."""
+        from .columnar import ColumnarOdds
+        key = (sport_label, market_key)
+        if key not in self._columns:
+            games = self.sport_games(sport_label)
+            with span("flatten"):
+                self._columns[key] = ColumnarOdds(games, market_key)
+        return self._columns[key]
+
+    def books(self):
+        """{book key: title} of every bookmaker on the loaded boards, in order of first appearance."""
+        books = {}
+        for games in self.games.values():
+            for game in games:
+                for bm in game['bookmakers']:
+                    books.setdefault(bm['key'], bm['title'])
+        return books
+
+    def iter_columns(self, sport_labels, market_key='h2h'):
+        """iter_sports, yielding each sport's ColumnarOdds instead of raw games."""
+        for sport_label, _ in self.iter_sports(sport_labels):
+            yield sport_label, self.columns(sport_label, market_key)
+
+
+def _quota_value(remaining):
+    try:
+        return float(remaining)
+    except (TypeError, ValueError):
+        return float('inf')
+
+
+def _as_completed(pool, futures):
+    try:
+        for fut in as_completed(futures):
+            yield (futures[fut], *fut.result())
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def load_snapshot(sport_labels, fetch, market='h2h', max_workers=MAX_WORKERS, stream=False):
+    """Fetch every sport concurrently through `fetch(sport_key, market)`.
+
+    With `stream=True` the snapshot is returned immediately and fills in as
+    each sport's payload arrives; otherwise it is fully loaded on return.
+    """
+    sport_labels = list(dict.fromkeys(sport_labels))
+    snapshot = OddsSnapshot()
+    if not sport_labels:
+        return snapshot
+    pool    = ThreadPoolExecutor(max_workers=min(max_workers, len(sport_labels)))
+    futures = {pool.submit(with_profile(fetch), sports_map[label], market): label for label in sport_labels}
+    snapshot._pending = _as_completed(pool, futures)
+    return snapshot if stream else snapshot.wait()
+
+
+def commence_local(game):
+    commence_time = datetime.fromisoformat(game['commence_time'].replace('Z', '+00:00'))
+    return commence_time.astimezone(CENTRAL)
+
+
+# --- FLAT ODDS HELPERS ---
+
+def _get_market(bm, market_key):
+    return next((m for m in bm['markets'] if m['key'] == market_key), None)
+
+def build_flat_odds_h2h(game, allowed_keys):
+    """All h2h outcomes as-is — works for both 2-way and 3-way."""
+    flat = []
+    for bm in game['bookmakers']:
+        if bm['key'] not in allowed_keys:
+            continue
+        market = _get_market(bm, 'h2h')
+        if not market:
+            continue
+        for o in market['outcomes']:
+            flat.append({
+                'book_key':   bm['key'],
+                'book_title': bm['title'],
+                'team':       o['name'],
+                'price':      o['price']
+            })
+    return flat
+
+def build_flat_odds_3way(game, allowed_keys):
+    """Only bookmakers offering exactly 3 h2h outcomes (Match Result with Draw)."""
+    flat = []
+    for bm in game['bookmakers']:
+        if bm['key'] not in allowed_keys:
+            continue
+        market = _get_market(bm, 'h2h')
+        if not market or len(market['outcomes']) != 3:
+            continue
+        for o in market['outcomes']:
+            flat.append({
+                'book_key':   bm['key'],
+                'book_title': bm['title'],
+                'team':       o['name'],
+                'price':      o['price']
+            })
+    return flat
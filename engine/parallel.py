@@ -0,0 +1,117 @@
+import heapq
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .odds import OddsSnapshot
+from .profiling import count, span
+from .scans import SCANS, rank_opps
+
+# Sharding copies every game to a worker and every ranking back, and that copy
+# costs about as much as scanning the game. `python -m engine.bench --games 100
+# 400 1000 2000 --books 8 --workers 1 2` on one core (so the sharded time is
+# the serial scan plus everything sharding adds), p50 at 1000 games:
+#
+#     promo_2way     81 ms serial   171 ms sharded   +90 ms
+#     promo_3way    415 ms serial   662 ms sharded  +247 ms
+#     soccer        102 ms serial   214 ms sharded  +112 ms
+#     bet_get        98 ms serial   176 ms sharded   +78 ms
+#     bet_get_3way  264 ms serial   261 ms sharded    +0 ms
+#
+# The extra time grows with the board, so no game count makes it vanish. With
+# W cores a sharded scan takes about extra + serial / W, which at four cores
+# beats serial only for 3-way promos, and only from about 1000 games. Scans
+# therefore run on the calling thread unless a caller asks for workers.
+PARALLEL_MIN_GAMES = 1000
+MAX_PROCESSES      = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+_pools     = {}
+_pool_lock = threading.Lock()
+
+def get_pool(executor="process", workers=MAX_PROCESSES):
+    """One long-lived pool per (executor, workers). Processes are spawned, not
+    forked, since the UI process runs its own threads."""
+    with _pool_lock:
+        pool = _pools.get((executor, workers))
+        if pool is None:
+            if executor == "process":
+                pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                pool = ThreadPoolExecutor(workers, thread_name_prefix="scan-shard")
+            _pools[(executor, workers)] = pool
+        return pool
+
+
+def game_label(game):
+    return f"{game.get('away_team', 'Away')} vs {game.get('home_team', 'Home')}"
+
+
+def shard_games(games_by_sport, n_shards):
+    """Split games into `n_shards` snapshots of roughly equal work.
+
+    Dedup keys on the game label, so every game sharing a label lands in the
+    same shard and no duplicate can straddle two shards. Games keep their
+    original sport and board order inside each shard.
+    """
+    load = {}
+    for games in games_by_sport.values():
+        for game in games:
+            label = game_label(game)
+            load[label] = load.get(label, 0) + len(game['bookmakers']) + 1
+
+    shard_of, totals = {}, [0] * n_shards
+    for label in sorted(load, key=load.get, reverse=True):   # longest-first onto the lightest shard
+        s = totals.index(min(totals))
+        shard_of[label] = s
+        totals[s] += load[label]
+
+    shards = [{} for _ in range(n_shards)]
+    for sport_label, games in games_by_sport.items():
+        for game in games:
+            shards[shard_of[game_label(game)]].setdefault(sport_label, []).append(game)
+    return [shard for shard in shards if shard]
+
+
+def _scan_shard(kind, config, games_by_sport, today, top_k):
+    return rank_opps(kind, SCANS[kind].run(config, OddsSnapshot(games=games_by_sport), today, top_k=top_k))
+
+
+# ================================================================
+# SHARDED SCAN
+# ================================================================
+def run_scan(kind, config, snapshot, today=None, workers=1, executor="process",
+             top_k=None, min_games=PARALLEL_MIN_GAMES):
+    """Ranked opportunities for one engine, optionally sharding games across a pool.
+
+    With one worker, or below `min_games`, this is `rank_opps(run(...))` on the
+    calling thread and no pool is created. Otherwise each shard is scanned and
+    ranked on its own and the shard rankings are merged, keeping only the best
+    `top_k` when given. Pass `workers=MAX_PROCESSES` to use every core.
+
+    On a snapshot still streaming in, the size is judged from the sports that
+    have landed: below `min_games` the engine runs on the calling thread and
+    starts on the first payload, instead of waiting for the whole board.
+    """
+    scan    = SCANS[kind]
+    sports  = config[scan.sports_key]
+    landed  = sum(len(snapshot.games.get(label) or ()) for label in sports)
+    if workers <= 1 or (snapshot.streaming and landed < min_games):
+        return rank_opps(kind, scan.run(config, snapshot, today, top_k=top_k))
+
+    games_by_sport = {label: snapshot.sport_games(label) for label in sports}
+    n_games        = sum(len(games) for games in games_by_sport.values())
+    if n_games < min_games:
+        return rank_opps(kind, scan.run(config, snapshot, today, top_k=top_k))
+
+    shards = shard_games(games_by_sport, workers)
+    count("shards", len(shards))
+    with span("shard_scan"):
+        pool    = get_pool(executor, workers)
+        futures = [pool.submit(_scan_shard, kind, config, games, today, top_k) for games in shards]
+        ranked  = [fut.result() for fut in futures]
+    with span("merge"):
+        merged = heapq.merge(*ranked, key=lambda op: op[scan.rank_key], reverse=True)
+        opps   = list(merged)
+    count("opportunities", len(opps))
+    return opps[:top_k] if top_k else opps
@@ -0,0 +1,183 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from .constants import CENTRAL
+from .odds import OddsSnapshot, load_snapshot, markets_param
+from .scans import SCANS, config_market, rank_opps
+
+POLL_INTERVAL = 60
+WATCH_IDLE    = 600   # a watch nobody has read for this long is dropped
+
+
+def game_signature(game):
+    """Changes whenever any bookmaker re-prices the game or its kickoff moves."""
+    return game['commence_time'], tuple((bm['key'], bm.get('last_update')) for bm in game['bookmakers'])
+
+
+@dataclass
+class Watch:
+    kind:          str
+    config:        dict
+    signatures:    dict = field(default_factory=dict)   # game id -> (sport label, signature) last scanned
+    opps_by_game:  dict = field(default_factory=dict)   # game id -> opportunities
+    table:         list = field(default_factory=list)   # ranked opportunities
+    scanned_for:   object = None                        # date the date window was applied for
+    updated_at:    float | None = None
+    read_at:       float = field(default_factory=time.time)
+
+    @property
+    def sports(self):
+        return self.config[SCANS[self.kind].sports_key]
+
+
+# ================================================================
+# BACKGROUND POLLER
+# ================================================================
+class OddsPoller:
+    """Refreshes odds on a schedule and keeps a ranked opportunity table per watched scan.
+
+    Each poll diffs every game's bookmaker `last_update` stamps against what a
+    watch last scanned and re-runs its engine only on games that changed.
+    Watches are keyed by (owner, name), so one poller can serve many sessions.
+    A watch whose table has not been read for `idle` seconds is dropped, and
+    the thread exits once no watches remain; `watch` plus `start` revives it.
+    """
+
+    def __init__(self, fetch, interval=POLL_INTERVAL, today=None, idle=WATCH_IDLE):
+        self.fetch      = fetch
+        self.interval   = interval
+        self.today      = today
+        self.idle       = idle
+        self.errors     = {}
+        self.remaining  = None
+        self.last_error = None
+        self.polled_at  = None
+        self._watches   = {}
+        self._lock      = threading.Lock()
+        self._stop      = threading.Event()
+        self._thread    = None
+
+    def watch(self, name, kind, config, owner=None):
+        """Start (or replace) a live scan; its first poll rescans every game."""
+        with self._lock:
+            self._watches[(owner, name)] = Watch(kind, config)
+
+    def unwatch(self, name, owner=None):
+        with self._lock:
+            self._watches.pop((owner, name), None)
+            if not self._watches:
+                self._halt()
+
+    def watches(self, owner=None):
+        """{name: Watch} of one owner's live scans."""
+        with self._lock:
+            return {name: watch for (who, name), watch in self._watches.items() if who == owner}
+
+    def table(self, name, owner=None):
+        """The watch's latest ranked opportunities (empty until its first poll lands)."""
+        with self._lock:
+            watch = self._watches.get((owner, name))
+            if watch is None:
+                return []
+            watch.read_at = time.time()
+            return list(watch.table)
+
+    def _expire(self, now):
+        """Drop watches nobody has read within `idle` (e.g. their browser tab closed)."""
+        for key in [key for key, watch in self._watches.items() if now - watch.read_at > self.idle]:
+            del self._watches[key]
+
+    def poll_once(self):
+        with self._lock:
+            self._expire(time.time())
+            watches = dict(self._watches)
+        if not watches:
+            return
+        sport_labels = list(dict.fromkeys(s for w in watches.values() for s in w.sports))
+        markets      = markets_param(config_market(w.config) for w in watches.values())
+        snapshot     = load_snapshot(sport_labels, self.fetch, markets)
+        today        = self.today or datetime.now(CENTRAL).date()
+
+        for name, watch in watches.items():
+            self._rescan(watch, snapshot, today)
+
+        with self._lock:
+            self.errors    = dict(snapshot.errors)
+            self.remaining = snapshot.remaining or self.remaining
+            self.polled_at = time.time()
+
+    def _rescan(self, watch, snapshot, today):
+        engine = SCANS[watch.kind].run
+        if watch.scanned_for != today:
+            watch.signatures.clear()
+            watch.scanned_for = today
+
+        changed, live = {}, {}
+        for sport_label in watch.sports:
+            for game in snapshot.games.get(sport_label, []):
+                sig = game_signature(game)
+                live[game['id']] = (sport_label, sig)
+                if watch.signatures.get(game['id']) != live[game['id']]:
+                    changed.setdefault(sport_label, []).append(game)
+
+        # Keep games still on the board, plus everything from sports that failed to fetch.
+        signatures = {
+            game_id: entry for game_id, entry in watch.signatures.items()
+            if game_id in live or entry[0] not in snapshot.games
+        }
+        signatures.update(live)
+        opps_by_game = {game_id: opps for game_id, opps in watch.opps_by_game.items() if game_id in signatures}
+
+        if not changed and len(opps_by_game) == len(watch.opps_by_game) and watch.updated_at is not None:
+            return
+        if changed:
+            for game in (g for games in changed.values() for g in games):
+                opps_by_game.pop(game['id'], None)
+            for op in engine(watch.config, OddsSnapshot(games=changed), today=today):
+                opps_by_game.setdefault(op['game_id'], []).append(op)
+
+        table = rank_opps(watch.kind, [op for opps in opps_by_game.values() for op in opps])
+        with self._lock:
+            watch.signatures   = signatures
+            watch.opps_by_game = opps_by_game
+            watch.table        = table
+            watch.updated_at   = time.time()
+
+    # --- background thread ---
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop   = threading.Event()   # per thread, so a stopped thread never outlives a restart
+            self._thread = threading.Thread(target=self._run, args=(self._stop,), name="odds-poller", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._halt()
+
+    def _halt(self):
+        self._stop.set()
+        self._thread = None
+
+    @property
+    def running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def _run(self, stop):
+        while not stop.is_set():
+            with self._lock:
+                if stop is not self._stop:   # stopped and restarted meanwhile
+                    return
+                self._expire(time.time())
+                if not self._watches:
+                    self._halt()
+                    return
+            try:
+                self.poll_once()
+                self.last_error = None
+            except Exception as e:   # keep polling through transient failures
+                self.last_error = repr(e)
+            stop.wait(self.interval)
@@ -0,0 +1,314 @@
+import time
+from datetime import datetime
+
+import numpy as np
+
+from .batch import run_batch
+from .configs import _check_books, book_key
+from .constants import CENTRAL
+from .profiling import count, span
+from .scans import SCANS
+
+PORTFOLIO_CANDIDATES = 25     # best opportunities per promo the solver chooses between
+SOLVE_SECONDS        = 0.25   # search budget; past it the best assignment found so far is returned
+
+# (book field, stake field) pairs in each engine's result rows; "{}" repeats per leg
+STAKE_FIELDS = {
+    "promo":   (("s_book", "wager"), ("h_book", "exact_hedge"),
+                ("h1_book", "exact_hedge1"), ("h2_book", "exact_hedge2")),
+    "soccer":  (("o{}_book", "o{}_wager"),),
+    "bet_get": (("s_book", "s_wager"), ("h1_book", "h1_wager"), ("h2_book", "h2_wager")),
+}
+
+
+def _stake_fields(kind, op):
+    """STAKE_FIELDS for `kind`, with per-leg pairs spelled out for every leg `op` carries."""
+    fields = []
+    for book_field, stake_field in STAKE_FIELDS[kind]:
+        if "{}" not in book_field:
+            fields.append((book_field, stake_field))
+            continue
+        n = 1
+        while book_field.format(n) in op:
+            fields.append((book_field.format(n), stake_field.format(n)))
+            n += 1
+    return fields
+
+
+def opp_exposure(kind, op):
+    """{book title: total stake} an opportunity places, promo and cash alike."""
+    exposure = {}
+    for book_field, stake_field in _stake_fields(kind, op):
+        if book_field in op:
+            exposure[op[book_field]] = exposure.get(op[book_field], 0.0) + op[stake_field]
+    return exposure
+
+
+def _book_titles(snapshot, names):
+    """Book name -> the bookmaker title result rows carry for it."""
+    titles = snapshot.books()
+    return {name: titles.get(book_key(name), name) for name in names}
+
+
+# ================================================================
+# ASSIGNMENT SOLVER
+# ================================================================
+def _resource_prices(values, usage, offsets, capacity, target, steps=30):
+    """Per-resource prices for the Lagrangian bound, by Polyak subgradient steps toward `target`.
+
+    Pricing each resource instead of capping it lets every promo take its
+    best net-of-price candidate; summed with the priced capacity, that is an
+    upper bound for any prices, and these make it roughly the tightest.
+    """
+    prices = np.zeros(len(capacity))
+    best, best_prices = np.inf, prices
+    for _ in range(steps):
+        net   = np.concatenate([values - usage @ prices, [0.0]])
+        picks = [lo + int(np.argmax(net[lo:hi])) if net[lo:hi].max() > 0 else -1
+                 for lo, hi in zip(offsets[:-1], offsets[1:])]
+        bound = prices @ capacity + sum(net[p] for p in picks if p >= 0)
+        if bound < best:
+            best, best_prices = bound, prices
+        grad = capacity - sum((usage[p] for p in picks if p >= 0), np.zeros(len(capacity)))
+        norm = grad @ grad
+        if norm == 0 or bound - target <= 1e-9:
+            break
+        prices = np.maximum(0.0, prices - (bound - target) / norm * grad)
+    return best_prices
+
+
+def _hungarian(cost):
+    """Column for each row minimizing total cost, for rows <= columns (shortest augmenting paths)."""
+    n, m = cost.shape
+    u, v = np.zeros(n + 1), np.zeros(m + 1)
+    row  = np.zeros(m + 1, dtype=int)   # row + 1 matched to each column; column 0 is the path root
+    way  = np.zeros(m + 1, dtype=int)
+    for i in range(1, n + 1):
+        row[0], j0 = i, 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            free     = ~used
+            reduced  = np.full(m + 1, np.inf)
+            reduced[1:] = cost[row[j0] - 1] - u[row[j0]] - v[1:]
+            better   = free & (reduced < minv)
+            minv[better], way[better] = reduced[better], j0
+            j1    = int(np.argmin(np.where(free, minv, np.inf)))
+            delta = minv[j1]
+            u[row[used]] += delta
+            v[used]      -= delta
+            minv[free]   -= delta
+            j0 = j1
+            if row[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            row[j0], j0 = row[j1], j1
+    match = [None] * n
+    for j in range(1, m + 1):
+        if row[j]:
+            match[row[j] - 1] = j - 1
+    return match
+
+
+def _assign_to_games(candidates, max_per_game):
+    """Exact solve when the only limit is `max_per_game`: an assignment of
+    promos to game slots, with one zero-value skip slot per promo."""
+    rows  = [i for i, promo in enumerate(candidates) if promo]
+    games = list(dict.fromkeys(game for i in rows for _, _, game in candidates[i]))
+    best  = np.zeros((len(rows), len(games)))
+    pick  = {}
+    for n, i in enumerate(rows):
+        for c, (value, _, game) in enumerate(candidates[i]):
+            g = games.index(game)
+            if value > best[n, g]:
+                best[n, g], pick[n, g] = value, c
+    slots = np.concatenate([np.repeat(best, max_per_game, axis=1), np.zeros((len(rows), len(rows)))], axis=1)
+    picks, total = [None] * len(candidates), 0.0
+    for n, j in enumerate(_hungarian(-slots)):
+        g = j // max_per_game if j < len(games) * max_per_game else None
+        if g is not None and (n, g) in pick:
+            picks[rows[n]] = pick[n, g]
+            total += best[n, g]
+    return total, picks
+
+
+def solve_assignment(candidates, capacity, max_per_game=None, time_limit=SOLVE_SECONDS):
+    """Pick at most one candidate per promo, maximizing total value within capacity.
+
+    `candidates` holds one list per promo of (value, usage, game), where usage
+    is ((resource, amount), ...) against `capacity`. At most `max_per_game`
+    picks may share a game. Without capacity that is an assignment of promos
+    to game slots, solved exactly by the Hungarian method; that solution is
+    tried first and otherwise caps the search. Each game then becomes one
+    more resource of that capacity, used once by every candidate on it, and
+    the search is a depth-first branch and bound: resources are first
+    priced by Lagrangian relaxation, candidates are tried in order of value
+    net of those prices, and a branch is cut when the smaller of two bounds
+    (the best candidates that still fit, or the Lagrangian bound) cannot beat
+    the incumbent. Returns (total, picks, optimal); picks holds an index into
+    each promo's list or None, and `optimal` is False if the time limit cut
+    the search short.
+    """
+    deadline = time.perf_counter() + time_limit
+    ceiling  = np.inf   # best total any assignment can reach
+    if max_per_game is not None:
+        total, picks = _assign_to_games(candidates, max_per_game)
+        used = np.zeros(len(capacity))
+        for i, c in enumerate(picks):
+            for r, amount in candidates[i][c][1] if c is not None else ():
+                used[r] += amount
+        if (used <= np.array(capacity, dtype=float) + 1e-9).all():
+            return total, picks, True
+        ceiling    = total
+        games      = {}
+        candidates = [[(value, use + ((len(capacity) + games.setdefault(game, len(games)), 1.0),), game)
+                       for value, use, game in promo] for promo in candidates]
+        capacity   = list(capacity) + [max_per_game] * len(games)
+    order    = sorted((i for i in range(len(candidates)) if candidates[i]),
+                      key=lambda i: -max(value for value, _, _ in candidates[i]))
+    picks    = [None] * len(candidates)
+    if not order:
+        return 0.0, picks, True
+
+    # One row per candidate, promos in search order; the rows of the promo at depth d are offsets[d]:offsets[d + 1].
+    flat    = [cand for i in order for cand in candidates[i]]
+    offsets = np.cumsum([0] + [len(candidates[i]) for i in order])
+    values  = np.array([value for value, _, _ in flat])
+    usage   = np.zeros((len(flat), len(capacity)))
+    for n, (_, use, _) in enumerate(flat):
+        for r, amount in use:
+            usage[n, r] += amount
+    room = np.array(capacity, dtype=float)
+
+    def fits(use):
+        return all(room[r] >= amount - 1e-9 for r, amount in use)
+
+    def take(use, sign):
+        for r, amount in use:
+            room[r] -= sign * amount
+
+    def greedy(rank):
+        """Each promo in turn takes its first candidate, by `rank`, that still fits."""
+        total, chosen = 0.0, [None] * len(candidates)
+        for d, i in enumerate(order):
+            for c in rank[d]:
+                value, use, _ = candidates[i][c]
+                if value > 0 and fits(use):
+                    take(use, 1)
+                    chosen[i], total = c, total + value
+                    break
+        for i, c in enumerate(chosen):
+            if c is not None:
+                take(candidates[i][c][1], -1)
+        return total, chosen
+
+    by_value = [sorted(range(len(candidates[i])), key=lambda c, i=i: -candidates[i][c][0]) for i in order]
+    best     = list(greedy(by_value))
+    prices   = _resource_prices(values, usage, offsets, room, best[0]) if len(capacity) else np.zeros(0)
+    net      = values - usage @ prices
+    by_net   = [sorted(range(hi - lo), key=lambda c, lo=lo: -net[lo + c]) for lo, hi in zip(offsets[:-1], offsets[1:])]
+    best     = max(best, list(greedy(by_net)), key=lambda b: b[0])
+
+    def bound(d):
+        """Best value still reachable from depth `d`."""
+        if d == len(order):
+            return 0.0
+        lo   = offsets[d]
+        fit  = (usage[lo:] <= room + 1e-9).all(axis=1)
+        segs = offsets[d:-1] - lo
+        best_fit = np.maximum.reduceat(np.where(fit, values[lo:], 0.0), segs).sum()
+        best_net = np.maximum(np.maximum.reduceat(np.where(fit, net[lo:], 0.0), segs), 0.0).sum()
+        return min(best_fit, prices @ room + best_net)
+
+    state = {"nodes": 0, "timed_out": False}
+
+    def search(d, total):
+        if best[0] >= ceiling - 1e-9:
+            return
+        if d == len(order):
+            if total > best[0] + 1e-9:
+                best[0], best[1] = total, list(picks)
+            return
+        state["nodes"] += 1
+        if state["timed_out"] or time.perf_counter() > deadline:
+            state["timed_out"] = True
+            return
+        i = order[d]
+        for c in by_net[d]:
+            value, use, _ = candidates[i][c]
+            if value <= 0 or not fits(use):
+                continue
+            take(use, 1)
+            if total + value + bound(d + 1) > best[0] + 1e-9:
+                picks[i] = c
+                search(d + 1, total + value)
+                picks[i] = None
+            take(use, -1)
+        if total + bound(d + 1) > best[0] + 1e-9:
+            search(d + 1, total)
+
+    search(0, 0.0)
+    count("solver_nodes", state["nodes"])
+    return best[0], best[1], not state["timed_out"]
+
+
+# ================================================================
+# PORTFOLIO
+# ================================================================
+def optimize_portfolio(promos, snapshot, exposure_limits=None, max_per_game=None, today=None,
+                       candidates=PORTFOLIO_CANDIDATES, time_limit=SOLVE_SECONDS):
+    """Assign saved promos to opportunities for the most total guaranteed profit.
+
+    `promos` is the run_batch list; each promo is used at most once, on one of
+    its best `candidates` opportunities, or left unassigned if none is
+    profitable. `exposure_limits` caps the total stake placed at each book
+    across the portfolio ({book name: dollars}; 0 or missing means no cap)
+    and `max_per_game` caps how many promos land on one game. Promo caps are
+    already priced into every opportunity.
+
+    Returns {"assignments", "total_profit", "exposure", "unassigned", "optimal"}.
+    """
+    today  = today or datetime.now(CENTRAL).date()
+    limits = {name: float(v) for name, v in (exposure_limits or {}).items() if v}
+    _check_books(list(limits))
+
+    ranked    = run_batch(promos, snapshot, today, top_k=candidates)
+    titles    = _book_titles(snapshot, limits)
+    resources = [titles[name] for name in limits]
+    capacity  = list(limits.values())
+
+    options = []   # per promo: (value, usage, game, op)
+    for promo in promos:
+        kind, rank_key = promo['kind'], SCANS[promo['kind']].rank_key
+        promo_options  = []
+        for op in ranked[promo['name']]:
+            if op[rank_key] <= 0:
+                break
+            exposure = opp_exposure(kind, op)
+            usage    = tuple((r, exposure[book]) for r, book in enumerate(resources) if book in exposure)
+            promo_options.append((op[rank_key], usage, op['game_id'], op))
+        options.append(promo_options)
+
+    with span("solve"):
+        total, picks, optimal = solve_assignment([[o[:3] for o in opts] for opts in options],
+                                                 capacity, max_per_game, time_limit)
+
+    assignments, unassigned, exposure = [], [], {}
+    for promo, opts, c in zip(promos, options, picks):
+        if c is None:
+            unassigned.append(promo['name'])
+            continue
+        op = opts[c][3]
+        assignments.append({"name": promo['name'], "kind": promo['kind'], "profit": opts[c][0], "opp": op})
+        for book, stake in opp_exposure(promo['kind'], op).items():
+            exposure[book] = exposure.get(book, 0.0) + stake
+
+    return {
+        "assignments":  assignments,
+        "total_profit": total,
+        "exposure":     exposure,
+        "unassigned":   unassigned,
+        "optimal":      optimal
+    }
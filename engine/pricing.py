@@ -0,0 +1,81 @@
+import numpy as np
+
+from .constants import CONV_NOSWEAT
+
+
+def get_multiplier(american_odds):
+    return (american_odds / 100) if american_odds > 0 else (100 / abs(american_odds))
+
+
+# ================================================================
+# VECTORIZED PRICING KERNEL
+# ================================================================
+def multipliers(prices):
+    """get_multiplier over an array of American prices."""
+    prices = np.asarray(prices, dtype=np.float64)
+    return np.where(prices > 0, prices / 100, 100 / np.abs(prices))
+
+
+def hedge_kernel(strat, source_prices, hedge_prices, wager, boost_val=0):
+    """Price a batch of hedged promo bets in one pass.
+
+    `source_prices` has shape (n,) and `hedge_prices` shape (n, k) for k hedge
+    legs. Returns (stakes, profit) with shapes (n, k) and (n,). `strat` is one of
+    the promo types; "Straight Cash" prices an unpromoted qualifying bet.
+    """
+    sm = multipliers(source_prices)
+    hm = multipliers(hedge_prices)
+    if hm.ndim == 1:
+        hm = hm[:, None]
+
+    if strat == "Profit Boost (%)":
+        target = wager * (1 + sm * (1 + boost_val / 100))
+        stakes = target[:, None] / (1 + hm)
+        profit = target - wager
+    elif strat == "Bonus Bet":
+        target = wager * sm
+        stakes = target[:, None] / (1 + hm)
+        profit = target
+    elif strat == "No-Sweat Bet":
+        target = wager * (1 + sm)
+        stakes = (target - wager * CONV_NOSWEAT)[:, None] / (1 + hm)
+        profit = target - wager
+    else:
+        target = wager * (1 + sm)
+        stakes = target[:, None] / (1 + hm)
+        profit = target - wager
+
+    # Subtract leg by leg so results match the scalar formulas bit for bit.
+    for j in range(stakes.shape[1]):
+        profit = profit - stakes[:, j]
+    return stakes, profit
+
+
+# ================================================================
+# N-LEG PROMO KERNEL
+# ================================================================
+# One leg of an N-leg promo bet: promo dollars up to the leg's cap, the rest
+# cash. Scalars or arrays broadcast throughout, so a leg's table can be built
+# for all its candidate prices (or all sweep points) at once.
+
+def leg_divisors(strat, boost_pct, m_raw):
+    """(promo, cash) return of one dollar on a leg that wins."""
+    m_boosted = m_raw * (1 + boost_pct / 100) if strat == "Profit Boost (%)" else m_raw
+    return (m_boosted if strat == "Bonus Bet" else 1 + m_boosted), 1 + m_raw
+
+
+def stake_split(strat, cap, wager):
+    """(promo, cash) dollars of the first leg's fixed stake."""
+    if strat == "Straight Cash":
+        return 0.0, wager
+    promo = np.where((cap > 0) & (wager > cap), cap, wager)
+    return promo, wager - promo
+
+
+def target_split(strat, cap, target, div_promo, div_cash):
+    """(promo, cash) dollars of a later leg returning `target` if it wins, promo first up to `cap`."""
+    if strat == "Straight Cash":
+        return 0.0, target / div_cash
+    max_pay = cap * div_promo
+    capped  = (cap > 0) & (target > max_pay)
+    return np.where(capped, cap, target / div_promo), np.where(capped, (target - max_pay) / div_cash, 0.0)
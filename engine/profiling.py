@@ -0,0 +1,143 @@
+import contextvars
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+_active = contextvars.ContextVar("scan_profile", default=None)
+_stack  = contextvars.ContextVar("scan_spans", default=())
+
+
+# ================================================================
+# SCAN PROFILE
+# ================================================================
+class ScanProfile:
+    """Timing spans and counters collected while one scan runs.
+
+    Spans nest: `total` is wall time inside the span, `self` excludes time
+    spent in spans opened within it, so the self times of the scan thread add
+    up to the scan. Fetch threads started from inside the scan report into it
+    too, overlapping the scan thread's `fetch_wait`.
+    """
+
+    def __init__(self, name):
+        self.name       = name
+        self.spans      = {}   # name -> [calls, total seconds, self seconds]
+        self.counters   = {}
+        self.started_at = time.time()
+        self.wall       = None
+        self._lock      = threading.Lock()
+
+    def add_span(self, name, total, child):
+        with self._lock:
+            entry = self.spans.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += total
+            entry[2] += total - child
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "scan":       self.name,
+                "started_at": self.started_at,
+                "wall_s":     self.wall,
+                "spans":      {name: {"calls": c, "total_s": t, "self_s": s}
+                               for name, (c, t, s) in sorted(self.spans.items(), key=lambda kv: -kv[1][2])},
+                "counters":   dict(self.counters)
+            }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=1)
+
+    def to_prometheus(self, prefix="promo_converter"):
+        """Prometheus text exposition, one labelled sample per span and counter."""
+        report = self.to_dict()
+        scan   = report['scan'].replace('\\', '\\\\').replace('"', '\\"')
+        lines  = []
+        for metric, field, help_text in (
+            ("span_seconds", "total_s", "Wall time inside the span."),
+            ("span_self_seconds", "self_s", "Time inside the span excluding nested spans."),
+            ("span_calls", "calls", "Times the span was entered."),
+        ):
+            lines += [f"# HELP {prefix}_{metric} {help_text}", f"# TYPE {prefix}_{metric} gauge"]
+            for name, span in report['spans'].items():
+                lines.append(f'{prefix}_{metric}{{scan="{scan}",span="{name}"}} {span[field]}')
+        lines += [f"# HELP {prefix}_scan_count Counters recorded during the scan.",
+                  f"# TYPE {prefix}_scan_count gauge"]
+        for name, value in report['counters'].items():
+            lines.append(f'{prefix}_scan_count{{scan="{scan}",counter="{name}"}} {value}')
+        if report['wall_s'] is not None:
+            lines += [f"# TYPE {prefix}_scan_seconds gauge", f'{prefix}_scan_seconds{{scan="{scan}"}} {report["wall_s"]}']
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def profile(name):
+    """Collect every span and counter recorded in this context into a new ScanProfile."""
+    prof  = ScanProfile(name)
+    token = _active.set(prof)
+    stack = _stack.set(())
+    t0    = time.perf_counter()
+    try:
+        yield prof
+    finally:
+        prof.wall = time.perf_counter() - t0
+        _stack.reset(stack)
+        _active.reset(token)
+
+
+@contextmanager
+def span(name):
+    """Time a block under the active profile; a no-op when nothing is profiling."""
+    prof = _active.get()
+    if prof is None:
+        yield
+        return
+    frame = [0.0]   # time spent in spans nested inside this one
+    token = _stack.set(_stack.get() + (frame,))
+    t0    = time.perf_counter()
+    try:
+        yield
+    finally:
+        total = time.perf_counter() - t0
+        _stack.reset(token)
+        parents = _stack.get()
+        if parents:
+            parents[-1][0] += total
+        prof.add_span(name, total, frame[0])
+
+
+def count(name, n=1):
+    prof = _active.get()
+    if prof is not None:
+        prof.count(name, n)
+
+
+def timed(name):
+    """Decorator form of `span`."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def timed_fn(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return timed_fn
+    return wrap
+
+
+def with_profile(fn):
+    """Bind `fn` to the active profile, so a pool thread reports into it.
+
+    Only the profile crosses over, not the caller's whole context. Spans in
+    the thread start a fresh stack: they overlap the caller's time rather
+    than nesting in it.
+    """
+    prof = _active.get()
+    def run(*args, **kwargs):
+        _active.set(prof)
+        return fn(*args, **kwargs)
+    return lambda *args, **kwargs: contextvars.Context().run(run, *args, **kwargs)
@@ -0,0 +1,109 @@
+import gzip
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+from .odds import odds_result
+
+RECORDING_SUFFIX = ".json.gz"
+
+
+# ================================================================
+# RECORD
+# ================================================================
+class OddsRecorder:
+    """Saves every raw odds response, body and headers, as gzipped JSON.
+
+    `request(sport_key, market)` must return a `requests.Response`, e.g.
+    `request_odds` with the API key bound. Files are numbered in call order
+    so a replay serves them back in the sequence they were seen.
+    """
+
+    def __init__(self, directory, request):
+        self.directory = directory
+        self.request   = request
+        self._seq      = len(_recordings(directory)) if os.path.isdir(directory) else 0
+        self._lock     = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def fetch(self, sport_key, market='h2h'):
+        """Drop-in for `fetch(sport_key, market)`; failed requests are recorded too."""
+        try:
+            res = self.request(sport_key, market)
+        except requests.exceptions.RequestException as e:
+            return None, type(e).__name__
+        try:
+            body = res.json()
+        except ValueError:
+            body = res.text
+        headers = {k.lower(): v for k, v in res.headers.items()}
+        self.save(sport_key, market, res.status_code, headers, body)
+        return odds_result(res.status_code, headers, body)
+
+    def save(self, sport_key, market, status, headers, body):
+        with self._lock:
+            seq = self._seq
+            self._seq += 1
+        record = {
+            "sport_key":   sport_key,
+            "market":      market,
+            "recorded_at": time.time(),
+            "status":      status,
+            "headers":     headers,
+            "body":        body
+        }
+        path = os.path.join(self.directory, f"{seq:06d}_{sport_key}_{market.replace(',', '+')}{RECORDING_SUFFIX}")
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(record, f, separators=(',', ':'))
+        return path
+
+
+# ================================================================
+# REPLAY
+# ================================================================
+class OddsReplay:
+    """Serves recorded responses in place of the HTTP call.
+
+    Each (sport_key, market) replays its recordings in order and then keeps
+    returning the last one, so a poller can run past the end of a capture.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._queues   = defaultdict(list)
+        self._served   = defaultdict(int)
+        self._lock     = threading.Lock()
+        for path in _recordings(directory):
+            record = load_recording(path)
+            self._queues[(record['sport_key'], record['market'])].append(record)
+
+    def keys(self):
+        return list(self._queues)
+
+    def fetch(self, sport_key, market='h2h'):
+        """Drop-in for `fetch(sport_key, market)`."""
+        with self._lock:
+            queue = self._queues.get((sport_key, market))
+            if not queue:
+                return None, "Not recorded"
+            i = min(self._served[(sport_key, market)], len(queue) - 1)
+            self._served[(sport_key, market)] += 1
+        record = queue[i]
+        return odds_result(record['status'], record['headers'], record['body'])
+
+    def rewind(self):
+        with self._lock:
+            self._served.clear()
+
+
+def load_recording(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _recordings(directory):
+    return sorted(os.path.join(directory, n) for n in os.listdir(directory) if n.endswith(RECORDING_SUFFIX))
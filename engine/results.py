@@ -0,0 +1,92 @@
+from typing import TypedDict
+
+
+# Opportunity rows stay plain dicts so the render functions can index them
+# directly; these describe the keys each engine emits.
+
+class PromoOpp(TypedDict, total=False):
+    game_id: str
+    game: str
+    sport: str
+    market_type: str
+    market_label: str
+    time: str
+    exact_profit: float
+    wager: float
+    strat: str
+    used_boost: float
+    s_team: str
+    s_book: str
+    s_price: int
+    # 2-way
+    exact_hedge: float
+    h_book: str
+    h_team: str
+    h_price: int
+    # 3-way
+    exact_w1: float
+    h1_book: str
+    h1_team: str
+    h1_price: int
+    exact_hedge1: float
+    h2_book: str
+    h2_team: str
+    h2_price: int
+    exact_hedge2: float
+
+
+class SoccerOpp(TypedDict, total=False):
+    game_id: str
+    game: str
+    sport: str
+    time: str
+    net_profit: float
+    o1_book: str
+    o1_team: str
+    o1_price: int
+    o1_wager: float
+    o1_promo: float
+    o1_cash: float
+    o1_strat: str
+    o1_boost: float
+    o2_book: str
+    o2_team: str
+    o2_price: int
+    o2_wager: float
+    o2_promo: float
+    o2_cash: float
+    o2_strat: str
+    o2_boost: float
+    # 3-leg configs (longer ones continue with o4_*, o5_*, ...)
+    o3_book: str
+    o3_team: str
+    o3_price: int
+    o3_wager: float
+    o3_promo: float
+    o3_cash: float
+    o3_strat: str
+    o3_boost: float
+
+
+class BetGetOpp(TypedDict, total=False):
+    game_id: str
+    game: str
+    sport: str
+    market_type: str
+    market_label: str
+    time: str
+    qualifying_loss: float
+    net_value: float
+    s_book: str
+    s_team: str
+    s_price: int
+    s_wager: float
+    h1_book: str
+    h1_team: str
+    h1_price: int
+    h1_wager: float
+    # 3-way
+    h2_book: str
+    h2_team: str
+    h2_price: int
+    h2_wager: float
@@ -0,0 +1,84 @@
+import numpy as np
+
+from .rounding import leg_arrays, outcome_profits, split_stake
+
+N_PATHS    = 2000
+PRICE_VOL  = 0.04    # std dev of the log move in a later leg's payout multiplier
+FILL_FAIL  = 0.02    # chance each promo or cash part of a later bet is not placed
+SHOCK      = 0.01    # adverse move, in multiplier terms, behind `risk_sensitivity`
+PATH_CELLS = 250_000 # rows * paths * legs simulated at once
+
+RISK_KEYS  = {"expected": "risk_expected", "worst": "risk_p05"}
+
+
+# ================================================================
+# MONTE CARLO
+# ================================================================
+# The first leg (the promo bet, or soccer Bet 1) is placed at the snapshot
+# price and its promo part always fills. Every later leg fills at a price
+# moved by a lognormal shock, and each promo or cash part of it — including
+# Bet 1's cash top-up — can fail to be placed, leaving that exposure open.
+# Outcomes are weighted by the snapshot's vig-free implied probabilities.
+
+def _simulate_group(legs, rng, n_paths, price_vol, fill_fail):
+    """(expected, 5th percentile locked, loss chance) per row of one leg_arrays group."""
+    n, n_legs    = legs['stake'].shape
+    promo, cash  = split_stake(legs['stake'], legs['cap'])
+    free         = ~legs['fixed']
+    implied      = 1 / (1 + legs['m'])
+    fair         = implied / implied.sum(-1, keepdims=True)
+    terms        = {name: legs[name][:, None] for name in ('back', 'boost', 'outlay', 'refund')}
+
+    shocks = np.exp(price_vol * rng.standard_normal((n, n_paths, n_legs)))
+    m      = legs['m'][:, None] * np.where(free[:, None], shocks, 1.0)
+    promo  = promo[:, None] * ~((rng.random((n, n_paths, n_legs)) < fill_fail) & free[:, None])
+    cash   = cash[:, None] * (rng.random((n, n_paths, n_legs)) >= fill_fail)
+
+    profit = outcome_profits(promo, cash, m, terms)
+    locked = profit.min(-1)
+    return (profit * fair[:, None]).sum(-1).mean(-1), np.percentile(locked, 5, axis=1), (locked < 0).mean(-1)
+
+
+def _sensitivity(legs, shock):
+    """Change in locked profit when the most damaging later leg's multiplier drops by `shock`."""
+    promo, cash = split_stake(legs['stake'], legs['cap'])
+    nominal     = outcome_profits(promo, cash, legs['m'], legs).min(-1)
+    worst       = nominal.copy()
+    for j in np.flatnonzero(~legs['fixed'][0]):
+        m        = legs['m'].copy()
+        m[:, j] *= 1 - shock
+        worst    = np.minimum(worst, outcome_profits(promo, cash, m, legs).min(-1))
+    return worst - nominal
+
+
+def simulate_risk(kind, config, opps, n_paths=N_PATHS, price_vol=PRICE_VOL, fill_fail=FILL_FAIL,
+                  shock=SHOCK, seed=0):
+    """Copies of `opps` with their simulated profit distribution.
+
+    Adds `risk_expected` (mean profit over paths and outcomes), `risk_p05`
+    (5th percentile of the profit locked across outcomes), `risk_loss_chance`
+    (share of paths locking a loss) and `risk_sensitivity` (locked profit lost
+    to a `shock` adverse move on the worst later leg). Rows are simulated in
+    blocks of PATH_CELLS so memory stays bounded.
+    """
+    rng = np.random.default_rng(seed)
+    out = [dict(op) for op in opps]
+    for rows, legs in leg_arrays(kind, config, out):
+        sens  = _sensitivity(legs, shock)
+        block = max(1, PATH_CELLS // (n_paths * legs['stake'].shape[1]))
+        for lo in range(0, len(rows), block):
+            part = {name: value[lo:lo + block] for name, value in legs.items()}
+            expected, p05, loss_chance = _simulate_group(part, rng, n_paths, price_vol, fill_fail)
+            for k, n in enumerate(rows[lo:lo + block]):
+                out[n].update({
+                    "risk_expected":    float(expected[k]),
+                    "risk_p05":         float(p05[k]),
+                    "risk_loss_chance": float(loss_chance[k]),
+                    "risk_sensitivity": float(sens[lo + k]),
+                })
+    return out
+
+
+def rank_by_risk(opps, by="expected"):
+    """simulate_risk output ranked by expected profit or by its 5th percentile (`by="worst"`)."""
+    return sorted(opps, key=lambda op: op[RISK_KEYS[by]], reverse=True)
@@ -0,0 +1,193 @@
+from itertools import product
+
+import numpy as np
+
+from .configs import leg_count
+from .constants import CONV_NOSWEAT
+from .pricing import multipliers
+
+STAKE_STEP = 1.0
+NEIGHBOURS = range(-4, 6)   # steps around the rounded-down exact stake tried for the middle leg
+
+
+# ================================================================
+# LEG MODEL
+# ================================================================
+# Every leg pays, per promo dollar, `back + m * boost` if it wins, costs
+# `outlay` up front and refunds `refund` if it loses; cash dollars pay 1 + m
+# and cost 1. Stakes up to `cap` are promo dollars, the rest cash (cap 0: all
+# cash). Leg k winning is outcome k.
+
+def _promo_leg(strat, boost=0, refund=True):
+    """(back, boost, outlay, refund) per promo dollar for a promo type."""
+    if strat == "Profit Boost (%)":
+        return 1.0, 1 + boost / 100, 1.0, 0.0
+    if strat == "Bonus Bet":
+        return 0.0, 1.0, 0.0, 0.0
+    if strat == "No-Sweat Bet":
+        return 1.0, 1.0, 1.0, CONV_NOSWEAT if refund else 0.0
+    return 1.0, 1.0, 1.0, 0.0
+
+
+def _leg_cap(strat, cap_val):
+    if strat == "Straight Cash":
+        return 0.0
+    return cap_val if cap_val > 0 else np.inf
+
+
+def _promo_legs(op, config):
+    """(book, stake, fixed, price, strat, boost, cap) per leg of a boost-engine row."""
+    hedges = [(op['h_book'], op['exact_hedge'], op['h_price'])] if op['market_type'] == "2-way" else \
+             [(op['h1_book'], op['exact_hedge1'], op['h1_price']), (op['h2_book'], op['exact_hedge2'], op['h2_price'])]
+    return [(op['s_book'], op['wager'], True, op['s_price'], op['strat'], op['used_boost'], np.inf)] + \
+           [(book, stake, False, price, "Straight Cash", 0, 0.0) for book, stake, price in hedges]
+
+
+def _soccer_legs(op, config):
+    return [(op[f'o{n}_book'], op[f'o{n}_wager'], n == 1, op[f'o{n}_price'], op[f'o{n}_strat'],
+             op[f'o{n}_boost'], _leg_cap(config[f'strat{n}'], config[f'cap{n}_val'])) for n in range(1, leg_count(config) + 1)]
+
+
+def _bet_get_legs(op, config):
+    legs = [(op['s_book'], op['s_wager'], True, op['s_price'], "Straight Cash", 0, 0.0)]
+    for n in (1, 2):
+        if f'h{n}_book' in op:
+            legs.append((op[f'h{n}_book'], op[f'h{n}_wager'], False, op[f'h{n}_price'], "Straight Cash", 0, 0.0))
+    return legs
+
+LEGS = {"promo": _promo_legs, "soccer": _soccer_legs, "bet_get": _bet_get_legs}
+
+
+def leg_arrays(kind, config, opps):
+    """The leg model of `opps`, as [(row indices, arrays)] per leg count.
+
+    Each arrays dict holds `book` (lists) and `stake`, `fixed`, `m`, `cap`,
+    `back`, `boost`, `outlay`, `refund` of shape (rows, legs). Only the boost
+    engine's No-Sweat promo carries a refund; the soccer engine prices it as
+    a plain stake.
+    """
+    groups = {}
+    for n, op in enumerate(opps):
+        legs = LEGS[kind](op, config)
+        groups.setdefault(len(legs), []).append((n, legs))
+
+    out = []
+    for members in groups.values():
+        shape = (len(members), len(members[0][1]))
+        legs  = [leg for _, legs in members for leg in legs]
+        terms = np.array([_promo_leg(strat, boost, refund=(kind == "promo")) for _, _, _, _, strat, boost, _ in legs])
+        out.append(([n for n, _ in members], {
+            "book":   [[leg[0] for leg in legs] for _, legs in members],
+            "stake":  np.array([leg[1] for leg in legs], dtype=np.float64).reshape(shape),
+            "fixed":  np.array([leg[2] for leg in legs]).reshape(shape),
+            "m":      multipliers([leg[3] for leg in legs]).reshape(shape),
+            "cap":    np.array([leg[6] for leg in legs], dtype=np.float64).reshape(shape),
+            "back":   terms[:, 0].reshape(shape),
+            "boost":  terms[:, 1].reshape(shape),
+            "outlay": terms[:, 2].reshape(shape),
+            "refund": terms[:, 3].reshape(shape),
+        }))
+    return out
+
+
+def split_stake(stakes, cap):
+    """(promo, cash) dollars of each stake."""
+    promo = np.minimum(stakes, cap)
+    return promo, stakes - promo
+
+
+def outcome_profits(promo, cash, m, legs):
+    """Profit on each outcome for promo and cash dollars of shape (..., legs) at multipliers `m`.
+
+    `legs` holds the leg_arrays terms, broadcastable against the stakes.
+    """
+    losses = promo * legs['refund']
+    spent  = (promo * legs['outlay'] + cash).sum(-1, keepdims=True)
+    return promo * (legs['back'] + m * legs['boost']) + cash * (1 + m) + \
+           (losses.sum(-1, keepdims=True) - losses) - spent
+
+
+# ================================================================
+# ROUNDING SEARCH
+# ================================================================
+def _stake_for_return(pay, cap, win, cash_win):
+    """Stake whose winning return is `pay`, spending promo dollars before cash."""
+    with np.errstate(invalid="ignore"):
+        cap_pay = np.where(cap > 0, cap * win, 0.0)
+        stake   = np.where(pay <= cap_pay, pay / win, cap + (pay - cap_pay) / cash_win)
+    return np.maximum(stake, 0.0)
+
+
+def best_rounding(legs, step):
+    """Rounded stakes maximizing worst-case profit, for one leg_arrays group.
+
+    `step` has the group's (rows, legs) shape; fixed legs keep their stake.
+    The last free leg's profit rises with its stake while every other
+    outcome falls, so for any choice of the others its best stake is the one
+    balancing them, rounded down or up. Earlier free legs try NEIGHBOURS
+    multiples of their `step` around the exact stake; all combinations for
+    all rows are scored in one pass. Returns (stakes, worst-case profit).
+    """
+    exact      = legs['stake']
+    n, n_legs  = exact.shape
+    free       = [j for j in range(n_legs) if not legs['fixed'][0, j]]
+    *mid, last = free
+    grid       = np.array(list(product(NEIGHBOURS, repeat=len(mid))), dtype=np.float64)
+    terms      = {name: legs[name][:, None] for name in ('m', 'cap', 'back', 'boost', 'outlay', 'refund')}
+
+    stakes = np.repeat(exact[:, None, :], len(grid), axis=1)
+    base   = np.floor(exact[:, mid] / step[:, mid] + 1e-9) * step[:, mid]
+    stakes[:, :, mid]  = np.maximum(base[:, None, :] + grid[None, :, :] * step[:, None, mid], 0.0)
+    stakes[:, :, last] = 0.0
+
+    profit  = outcome_profits(*split_stake(stakes, terms['cap']), terms['m'], terms)
+    others  = np.delete(profit, last, axis=-1).min(-1)
+    m_last  = legs['m'][:, None, last]
+    win     = legs['back'][:, None, last] + m_last * legs['boost'][:, None, last]
+    balance = _stake_for_return(others - profit[:, :, last], legs['cap'][:, None, last], win, 1 + m_last)
+    down    = np.floor(balance / step[:, None, last] + 1e-9) * step[:, None, last]
+    stakes  = np.concatenate([stakes, stakes], axis=1)
+    stakes[:, :, last] = np.concatenate([down, down + step[:, None, last]], axis=1)
+
+    worst = outcome_profits(*split_stake(stakes, terms['cap']), terms['m'], terms).min(-1)
+    pick  = worst.argmax(axis=1)
+    rows  = np.arange(n)
+    return stakes[rows, pick], worst[rows, pick]
+
+
+def round_stakes(kind, config, opps, step=STAKE_STEP, book_steps=None):
+    """Copies of `opps` with stakes rounded to bettable amounts.
+
+    Each book takes multiples of `step` dollars, or of `book_steps[book]` keyed
+    by the book as it appears on the rows. The promo leg keeps its stake; the
+    other legs are rounded to maximize the worst-case profit, reported next
+    to the exact figures (`rounded_*` fields on boost rows, `o2_rounded`,
+    `o3_rounded`, ... on soccer rows, `h1_rounded` / `h2_rounded` on Bet and Get rows).
+    """
+    book_steps = book_steps or {}
+    out        = [dict(op) for op in opps]
+    for rows, legs in leg_arrays(kind, config, out):
+        steps = np.array([[book_steps.get(book, step) for book in books] for books in legs['book']], dtype=np.float64)
+        stakes, worst = best_rounding(legs, steps)
+        for n, row, profit in zip(rows, stakes.tolist(), worst.tolist()):
+            _store(kind, out[n], row, profit)
+    return out
+
+
+def _store(kind, op, stakes, profit):
+    if kind == "promo":
+        if op['market_type'] == "2-way":
+            op['rounded_hedge'] = stakes[1]
+        else:
+            op['rounded_hedge1'], op['rounded_hedge2'] = stakes[1], stakes[2]
+        op['rounded_profit'] = profit
+    elif kind == "soccer":
+        for n, stake in enumerate(stakes[1:], 2):
+            op[f'o{n}_rounded'] = stake
+        op['rounded_profit'] = profit
+    else:
+        op['h1_rounded'] = stakes[1]
+        if len(stakes) == 3:
+            op['h2_rounded'] = stakes[2]
+        op['rounded_loss']  = profit
+        op['rounded_value'] = op['net_value'] - op['qualifying_loss'] + profit
@@ -0,0 +1,522 @@
+from datetime import datetime, timedelta
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+from .configs import book_key, leg_count
+from .constants import CENTRAL, CONV_BETGET, market_labels
+from .pricing import hedge_kernel, leg_divisors, multipliers, stake_split, target_split
+from .profiling import count, span, timed
+from .search import best_price_index, cheapest_hedge_pair, three_way_promo_legs, top_books, top_two
+from .topk import collector
+
+PICK_BLOCK = 1 << 18   # soccer combinations expanded and priced at once
+
+
+def config_market(config):
+    """The odds market a config scans; the soccer engine only prices match results."""
+    return config.get('market', 'h2h')
+
+
+def _hedge_books(config, cols):
+    """(allowed mask, hedge book ids, source book id) of a source-book config on one board.
+
+    Hedges go to the books in `hedge_books`, or every book on the board when
+    it is empty, less `exclude_books` and the source book itself.
+    """
+    source_key = book_key(config['book'])
+    hedge_keys = [book_key(b) for b in config.get('hedge_books') or ()] or None
+    exclude    = [source_key] + [book_key(b) for b in config.get('exclude_books') or ()]
+    hedge_mask = cols.book_mask(hedge_keys, exclude)
+    return hedge_mask | cols.book_mask([source_key]), set(np.flatnonzero(hedge_mask).tolist()), cols.book_id(source_key)
+
+
+def _price_candidates(strat, candidates, wager, boost_val=0):
+    """Run hedge_kernel over (ctx, source leg, hedge legs) candidates in one batch per leg count.
+
+    Returns per-candidate hedge stakes and profits, aligned with `candidates`.
+    """
+    stakes  = [None] * len(candidates)
+    profits = [None] * len(candidates)
+    by_legs = {}
+    for n, (_, _, hedges) in enumerate(candidates):
+        by_legs.setdefault(len(hedges), []).append(n)
+    for idx in by_legs.values():
+        source_prices = [candidates[n][1]['price'] for n in idx]
+        hedge_prices  = [[h['price'] for h in candidates[n][2]] for n in idx]
+        batch_stakes, batch_profit = hedge_kernel(strat, source_prices, hedge_prices, wager, boost_val)
+        for n, stake_row, profit in zip(idx, batch_stakes.tolist(), batch_profit.tolist()):
+            stakes[n], profits[n] = stake_row, profit
+    return stakes, profits
+
+
+# ================================================================
+# MAIN BOOST ENGINE
+# ================================================================
+@timed("enumerate")
+def promo_legs(p, snapshot, today=None):
+    """Per-game leg enumeration for the boost engine.
+
+    Depends only on the books, sports, market and pruning in `p`, so configs
+    that share them can share the result. Each entry is (ctx, cols,
+    two_way_pairs, three_way_rows). Two-way legs are hedged at the same line:
+    a spread against the opposite handicap, a total against the other side of
+    the same total. Each 3-way outcome keeps only its two best hedge books
+    unless `prune_dominated` is off, so wide boards cost no more to search.
+    """
+    keep       = 2 if p.get('prune_dominated', True) else None
+    today_date = today or datetime.now(CENTRAL).date()
+    game_legs  = []
+
+    for sport_label, cols in snapshot.iter_columns(p['sports'], config_market(p)):
+        allowed, hedge_ids, source_id = _hedge_books(p, cols)
+
+        for g in cols.games_between(today_date, today_date + timedelta(days=3)):
+            rows = cols.rows(g, allowed)
+            if not rows:
+                continue
+
+            game            = cols.games[g]
+            game_label      = f"{game.get('away_team', 'Away')} vs {game.get('home_team', 'Home')}"
+            game_time       = cols.local_times[g].strftime("%m/%d %I:%M %p")
+            unique_outcomes = cols.teams(rows)
+            books, outcomes = cols.row_book[rows].tolist(), cols.row_outcome[rows].tolist()
+
+            ctx = (game.get('id'), game_label, sport_label, game_time)
+
+            # --- 2-WAY BRANCH ---
+            if len(unique_outcomes) == 2:
+                best_hedge = cols.best_by_side([r for r, b in zip(rows, books) if b in hedge_ids])
+                lines      = cols.row_line[rows].tolist()
+                pairs      = []
+
+                for s_n in range(len(rows)):
+                    if books[s_n] != source_id: continue
+                    hedge_teams = [t for t in unique_outcomes if t != cols.outcome_names[outcomes[s_n]]]
+                    if not hedge_teams: continue
+                    h_row = best_hedge.get((cols.outcome_ids[hedge_teams[0]], lines[s_n]))
+                    if h_row is None: continue
+                    pairs.append((rows[s_n], h_row))
+                game_legs.append((ctx, cols, pairs, None))
+
+            # --- 3-WAY BRANCH ---
+            elif len(unique_outcomes) == 3:
+                outcome_rows = [[r for r, o in zip(rows, outcomes) if o == cols.outcome_ids[team]]
+                                for team in unique_outcomes]
+                index = best_price_index(cols, outcome_rows, exclude_id=source_id, keep=keep)
+                game_legs.append((ctx, cols, None, (outcome_rows, index, source_id)))
+
+    return game_legs
+
+
+@timed("price")
+def price_promo(p, game_legs, top_k=None):
+    """Price promo_legs output for the strategy, boost and wager in `p`.
+
+    With `top_k`, only the best `top_k` deduped opportunities are kept, ranked.
+    """
+    candidates = []   # (game context, source leg, hedge legs)
+    for ctx, cols, pairs, three_way in game_legs:
+        if pairs is not None:
+            candidates.extend((ctx, cols.leg(s_row), (cols.leg(h_row),)) for s_row, h_row in pairs)
+            continue
+        outcome_rows, index, source_id = three_way
+        for src_row, hedge_rows in three_way_promo_legs(
+            p['strat'], p['wager'], p['boost_val'], cols, outcome_rows, source_id, index
+        ):
+            candidates.append((ctx, cols.leg(src_row), tuple(cols.leg(r) for r in hedge_rows)))
+
+    count("combinations", len(candidates))
+    stakes, profits = _price_candidates(p['strat'], candidates, p['wager'], p['boost_val'])
+    used_boost      = p['boost_val'] if p['strat'] == "Profit Boost (%)" else 0
+    market_label    = market_labels[config_market(p)]
+
+    opps = collector(top_k)
+    for (ctx, s, hedges), stake_row, exact_profit in zip(candidates, stakes, profits):
+        if exact_profit <= -10.0:
+            continue
+        game_id, game_label, sport_label, game_time = ctx
+        if len(hedges) == 1:
+            h   = hedges[0]
+            key = (game_label, s['book_title'], h['book_title'])
+            if not opps.wants(key, exact_profit):
+                continue
+            opps.add(key, exact_profit, {
+                "game_id": game_id, "game": game_label, "sport": sport_label,
+                "market_type": "2-way", "market_label": market_label,
+                "time": game_time, "exact_profit": exact_profit,
+                "exact_hedge": stake_row[0], "s_team": s['team'],
+                "s_book": s['book_title'], "s_price": s['price'],
+                "h_book": h['book_title'], "h_team": h['team'],
+                "h_price": h['price'], "wager": p['wager'],
+                "strat": p['strat'], "used_boost": used_boost
+            })
+        else:
+            ho1, ho2 = hedges
+            key = (game_label, s['book_title'], frozenset([s['book_title'], ho1['book_title'], ho2['book_title']]))
+            if not opps.wants(key, exact_profit):
+                continue
+            opps.add(key, exact_profit, {
+                "game_id": game_id, "game": game_label, "sport": sport_label,
+                "market_type": "3-way", "market_label": market_label,
+                "time": game_time, "exact_profit": exact_profit,
+                "wager": p['wager'], "strat": p['strat'],
+                "s_team": s['team'], "s_book": s['book_title'],
+                "s_price": s['price'], "exact_w1": p['wager'],
+                "h1_book": ho1['book_title'], "h1_team": ho1['team'],
+                "h1_price": ho1['price'], "exact_hedge1": stake_row[0],
+                "h2_book": ho2['book_title'], "h2_team": ho2['team'],
+                "h2_price": ho2['price'], "exact_hedge2": stake_row[1],
+                "used_boost": used_boost
+            })
+
+    with span("collect"):
+        all_opps = opps.results()
+    count("opportunities", len(all_opps))
+    return all_opps
+
+
+def run_promo_scan(p, snapshot, today=None, top_k=None):
+    return price_promo(p, promo_legs(p, snapshot, today), top_k)
+
+
+# ================================================================
+# N-LEG SOCCER ENGINE
+# ================================================================
+# Leg n bets the game's n-th outcome (in board order) at one of its books,
+# with its own promo type, boost and cap. Leg 1 stakes a fixed wager; every
+# later leg is sized to return what leg 1 pays, so the profit is locked. The
+# default three legs price a soccer match result; two legs price any moneyline.
+
+def _leg_mask(cols, sc, n):
+    """Books leg n may use: book1 for leg 1, then `book{n}` (every book on the board when empty) less exclude_books."""
+    if n == 1:
+        return cols.book_mask([book_key(sc['book1'])])
+    books = [book_key(b) for b in sc.get(f'book{n}') or ()] or None
+    return cols.book_mask(books, [book_key(b) for b in sc.get('exclude_books') or ()])
+
+
+@timed("enumerate")
+def soccer_legs(sc, snapshot, today=None):
+    """Candidate rows of every leg of an N-leg config, as one block per league.
+
+    Returns [(league, cols, games, sizes, leg_rows)]: `games` holds (game,
+    local time) pairs in board order, `leg_rows[n]` the candidate rows of leg
+    n + 1 over all of them, game by game, and `sizes[g, n]` how many of those
+    belong to game g. soccer_picks expands a block into book combinations.
+    Unless `prune_dominated` is off, each leg keeps only its `legs` best books
+    per game, so combinations stop growing with the number of books.
+    """
+    n_legs     = leg_count(sc)
+    prune      = sc.get('prune_dominated', True)
+    today_date = today or datetime.now(CENTRAL).date()
+    end_date   = sc['lookahead_end_date']
+
+    blocks = []
+    for league_label, cols in snapshot.iter_columns(sc['leagues']):
+        window = np.zeros(len(cols.games), dtype=bool)
+        window[cols.games_between(today_date, end_date)] = True
+        row_game = np.repeat(np.arange(len(cols.games)), np.diff(cols.offsets))
+        rows     = np.flatnonzero(window[row_game] & (cols.row_size == n_legs))
+        if not len(rows):
+            continue
+        row_game = row_game[rows]
+
+        # Leg n takes the game's n-th distinct outcome in board order (ColumnarOdds.teams),
+        # for the whole league at once: rank each (game, outcome) by its first row.
+        _, first, pair_of = np.unique(row_game * len(cols.outcome_names) + cols.row_outcome[rows],
+                                      return_index=True, return_inverse=True)
+        order      = np.argsort(first)
+        pair_game  = row_game[first[order]]
+        starts     = np.flatnonzero(np.r_[True, pair_game[1:] != pair_game[:-1]])
+        slot       = np.empty(len(order), dtype=np.int64)
+        slot[order] = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        slot       = slot[pair_of]
+
+        leg_masks = np.array([_leg_mask(cols, sc, n) for n in range(1, n_legs + 1)])
+        on_leg    = leg_masks[np.minimum(slot, n_legs - 1), cols.row_book[rows]] & \
+                    (np.bincount(pair_game, minlength=len(cols.games)) == n_legs)[row_game]
+        if prune:
+            live         = np.flatnonzero(on_leg)
+            on_leg[live] = top_books(row_game[live] * n_legs + slot[live], cols.row_book[rows[live]],
+                                     cols.row_price[rows[live]], n_legs)
+        sizes     = np.zeros((len(cols.games), n_legs), dtype=np.int64)
+        np.add.at(sizes, (row_game[on_leg], slot[on_leg]), 1)
+        playable  = (sizes > 0).all(axis=1)
+        if not playable.any():
+            continue
+
+        on_leg  &= playable[row_game]
+        leg_rows = [rows[on_leg & (slot == n)] for n in range(n_legs)]
+        games    = [(cols.games[g], cols.local_times[g]) for g in np.flatnonzero(playable).tolist()]
+        blocks.append((league_label, cols, games, sizes[playable], leg_rows))
+
+    return blocks
+
+
+def soccer_picks(block, limit=PICK_BLOCK):
+    """(game_of, picks) chunks of a soccer_legs block, about `limit` combinations at a time.
+
+    Each row of `picks` places every leg at a different book, as positions
+    into each leg's rows; its game is in `game_of`. Games come in board order,
+    never split across chunks, and each game's picks in nested-loop order with
+    leg 1 outermost.
+    """
+    _, cols, _, sizes, leg_rows = block
+    totals = sizes.prod(axis=1).tolist()
+    starts = np.cumsum(sizes, axis=0) - sizes
+    lo, picked = 0, 0
+    for hi in range(1, len(totals) + 1):
+        picked += totals[hi - 1]
+        if picked < limit and hi < len(totals):
+            continue
+        game_of, picks = _mixed_radix(sizes[lo:hi])
+        picks   += starts[lo]
+        distinct = (np.diff(_pick_books(cols, leg_rows, picks), axis=1) != 0).all(axis=1)
+        yield game_of[distinct] + lo, picks[distinct]
+        lo, picked = hi, 0
+
+
+def _mixed_radix(sizes):
+    """(game, positions) of every pick over games with `sizes[g, n]` rows on leg n, in nested-loop order."""
+    totals  = sizes.prod(axis=1)
+    game_of = np.repeat(np.arange(len(sizes)), totals)
+    local   = np.arange(totals.sum()) - np.repeat(np.cumsum(totals) - totals, totals)
+    strides = np.concatenate([np.cumprod(sizes[:, :0:-1], axis=1)[:, ::-1],
+                              np.ones((len(sizes), 1), dtype=sizes.dtype)], axis=1)
+    starts  = np.cumsum(sizes, axis=0) - sizes
+    picks   = local[:, None] // strides[game_of] % sizes[game_of] + starts[game_of]
+    return game_of, picks
+
+
+def _pick_books(cols, leg_rows, picks):
+    """Sorted book ids of every pick, shape (picks, legs)."""
+    return np.sort(np.stack([cols.row_book[rows][picks[:, n]] for n, rows in enumerate(leg_rows)], axis=1), axis=1)
+
+
+@timed("price")
+def price_soccer(sc, game_legs, top_k=None):
+    """Price soccer_legs output with the per-leg promos, stakes and caps in `sc`.
+
+    Each leg's payout terms are tabled once per candidate (leg, book, price)
+    row and gathered for every combination, so a chunk of combinations
+    prices in one pass and only each dedup key's best reaches the collector.
+    With `top_k`, only the best `top_k` deduped opportunities are kept, ranked.
+    """
+    n_legs = leg_count(sc)
+    strats = [sc[f'strat{n}'] for n in range(1, n_legs + 1)]
+    boosts = [sc[f'boost{n}'] if strat == "Profit Boost (%)" else 0 for n, strat in enumerate(strats, 1)]
+    wager  = sc['wager1']
+    fields = [tuple(f"o{n}_{field}" for field in ("book", "team", "price", "wager", "promo", "cash", "strat", "boost"))
+              for n in range(1, n_legs + 1)]
+    promo1, cash1 = (float(v) for v in stake_split(strats[0], sc['cap1_val'], wager))
+
+    opps = collector(top_k)
+    for block in game_legs:
+        league_label, cols, games, _, leg_rows = block
+        terms   = [leg_divisors(strat, sc[f'boost{n}'], multipliers(cols.row_price[rows]))
+                   for n, (strat, rows) in enumerate(zip(strats, leg_rows), 1)]
+        labels  = [f"{game.get('away_team')} vs {game.get('home_team')}" for game, _ in games]
+        times   = [local_time.strftime("%m/%d %I:%M %p") for _, local_time in games]
+        by_name = {}
+        name_of = np.array([by_name.setdefault(label, len(by_name)) for label in labels], dtype=np.int64)
+
+        for game_of, picks in soccer_picks(block):
+            count("combinations", len(picks))
+            if not len(picks):
+                continue
+
+            # Leg 1 stakes the wager; every later leg is sized to return its payout.
+            div_promo, div_cash = (table[picks[:, 0]] for table in terms[0])
+            target = promo1 * div_promo + cash1 * div_cash
+            outlay = cash1 if strats[0] == "Bonus Bet" else wager
+            splits = [np.full(len(picks), promo1), np.full(len(picks), cash1)]
+            for n in range(1, n_legs):
+                div_promo, div_cash = (table[picks[:, n]] for table in terms[n])
+                promo, cash = np.broadcast_arrays(*target_split(strats[n], sc[f'cap{n + 1}_val'], target, div_promo, div_cash))
+                outlay      = outlay + (cash if strats[n] == "Bonus Bet" else promo + cash)
+                splits     += [promo, cash]
+            profits = target - outlay
+
+            # Best pick per (game, book set) — its dedup key — in first-seen key
+            # order, ties keeping the earliest pick, so the collector sees one
+            # candidate per key.
+            books = _pick_books(cols, leg_rows, picks)
+            code  = name_of[game_of]
+            for n in range(n_legs):
+                code = code * len(cols.book_keys) + books[:, n]
+            _, first, key_of = np.unique(code, return_index=True, return_inverse=True)
+            ranked  = np.lexsort((-profits, key_of))
+            best    = ranked[np.r_[True, key_of[ranked][1:] != key_of[ranked][:-1]]]
+            winners = best[np.argsort(first, kind='stable')]
+
+            pick_rows = np.stack([rows[picks[:, n]] for n, rows in enumerate(leg_rows)], axis=1)[winners].tolist()
+            stakes    = np.stack(splits, axis=1)[winners].tolist()   # promo, cash per leg
+            for g, book_set, net_profit, rows, stake in zip(game_of[winners].tolist(), books[winners].tolist(),
+                                                            profits[winners].tolist(), pick_rows, stakes):
+                key = (league_label, labels[g], tuple(book_set))
+                if not opps.wants(key, net_profit):
+                    continue
+
+                op = {
+                    "game_id":    games[g][0].get('id'),
+                    "game":       labels[g],
+                    "sport":      league_label,
+                    "time":       times[g],
+                    "net_profit": net_profit,
+                }
+                for n, row in enumerate(rows):
+                    leg         = cols.leg(row)
+                    promo, cash = stake[2 * n:2 * n + 2]
+                    op.update(zip(fields[n], (leg['book_title'], leg['team'], leg['price'], promo + cash if n else wager,
+                                              promo, cash, strats[n], boosts[n])))
+                opps.add(key, net_profit, op)
+
+    with span("collect"):
+        soccer_opps = opps.results()
+    count("opportunities", len(soccer_opps))
+    return soccer_opps
+
+
+def run_multi_book_soccer_scan(sc, snapshot, today=None, top_k=None):
+    return price_soccer(sc, soccer_legs(sc, snapshot, today), top_k)
+
+
+# ================================================================
+# BET & GET ENGINE
+# ================================================================
+@timed("enumerate")
+def bet_get_legs(bg, snapshot, today=None):
+    """(ctx, qualifier leg, hedge legs) candidates for the source book, sports and market in `bg`.
+
+    The qualifier goes on every outcome the source book quotes. Its hedges
+    are the best-priced books on the other outcomes: at the same line for
+    2-way markets, and the cheapest pair at different books from a top-2
+    index for 3-way ones, so each game costs O(outcomes x books). Hedge books
+    follow `hedge_books` and `exclude_books` as in the boost engine.
+    """
+    today_date = today or datetime.now(CENTRAL).date()
+    candidates = []
+
+    for sport_label, cols in snapshot.iter_columns(bg['sports'], config_market(bg)):
+        allowed, hedge_ids, source_id = _hedge_books(bg, cols)
+
+        for g in cols.games_between(today_date, today_date + timedelta(days=3)):
+            rows = cols.rows(g, allowed)
+            if not rows:
+                continue
+
+            game            = cols.games[g]
+            unique_outcomes = cols.teams(rows)
+            game_label      = f"{game.get('away_team')} vs {game.get('home_team')}"
+            game_time       = cols.local_times[g].strftime("%m/%d %I:%M %p")
+            books, outcomes = cols.row_book[rows].tolist(), cols.row_outcome[rows].tolist()
+
+            ctx = (game.get('id'), game_label, sport_label, game_time)
+
+            if len(unique_outcomes) == 3:
+                outcome_rows = [[r for r, o in zip(rows, outcomes) if o == cols.outcome_ids[team]]
+                                for team in unique_outcomes]
+                top = top_two(cols, best_price_index(cols, outcome_rows, exclude_id=source_id))
+
+                for s_n, s_rows in enumerate(outcome_rows):
+                    x_n, y_n = [n for n in range(3) if n != s_n]
+                    hedges   = cheapest_hedge_pair(cols, top[x_n], top[y_n])
+                    if hedges is None:
+                        continue
+                    for s_row in s_rows:
+                        if cols.row_book[s_row] == source_id:
+                            candidates.append((ctx, cols.leg(s_row), tuple(cols.leg(r) for r in hedges)))
+
+            elif len(unique_outcomes) == 2:
+                best_hedge = cols.best_by_side([r for r, b in zip(rows, books) if b in hedge_ids])
+                lines      = cols.row_line[rows].tolist()
+
+                for s_n in range(len(rows)):
+                    if books[s_n] != source_id: continue
+                    opp_team = [t for t in unique_outcomes if t != cols.outcome_names[outcomes[s_n]]]
+                    if not opp_team: continue
+                    h_row = best_hedge.get((cols.outcome_ids[opp_team[0]], lines[s_n]))
+                    if h_row is None: continue
+                    candidates.append((ctx, cols.leg(rows[s_n]), (cols.leg(h_row),)))
+
+    return candidates
+
+
+@timed("price")
+def price_bet_get(bg, candidates, top_k=None):
+    """Price bet_get_legs output for the qualifying stake and bonus value in `bg`.
+
+    Deduped per game and book set like the boost engine; with `top_k`, only
+    the best `top_k` are kept, ranked.
+    """
+    projected_bonus_value = bg['bonus_val'] * CONV_BETGET
+    market_label          = market_labels[config_market(bg)]
+
+    # The qualifier is an unpromoted cash bet, so it prices as "Straight Cash".
+    count("combinations", len(candidates))
+    stakes, losses = _price_candidates("Straight Cash", candidates, bg['wager'])
+
+    opps = collector(top_k)
+    for (ctx, s, hedges), stake_row, qualifying_loss in zip(candidates, stakes, losses):
+        game_id, game_label, sport_label, game_time = ctx
+        net_value = projected_bonus_value + qualifying_loss
+        if len(hedges) == 1:
+            key = (game_label, s['book_title'], hedges[0]['book_title'])
+        else:
+            key = (game_label, s['book_title'], frozenset([s['book_title']] + [h['book_title'] for h in hedges]))
+        if not opps.wants(key, net_value):
+            continue
+        op = {
+            "game_id": game_id, "game": game_label, "sport": sport_label,
+            "market_type": "3-way" if len(hedges) == 2 else "2-way", "market_label": market_label, "time": game_time,
+            "qualifying_loss": qualifying_loss, "net_value": net_value,
+            "s_book": s['book_title'], "s_team": s['team'], "s_price": s['price'], "s_wager": bg['wager'],
+            "h1_book": hedges[0]['book_title'], "h1_team": hedges[0]['team'], "h1_price": hedges[0]['price'], "h1_wager": stake_row[0],
+        }
+        if len(hedges) == 2:
+            op.update({
+                "h2_book": hedges[1]['book_title'], "h2_team": hedges[1]['team'], "h2_price": hedges[1]['price'], "h2_wager": stake_row[1],
+            })
+        opps.add(key, net_value, op)
+
+    with span("collect"):
+        bg_opps = opps.results()
+    count("opportunities", len(bg_opps))
+    return bg_opps
+
+
+def run_bet_get_scan(bg, snapshot, today=None, top_k=None):
+    return price_bet_get(bg, bet_get_legs(bg, snapshot, today), top_k)
+
+
+# ================================================================
+# ENGINE REGISTRY
+# ================================================================
+class Scan(NamedTuple):
+    run:         Callable   # run(config, snapshot, today=None, top_k=None) -> opportunities
+    sports_key:  str        # config key listing the sports it scans
+    rank_key:    str        # field results are ranked by
+    legs:        Callable   # legs(config, snapshot, today) -> leg enumeration
+    price:       Callable   # price(config, legs, top_k=None) -> opportunities
+    legs_fields: tuple      # config keys the leg enumeration depends on; "{}" repeats per leg
+
+SCANS = {
+    "promo":   Scan(run_promo_scan, 'sports', 'exact_profit', promo_legs, price_promo,
+                    ('book', 'hedge_books', 'exclude_books', 'prune_dominated', 'sports', 'market')),
+    "soccer":  Scan(run_multi_book_soccer_scan, 'leagues', 'net_profit', soccer_legs, price_soccer,
+                    ('legs', 'book{}', 'exclude_books', 'prune_dominated', 'leagues', 'lookahead_end_date')),
+    "bet_get": Scan(run_bet_get_scan, 'sports', 'net_value', bet_get_legs, price_bet_get,
+                    ('book', 'hedge_books', 'exclude_books', 'sports', 'market')),
+}
+
+def legs_fields(kind, config):
+    """The engine's legs_fields, with per-leg fields spelled out for each leg of `config`."""
+    legs = range(1, leg_count(config) + 1)
+    return tuple(name for field in SCANS[kind].legs_fields
+                 for name in ([field.format(n) for n in legs] if "{}" in field else [field]))
+
+def rank_opps(kind, opps):
+    rank_key = SCANS[kind].rank_key
+    with span("sort"):
+        return sorted(opps, key=lambda op: op[rank_key], reverse=True)
@@ -0,0 +1,186 @@
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .odds import MAX_WORKERS, REGIONS, _quota_value, commence_local, patch_games
+from .profiling import with_profile
+
+HOURLY_BUDGET = 120          # credits the scheduler may spend per rolling hour
+QUOTA_RESERVE = 500          # below this many monthly credits, only cache misses are fetched
+MIN_REFRESH   = 60
+MAX_REFRESH   = 1800
+BUSY_WINDOW   = 3 * 3600     # games within this long of kickoff (either side) count as busy
+STALE_TTL     = 6 * 3600     # cache ttl to pair with the scheduler: the oldest odds it will fall back to
+EVENT_REFRESH = 3            # games refreshed one event call each before a whole-sport fetch is used
+
+
+def request_cost(market, bookmakers=None):
+    """Credits one call costs: markets x regions, where every 10 bookmakers bill as one region."""
+    regions = math.ceil(len(bookmakers) / 10) if bookmakers else len(REGIONS.split(','))
+    return len(market.split(',')) * regions
+
+
+def refresh_interval(games, now=None):
+    """Seconds a sport's payload stays fresh.
+
+    Quiet boards refresh every MAX_REFRESH; each game in play or starting
+    within BUSY_WINDOW shortens that, down to MIN_REFRESH.
+    """
+    now  = now or time.time()
+    busy = sum(1 for game in games if abs(commence_local(game).timestamp() - now) <= BUSY_WINDOW)
+    return max(MIN_REFRESH, MAX_REFRESH / (1 + busy))
+
+
+# ================================================================
+# FETCH SCHEDULER
+# ================================================================
+class FetchScheduler:
+    """Decides when odds are actually re-fetched, for every session in the process.
+
+    A cached payload is served until its `refresh_interval` runs out. Identical
+    requests that arrive while a fetch is in flight wait for that fetch instead
+    of making their own. Once the hourly credit budget is spent, or the monthly
+    quota drops to `reserve`, stale cached odds are served instead of fetching.
+    With `fetch_event(sport_key, event_id, market)`, `refresh_events` can
+    re-fetch single games of a cached sport; `event_cost(market)` is what one
+    event call bills (default: `cost`) and `max_events` how many games may
+    go through event calls when that bills more than one sport fetch.
+    """
+
+    def __init__(self, fetch, cache, hourly_budget=HOURLY_BUDGET, reserve=QUOTA_RESERVE, cost=request_cost,
+                 fetch_event=None, event_cost=None, max_events=EVENT_REFRESH):
+        self.source        = fetch
+        self.event_source  = fetch_event
+        self.event_cost    = event_cost or cost
+        self.max_events    = max_events
+        self.cache         = cache
+        self.hourly_budget = hourly_budget
+        self.reserve       = reserve
+        self.cost          = cost
+        self.fetches       = 0
+        self.coalesced     = 0
+        self.throttled     = 0
+        self.throttled_at  = None
+        self._spent        = deque()   # (time, credits) of fetches in the last hour
+        self._inflight     = {}        # key -> Future of the fetch every caller shares
+        self._landed       = {}        # key -> time its last fetch finished
+        self._lock         = threading.Lock()
+
+    def spent_last_hour(self, now=None):
+        now = now or time.time()
+        with self._lock:
+            self._expire(now)
+            return sum(credits for _, credits in self._spent)
+
+    def _expire(self, now):
+        while self._spent and now - self._spent[0][0] > 3600:
+            self._spent.popleft()
+
+    def _throttle(self, credits, now, cached):
+        """Why this fetch should not go out, or None to let it through.
+
+        Past the hourly budget nothing is fetched; with the monthly quota in
+        reserve, only payloads missing from the cache are. An unknown quota
+        (no response has reported one) leaves only the hourly budget.
+        """
+        self._expire(now)
+        if sum(c for _, c in self._spent) + credits > self.hourly_budget:
+            return "Hourly request budget spent"
+        latest = self.cache.latest_quota()
+        if latest is None:
+            return None
+        quota = _quota_value(latest)
+        if quota <= 0 or (cached and quota <= self.reserve):
+            return "Monthly quota in reserve"
+        return None
+
+    def fetch(self, sport_key, market='h2h', since=None):
+        """Drop-in for `fetch(sport_key, market)` in `load_snapshot`.
+
+        A payload fetched before `since` (epoch seconds) counts as stale, so
+        `since=time.time()` forces a refresh, budget permitting.
+        """
+        key = f"{sport_key}:{market}"
+        while True:
+            read_at = time.time()
+            entry   = self.cache.entry(key)
+            if (entry is not None and read_at - entry[2] < refresh_interval(entry[0], read_at)
+                    and (since is None or entry[2] >= since)):
+                return entry[:2]
+
+            with self._lock:
+                if self._landed.get(key, 0) > read_at:
+                    continue   # another caller refreshed it after we read the cache
+                pending = self._inflight.get(key)
+                if pending is None:
+                    credits = self.cost(market)
+                    reason  = self._throttle(credits, read_at, entry is not None)
+                    if reason:
+                        self.throttled   += 1
+                        self.throttled_at = read_at
+                        return entry[:2] if entry is not None else (None, reason)
+                    pending = self._inflight[key] = Future()
+                    self._spent.append((read_at, credits))
+                    self.fetches += 1
+                    break
+                self.coalesced += 1
+            return pending.result()
+
+        try:
+            games, remaining = self.source(sport_key, market)
+            if games is not None:
+                self.cache.put(key, games, remaining)
+            pending.set_result((games, remaining))
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._landed[key] = time.time()
+                del self._inflight[key]
+        return games, remaining
+
+    def refresh_events(self, sport_key, event_ids, market='h2h'):
+        """Re-fetch just `event_ids` of a sport and patch them into its cached payload.
+
+        Event calls run in parallel and return one game each, so they land
+        well before a whole-sport payload. Each one bills `event_cost`, about
+        what a sport call does, so they are used when they cost no more
+        credits than one sport fetch or there are at most `max_events` of
+        them. Otherwise, or when the sport is not cached to patch, the whole
+        sport is re-fetched. Events the API no longer knows are dropped.
+        Returns (games, remaining) for the sport, like `fetch`.
+        """
+        key     = f"{sport_key}:{market}"
+        now     = time.time()
+        entry   = self.cache.entry(key)
+        credits = len(event_ids) * self.event_cost(market)
+        if (self.event_source is None or entry is None
+                or (credits > self.cost(market) and len(event_ids) > self.max_events)):
+            return self.fetch(sport_key, market, since=now)
+
+        with self._lock:
+            reason = self._throttle(credits, now, cached=True)
+            if reason:
+                self.throttled   += 1
+                self.throttled_at = now
+                return entry[:2]
+            self._spent.append((now, credits))
+            self.fetches += len(event_ids)
+
+        fresh, gone, remaining = {}, set(), entry[1]
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_WORKERS, len(event_ids)))) as pool:
+            landed = list(pool.map(with_profile(lambda event_id: self.event_source(sport_key, event_id, market)),
+                                   event_ids))
+        for event_id, (game, status) in zip(event_ids, landed):
+            if game is not None:
+                fresh[event_id], remaining = game, status or remaining
+            elif status == "HTTP 404":
+                gone.add(event_id)
+        latest = self.cache.entry(key) or entry   # a sport fetch may have landed meanwhile
+        games  = patch_games(latest[0], fresh, gone)
+        if fresh or gone:
+            self.cache.patch(key, games, remaining)
+        return games, remaining
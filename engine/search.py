@@ -0,0 +1,151 @@
+import heapq
+from itertools import permutations
+
+import numpy as np
+
+from .pricing import hedge_kernel, multipliers
+
+# Orderings (i, j, k) in the order the original nested outcome loops visited them.
+PERMS_3 = list(permutations(range(3)))
+
+
+# ================================================================
+# DOMINANCE PRUNING
+# ================================================================
+# Every leg of a combination sits at a different book. If a leg's book has
+# `keep` or more better-priced books on its outcome and only `keep - 1` other
+# legs can take them, one is always free, and moving the leg there pays at
+# least as much whatever the result: the combination is dominated. So each
+# outcome needs only its `keep` best books, however many books the board has.
+
+def top_books(group, book, price, keep):
+    """Mask of the rows kept when each group holds only its `keep` best-priced books.
+
+    A book's best row stands for it; ties keep the earlier row.
+    """
+    rows  = np.arange(len(group))
+    order = np.lexsort((rows, -price, book, group))
+    first = np.r_[True, (group[order][1:] != group[order][:-1]) | (book[order][1:] != book[order][:-1])]
+    best  = order[first]
+    best  = best[np.lexsort((best, -price[best], group[best]))]
+    start = np.flatnonzero(np.r_[True, group[best][1:] != group[best][:-1]])
+    rank  = rows[:len(best)] - np.repeat(start, np.diff(np.r_[start, len(best)]))
+    mask  = np.zeros(len(group), dtype=bool)
+    mask[best[rank < keep]] = True
+    return mask
+
+
+# ================================================================
+# BEST-PRICE INDEX
+# ================================================================
+def best_price_index(cols, outcome_rows, exclude_id=None, keep=None):
+    """Per-outcome {book_id: (position, row)} keeping each book's best price.
+
+    `outcome_rows` holds one list of ColumnarOdds rows per outcome; `position`
+    is the row's index in its outcome list, which fixes tie-breaking order.
+    With `keep`, each outcome holds only its `keep` best-priced books.
+    """
+    index = []
+    for rows in outcome_rows:
+        by_book = {}
+        books, prices = cols.row_book[rows].tolist(), cols.row_price[rows].tolist()
+        for pos, (row, book, price) in enumerate(zip(rows, books, prices)):
+            if book == exclude_id:
+                continue
+            if book not in by_book or price > by_book[book][2]:
+                by_book[book] = (pos, row, price)
+        if keep is not None and len(by_book) > keep:
+            kept    = heapq.nsmallest(keep, by_book, key=lambda b: (-by_book[b][2], by_book[b][0]))
+            by_book = {book: entry for book, entry in by_book.items() if book in kept}
+        index.append({book: (pos, row) for book, (pos, row, _) in by_book.items()})
+    return index
+
+
+def top_two(cols, index):
+    """The two best-priced (book_id, row) entries of each outcome in a best_price_index, best first.
+
+    Ties keep board order.
+    """
+    return [[(book, row) for book, (_, row) in heapq.nlargest(
+                2, by_book.items(), key=lambda kv: (cols.row_price[kv[1][1]], -kv[1][0]))]
+            for by_book in index]
+
+
+def cheapest_hedge_pair(cols, x_top, y_top):
+    """(x row, y row) at different books costing the least to hedge a fixed payout, or None.
+
+    A hedge returning `target` stakes target / (1 + m), so the pair minimizing
+    the summed 1 / (1 + m) is cheapest for any qualifier. If the two best
+    books coincide, one side drops to its second book, so top_two entries
+    always hold the answer.
+    """
+    pairs = [(x_row, y_row) for x_book, x_row in x_top for y_book, y_row in y_top if x_book != y_book]
+    if not pairs:
+        return None
+    cost = (1 / (1 + multipliers(cols.row_price[np.array(pairs)]))).sum(axis=1)
+    return pairs[int(cost.argmin())]
+
+
+# ================================================================
+# 3-WAY PROMO SEARCH
+# ================================================================
+def three_way_promo_legs(strat, wager, boost_val, cols, outcome_rows, source_id, index=None):
+    """Best (source row, (hedge1 row, hedge2 row)) per hedge-book pair with profit > -10.
+
+    Equivalent to walking every outcome ordering and o1×o2×o3 book triple and
+    keeping the first most profitable candidate per book set, but each source
+    outcome only prices its hedge books once and pairs are visited cheapest
+    first, stopping as soon as no remaining pair can clear the -10 floor.
+    Results come back in the order the brute-force walk would first emit them.
+    Pass a prebuilt best_price_index to share it across configs.
+    """
+    if index is None:
+        index = best_price_index(cols, outcome_rows, exclude_id=source_id)
+    found = {}   # frozenset(hedge books) -> [best profit, best position, rows, first position]
+
+    for s_n, rows in enumerate(outcome_rows):
+        src = next(((pos, r) for pos, r in enumerate(rows) if cols.row_book[r] == source_id), None)
+        if src is None:
+            continue
+        x_n, y_n = [n for n in range(3) if n != s_n]
+        sides = []
+        for n in (x_n, y_n):
+            entries = list(index[n].items())
+            if not entries:
+                break
+            prices = cols.row_price[[row for _, (_, row) in entries]]
+            stakes, profit = hedge_kernel(strat, np.full(len(prices), cols.row_price[src[1]]), prices, wager, boost_val)
+            order = np.argsort(stakes[:, 0], kind='stable')
+            sides.append([(entries[m], stakes[m, 0].item(), profit[m].item()) for m in order])
+        if len(sides) < 2:
+            continue
+
+        x_side, y_side = sides
+        _, y_min_stake, y_max_profit = y_side[0]
+        for ((x_book, x_entry), x_stake, x_profit) in x_side:
+            if x_profit - y_min_stake <= -10.0 and y_max_profit - x_stake <= -10.0:
+                break
+            for ((y_book, y_entry), y_stake, y_profit) in y_side:
+                xy_profit = x_profit - y_stake   # hedge on x listed first
+                yx_profit = y_profit - x_stake   # hedge on y listed first
+                if xy_profit <= -10.0 and yx_profit <= -10.0:
+                    break
+                if x_book == y_book:
+                    continue
+                placed = {s_n: src, x_n: x_entry, y_n: y_entry}
+                key    = frozenset((x_book, y_book))
+                for first, second, profit in ((x_n, y_n, xy_profit), (y_n, x_n, yx_profit)):
+                    if profit <= -10.0:
+                        continue
+                    perm_n   = next(n for n, perm in enumerate(PERMS_3) if perm.index(first) < perm.index(second))
+                    position = (perm_n,) + tuple(placed[o][0] for o in PERMS_3[perm_n])
+                    pick     = (src[1], (placed[first][1], placed[second][1]))
+                    best     = found.get(key)
+                    if best is None:
+                        found[key] = [profit, position, pick, position]
+                        continue
+                    if profit > best[0] or (profit == best[0] and position < best[1]):
+                        best[0], best[1], best[2] = profit, position, pick
+                    best[3] = min(best[3], position)
+
+    return [best[2] for best in sorted(found.values(), key=lambda b: b[3])]
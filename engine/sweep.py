@@ -0,0 +1,163 @@
+from itertools import product
+
+import numpy as np
+
+from .configs import leg_count
+from .constants import CONV_NOSWEAT
+from .pricing import leg_divisors, multipliers, stake_split, target_split
+from .profiling import count, span
+from .scans import SCANS, soccer_picks
+
+SWEEP_FIELDS = {
+    "promo":  ("boost_val", "wager"),
+    "soccer": ("wager1", "boost{}", "cap{}_val"),   # boost and cap of every leg
+}
+
+
+def sweep_fields(kind, config):
+    """The SWEEP_FIELDS of an engine, with per-leg soccer fields spelled out for each leg."""
+    legs = range(1, leg_count(config) + 1) if kind == "soccer" else ()
+    return tuple(name for field in SWEEP_FIELDS[kind]
+                 for name in ([field.format(n) for n in legs] if "{}" in field else [field]))
+
+
+# ================================================================
+# CANDIDATES
+# ================================================================
+# The grid never changes which legs exist or which book has the best price on
+# an outcome, only what each combination is worth. Candidates are enumerated
+# once from the engine's own `legs` output and every grid point is priced from
+# their multipliers.
+
+def _promo_candidates(game_legs):
+    """(game index, source price, hedge prices) over every best-price hedge combination.
+
+    Hedge prices are padded to two legs with NaN for 2-way games.
+    """
+    games, sources, hedges = [], [], []
+    for g, (ctx, cols, pairs, three_way) in enumerate(game_legs):
+        if pairs is not None:
+            for s_row, h_row in pairs:
+                games.append(g); sources.append(cols.row_price[s_row]); hedges.append([cols.row_price[h_row], np.nan])
+            continue
+        outcome_rows, index, source_id = three_way
+        for s_n, rows in enumerate(outcome_rows):
+            src = next((r for r in rows if cols.row_book[r] == source_id), None)
+            if src is None:
+                continue
+            x_n, y_n = [n for n in range(3) if n != s_n]
+            for x_book, (_, x_row) in index[x_n].items():
+                for y_book, (_, y_row) in index[y_n].items():
+                    if x_book != y_book:
+                        games.append(g); sources.append(cols.row_price[src])
+                        hedges.append([cols.row_price[x_row], cols.row_price[y_row]])
+    return games, sources, hedges
+
+
+def _promo_profits(p, game_legs, points):
+    """Profit of every candidate at every grid point, shape (candidates, points)."""
+    games, sources, hedges = _promo_candidates(game_legs)
+    count("combinations", len(games))
+    sm    = multipliers(sources)[:, None]
+    hedge = np.nansum(1 / (1 + multipliers(np.array(hedges).reshape(-1, 2))), axis=1)[:, None]   # stake per $1 of target
+    boost = points['boost_val']
+
+    # Per-dollar forms of hedge_kernel: every stake scales with the wager.
+    if p['strat'] == "Profit Boost (%)":
+        per_dollar = (1 + sm * (1 + boost / 100)) * (1 - hedge) - 1
+    elif p['strat'] == "Bonus Bet":
+        per_dollar = sm * (1 - hedge)
+    elif p['strat'] == "No-Sweat Bet":
+        per_dollar = (1 + sm) * (1 - hedge) - 1 + CONV_NOSWEAT * hedge
+    else:
+        per_dollar = (1 + sm) * (1 - hedge) - 1
+    return games, per_dollar * points['wager']
+
+
+def _soccer_candidates(game_legs, n_legs):
+    """(game index, prices of shape (picks, legs)) over every soccer_legs combination."""
+    games, prices, offset = [], [], 0
+    for block in game_legs:
+        _, cols, league_games, _, leg_rows = block
+        for game_of, picks in soccer_picks(block):
+            games.extend((game_of + offset).tolist())
+            prices.append(np.stack([cols.row_price[rows][picks[:, n]] for n, rows in enumerate(leg_rows)], axis=1))
+        offset += len(league_games)
+    return games, np.concatenate(prices) if prices else np.empty((0, n_legs))
+
+
+def _soccer_profits(sc, game_legs, points):
+    """price_soccer's leg tables at every grid point, shape (picks, points)."""
+    games, prices = _soccer_candidates(game_legs, leg_count(sc))
+    count("combinations", len(games))
+    m = multipliers(prices)
+
+    def leg(n):
+        strat = sc[f'strat{n}']
+        return (strat, points[f'cap{n}_val'], *leg_divisors(strat, points[f'boost{n}'], m[:, n - 1:n]))
+
+    strat, cap, div_promo, div_cash = leg(1)
+    wager       = points['wager1']
+    promo, cash = stake_split(strat, cap, wager)
+    target      = promo * div_promo + cash * div_cash
+    spent       = cash if strat == "Bonus Bet" else wager
+
+    for n in range(2, leg_count(sc) + 1):
+        strat, cap, div_promo, div_cash = leg(n)
+        promo, cash = target_split(strat, cap, target, div_promo, div_cash)
+        spent       = spent + (cash if strat == "Bonus Bet" else promo + cash)
+    return games, target - spent
+
+
+# ================================================================
+# SWEEP
+# ================================================================
+def sweep(kind, config, snapshot, grid, today=None):
+    """Best profit per game over a grid of config values, from one leg enumeration.
+
+    `grid` maps sweep_fields of the engine to lists of values; fields left
+    out keep their value from `config`. Returns {"fields", "values", "games",
+    "best"}: each game's "profit" is an array with one axis per grid field,
+    holding the best profit any of its combinations locks at that point, and
+    "best" is the elementwise max over games.
+    """
+    if kind not in SWEEP_FIELDS:
+        raise ValueError(f"Sweeps cover {', '.join(SWEEP_FIELDS)}, not '{kind}'")
+    swept   = sweep_fields(kind, config)
+    unknown = [field for field in grid if field not in swept]
+    if unknown:
+        raise ValueError(f"Cannot sweep {', '.join(unknown)} for '{kind}'")
+
+    fields = list(grid)
+    values = [list(grid[field]) for field in fields]
+    shape  = tuple(len(v) for v in values)
+    combos = np.array(list(product(*values)), dtype=np.float64).reshape(-1, len(fields))
+    points = {field: np.full(len(combos), float(config[field])) for field in swept}
+    points.update({field: combos[:, i] for i, field in enumerate(fields)})
+
+    legs = SCANS[kind].legs(config, snapshot, today)
+    with span("price"):
+        if kind == "promo":
+            game_of, profits = _promo_profits(config, legs, points)
+            contexts         = [ctx for ctx, _, _, _ in legs]
+        else:
+            game_of, profits = _soccer_profits(config, legs, points)
+            contexts         = [(game.get('id'), f"{game.get('away_team')} vs {game.get('home_team')}",
+                                 league_label, local_time.strftime("%m/%d %I:%M %p"))
+                                for league_label, _, games, _, _ in legs for game, local_time in games]
+
+    games = []
+    if len(game_of):
+        game_of = np.asarray(game_of)
+        starts  = np.flatnonzero(np.r_[True, game_of[1:] != game_of[:-1]])
+        best    = np.maximum.reduceat(profits, starts, axis=0)
+        for g, surface in zip(game_of[starts].tolist(), best):
+            game_id, game_label, sport_label, game_time = contexts[g]
+            games.append({"game_id": game_id, "game": game_label, "sport": sport_label,
+                          "time": game_time, "profit": surface.reshape(shape)})
+    return {
+        "fields": fields,
+        "values": values,
+        "games":  games,
+        "best":   np.max([g['profit'] for g in games], axis=0) if games else np.full(shape, np.nan),
+    }
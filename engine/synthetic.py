@@ -0,0 +1,104 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from .constants import book_map, sports_map
+from .odds import OddsSnapshot
+
+SYNTHETIC_VIG = 0.045
+
+
+def synthetic_books(n_books):
+    """(key, title) pairs: the supported books first, then made-up ones."""
+    books = [(key, title) for title, key in book_map.items()][:n_books]
+    books += [(f"book{i}", f"Book {i}") for i in range(len(books), n_books)]
+    return books
+
+
+def _american(prob):
+    """Probability to an American price, rounded to the nearest 5 like real boards."""
+    if prob >= 0.5:
+        price = -round(100 * prob / (1 - prob) / 5) * 5
+        return price if price <= -100 else -100
+    price = round(100 * (1 - prob) / prob / 5) * 5
+    return max(price, 100)
+
+
+def _line_market(key, names, points, rng):
+    """A two-sided spreads or totals market around an even-money line."""
+    quoted = [0.5 * rng.uniform(0.94, 1.06) for _ in names]
+    margin = (1 + SYNTHETIC_VIG) / sum(quoted)
+    return {"key": key, "outcomes": [
+        {"name": n, "price": _american(p * margin), "point": pt} for n, p, pt in zip(names, quoted, points)
+    ]}
+
+
+def synthetic_games(n_games, n_books=4, outcomes=2, seed=0, start=None, sport_key="synthetic",
+                    markets=("h2h",)):
+    """Odds API-shaped games with the same output for the same arguments.
+
+    Each game gets a hidden fair line; every book quotes it with a margin of
+    about SYNTHETIC_VIG plus its own noise, so prices disagree across books
+    the way real boards do. With `outcomes=3` the third outcome is a Draw.
+    Kickoffs spread from two hours before `start` to four days after it.
+
+    `spreads` and `totals` in `markets` add those markets, with some books
+    hanging a point off the consensus line. They draw from their own random
+    stream, so the match-result prices do not change when they are added.
+    Team names carry the sport key and seed, so boards built for different
+    sports or seeds never share a game label.
+    """
+    rng      = random.Random(f"{sport_key}:{seed}")
+    line_rng = random.Random(f"{sport_key}:{seed}:lines")
+    start = start or datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    books = synthetic_books(n_books)
+    games = []
+    for g in range(n_games):
+        names = [f"{sport_key}:{seed} Team {g}A", f"{sport_key}:{seed} Team {g}B"] + (["Draw"] if outcomes == 3 else [])
+        fair  = [rng.uniform(0.5, 2.0) for _ in names]
+        fair  = [f / sum(fair) for f in fair]
+        spread = round((fair[1] - fair[0]) * 12) + 0.5    # away handicap: points when the home side is likelier
+        total  = line_rng.randint(6, 11) + 0.5
+
+        bookmakers = []
+        for key, title in books:
+            if rng.random() < 0.1:   # not every book lists every game
+                continue
+            quoted = [p * rng.uniform(0.94, 1.06) for p in fair]
+            margin = (1 + SYNTHETIC_VIG) / sum(quoted)
+            bookmakers.append({
+                "key":         key,
+                "title":       title,
+                "last_update": (start - timedelta(seconds=rng.randint(0, 600))).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                "markets":     [{"key": "h2h", "outcomes": [
+                    {"name": n, "price": _american(min(p * margin, 0.99))} for n, p in zip(names, quoted)
+                ]}]
+            })
+            if "spreads" in markets:
+                shift = line_rng.choice((0, 0, 0, -1, 1))
+                bookmakers[-1]["markets"].append(
+                    _line_market("spreads", names[:2], [spread + shift, -(spread + shift)], line_rng))
+            if "totals" in markets:
+                shift = line_rng.choice((0, 0, 0, -1, 1))
+                bookmakers[-1]["markets"].append(
+                    _line_market("totals", ["Over", "Under"], [total + shift] * 2, line_rng))
+
+        commence = start + timedelta(minutes=rng.randint(-120, 4 * 24 * 60))
+        games.append({
+            "id":            f"{sport_key}-{seed}-{g}",
+            "sport_key":     sport_key,
+            "commence_time": commence.strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "home_team":     names[1],
+            "away_team":     names[0],
+            "bookmakers":    bookmakers
+        })
+    return games
+
+
+def synthetic_snapshot(n_games=30, n_books=4, seed=0, start=None, sport_labels=None, markets=("h2h",)):
+    """A fully loaded OddsSnapshot over the supported sports; soccer leagues get 3-way markets."""
+    snapshot = OddsSnapshot(remaining="500")
+    for label in sport_labels or sports_map:
+        sport_key = sports_map[label]
+        outcomes  = 3 if sport_key.startswith("soccer") else 2
+        snapshot.games[label] = synthetic_games(n_games, n_books, outcomes, seed, start, sport_key, markets)
+    return snapshot
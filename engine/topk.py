@@ -0,0 +1,78 @@
+import heapq
+
+
+# ================================================================
+# RESULT COLLECTORS
+# ================================================================
+# Engines offer each priced candidate under its dedup key. `wants` is checked
+# first so result dicts are only built for candidates that will be kept.
+
+class Dedup:
+    """Best candidate per key, in first-seen key order — the engines' `seen` dict."""
+
+    def __init__(self):
+        self._seen = {}
+
+    def wants(self, key, value):
+        best = self._seen.get(key)
+        return best is None or value > best[0]
+
+    def add(self, key, value, op):
+        self._seen[key] = (value, op)
+
+    def results(self):
+        return [op for _, op in self._seen.values()]
+
+
+class TopK:
+    """The `k` best keys by value, each holding its best candidate, in bounded memory.
+
+    `results()` equals ranking the full Dedup output by value (stable, so ties
+    keep first-seen key order) and keeping the first `k`. Only the first-seen
+    position of every key is remembered beyond that.
+    """
+
+    def __init__(self, k):
+        self.k        = k
+        self._first   = {}   # key -> first-seen position
+        self._entries = {}   # key -> (value, version, op) for keys currently kept
+        self._heap    = []   # (value, -first seen, version, key); stale items skipped lazily
+        self._version = 0
+
+    def _worst(self):
+        heap = self._heap
+        while heap:
+            value, neg_seq, version, key = heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == version:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def wants(self, key, value):
+        seq   = self._first.setdefault(key, len(self._first))
+        entry = self._entries.get(key)
+        if entry is not None:
+            return value > entry[0]
+        if len(self._entries) < self.k:
+            return True
+        worst = self._worst()
+        return (value, -seq) > (worst[0], worst[1])
+
+    def add(self, key, value, op):
+        self._version += 1
+        self._entries[key] = (value, self._version, op)
+        heapq.heappush(self._heap, (value, -self._first[key], self._version, key))
+        if len(self._entries) > self.k:
+            del self._entries[self._worst()[3]]
+        if len(self._heap) > 4 * self.k + 64:
+            self._heap = [(v, -self._first[key], ver, key) for key, (v, ver, _) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def results(self):
+        ranked = sorted(self._entries.items(), key=lambda kv: (-kv[1][0], self._first[kv[0]]))
+        return [op for _, (_, _, op) in ranked]
+
+
+def collector(top_k=None):
+    return TopK(top_k) if top_k else Dedup()
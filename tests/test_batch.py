@@ -0,0 +1,13 @@
+from engine import normalize_config
+from engine.batch import legs_key
+from engine.scans import legs_fields
+
+
+def soccer(**fields):
+    return normalize_config("soccer", {"book1": "DraftKings", "legs": 4, "leagues": ["MLB"], **fields})
+
+
+def test_every_leg_book_is_part_of_the_legs_key():
+    assert legs_fields("soccer", soccer())[:5] == ('legs', 'book1', 'book2', 'book3', 'book4')
+    assert legs_key("soccer", soccer(book4=["FanDuel"])) != legs_key("soccer", soccer(book4=["BetMGM"]))
+    assert legs_key("soccer", soccer(wager1=10.0)) == legs_key("soccer", soccer(wager1=25.0))
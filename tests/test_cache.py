@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from engine import MemorySnapshotCache, SnapshotCache, SQLiteSnapshotCache
+
+GAMES = [{"id": "g1", "bookmakers": []}]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+    def tick(self, seconds=1.0):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "memory":
+            return MemorySnapshotCache(**kwargs)
+        return SQLiteSnapshotCache(str(tmp_path / "odds.sqlite"), **kwargs)
+    return make
+
+
+def test_base_class_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        SnapshotCache()
+
+    class HalfDone(SnapshotCache):
+        def entry(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        HalfDone()
+
+
+def test_entries_expire_after_ttl(make_cache, clock):
+    cache = make_cache(ttl=60)
+    cache.put("a:h2h", GAMES, "500")
+    clock.tick(59)
+    assert cache.get("a:h2h") == (GAMES, "500")
+    clock.tick(2)
+    assert cache.get("a:h2h") is None
+
+
+def test_least_recently_used_entry_is_evicted(make_cache, clock):
+    cache = make_cache(max_entries=2)
+    cache.put("a:h2h", GAMES, "500")
+    clock.tick()
+    cache.put("b:h2h", GAMES, "499")
+    clock.tick()
+    assert cache.get("a:h2h") is not None   # a is now more recent than b
+    clock.tick()
+    cache.put("c:h2h", GAMES, "498")
+    assert cache.get("b:h2h") is None
+    assert cache.get("a:h2h") is not None and cache.get("c:h2h") is not None
+
+
+def test_unknown_quota_never_replaces_a_known_one(make_cache, clock):
+    cache = make_cache()
+    assert cache.latest_quota() is None
+    cache.put("a:h2h", GAMES, "480")
+    clock.tick()
+    cache.put("b:h2h", GAMES, None)
+    clock.tick()
+    cache.patch("a:h2h", GAMES, None)
+    assert cache.latest_quota() == "480"
+
+
+def test_patch_keeps_fetched_at(make_cache, clock):
+    cache = make_cache()
+    assert not cache.patch("a:h2h", GAMES, "500")
+    cache.put("a:h2h", GAMES, "500")
+    fetched_at = cache.entry("a:h2h")[2]
+    clock.tick(30)
+    assert cache.patch("a:h2h", [], "499")
+    assert cache.entry("a:h2h") == ([], "499", fetched_at)
+
+
+def test_sqlite_quota_persists_across_instances(tmp_path, clock):
+    path = str(tmp_path / "odds.sqlite")
+    SQLiteSnapshotCache(path).put("a:h2h", GAMES, "321")
+    reopened = SQLiteSnapshotCache(path)
+    assert reopened.latest_quota() == "321"
+    assert reopened.get("a:h2h") == (GAMES, "321")
@@ -0,0 +1,37 @@
+import pytest
+
+from engine import normalize_config, sports_map
+from engine.configs import SOCCER_LEAGUES
+
+BASE = {
+    "promo":   {"book": "DraftKings"},
+    "bet_get": {"book": "DraftKings"},
+}
+
+
+@pytest.mark.parametrize("kind", ["promo", "bet_get"])
+@pytest.mark.parametrize("sports", [None, []])
+def test_empty_sports_mean_every_sport(kind, sports):
+    config = dict(BASE[kind])
+    if sports is not None:
+        config["sports"] = sports
+    assert normalize_config(kind, config)["sports"] == list(sports_map)
+
+
+@pytest.mark.parametrize("leagues", [None, []])
+def test_empty_leagues_mean_every_soccer_league(leagues):
+    config = {"book1": "DraftKings"}
+    if leagues is not None:
+        config["leagues"] = leagues
+    assert normalize_config("soccer", config)["leagues"] == SOCCER_LEAGUES
+    assert SOCCER_LEAGUES and all(sports_map[label].startswith("soccer") for label in SOCCER_LEAGUES)
+
+
+@pytest.mark.parametrize("kind", ["promo", "bet_get"])
+def test_chosen_sports_are_kept(kind):
+    assert normalize_config(kind, {**BASE[kind], "sports": ["MLB"]})["sports"] == ["MLB"]
+
+
+def test_unknown_sport_is_rejected():
+    with pytest.raises(ValueError, match="Unknown sport"):
+        normalize_config("bet_get", {"book": "DraftKings", "sports": ["Curling"]})
@@ -0,0 +1,73 @@
+import copy
+
+from engine import OddsHistory, sports_map, synthetic_games
+
+SPORT = sports_map["MLB"]
+T0    = 1_750_000_000
+
+
+def board(n_games=3):
+    return synthetic_games(n_games, 4, sport_key=SPORT)
+
+
+def repriced(games, game=0, book=0, outcome=0, by=10):
+    games = copy.deepcopy(games)
+    games[game]['bookmakers'][book]['markets'][0]['outcomes'][outcome]['price'] += by
+    return games
+
+
+def test_only_real_price_changes_are_recorded(tmp_path):
+    history = OddsHistory(str(tmp_path / "history.sqlite"))
+    games   = board()
+    rows    = sum(len(m['outcomes']) for g in games for bm in g['bookmakers'] for m in bm['markets'])
+
+    assert history.record(SPORT, "h2h", games, at=T0) == rows
+    assert history.record(SPORT, "h2h", copy.deepcopy(games), at=T0 + 60) == 0
+    moved = repriced(games, by=15)
+    assert history.record(SPORT, "h2h", moved, at=T0 + 120) == 1
+
+    gone = copy.deepcopy(moved)
+    left = gone[1]['bookmakers'].pop(0)
+    assert history.record(SPORT, "h2h", gone, at=T0 + 180) == len(left['markets'][0]['outcomes'])
+
+    changes = [row for row in history.line_history(games[0]['id']) if row['time'] > T0]
+    assert [(row['time'], row['price']) for row in changes] == \
+        [(T0 + 120, moved[0]['bookmakers'][0]['markets'][0]['outcomes'][0]['price'])]
+    assert [row['price'] for row in history.line_history(games[1]['id'], book=left['key'])
+            if row['time'] == T0 + 180] == [None] * len(left['markets'][0]['outcomes'])
+
+
+def test_partial_pull_leaves_other_games_on_the_board(tmp_path):
+    history = OddsHistory(str(tmp_path / "history.sqlite"))
+    games   = board()
+    history.record(SPORT, "h2h", games, at=T0)
+    assert history.record(SPORT, "h2h", repriced(games)[:1], at=T0 + 60, partial=True) == 1
+    rebuilt = history.snapshot_at(T0 + 60, ["MLB"]).games["MLB"]
+    assert {game['id'] for game in rebuilt} == {game['id'] for game in games}
+    assert all(row['price'] is not None for game in games[1:] for row in history.line_history(game['id']))
+
+
+def test_since_queries_come_back_in_time_order(tmp_path):
+    history = OddsHistory(str(tmp_path / "history.sqlite"))
+    games   = board()
+    times   = [T0 + 300 * n for n in range(5)]
+    for n, at in enumerate(times):
+        history.record(SPORT, "h2h", repriced(games, by=5 * n), at=at)
+
+    assert history.pull_times([SPORT]) == times
+    assert history.pull_times([SPORT], since=times[2]) == times[2:]
+    assert history.pull_times([SPORT], since=times[1], until=times[3]) == times[1:4]
+
+    changes = history.line_history(games[0]['id'], book=games[0]['bookmakers'][0]['key'])
+    stamps  = [row['time'] for row in changes]
+    assert stamps == sorted(stamps)
+    assert [row['time'] for row in changes if row['outcome'] == changes[0]['outcome']] == times
+
+    commence = [game['commence'] for game in history.games(SPORT)]
+    assert commence == sorted(commence) and len(commence) == len(games)
+    assert [game['commence'] for game in history.games(SPORT, since=commence[1])] == commence[1:]
+
+    for n, at in enumerate(times):
+        price = history.snapshot_at(at + 1, ["MLB"]).games["MLB"]
+        first = [g for g in price if g['id'] == games[0]['id']][0]['bookmakers'][0]['markets'][0]['outcomes'][0]
+        assert first['price'] == games[0]['bookmakers'][0]['markets'][0]['outcomes'][0]['price'] + 5 * n
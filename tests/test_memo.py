@@ -0,0 +1,44 @@
+import copy
+import time
+
+from engine import OddsSnapshot, ResultCache, load_snapshot, normalize_config, run_scan, sports_map, synthetic_snapshot
+
+SPORTS = ["WNBA", "MLB"]
+CONFIG = normalize_config("promo", {"book": "DraftKings", "strat": "Bonus Bet", "wager": 25.0, "sports": SPORTS})
+
+
+def test_streaming_snapshot_is_scanned_before_last_sport_lands():
+    boards = synthetic_snapshot(20, 4, sport_labels=SPORTS).games
+    cache  = ResultCache()
+    labels = {key: label for label, key in sports_map.items()}
+
+    def fetch(sport_key, market='h2h'):
+        label = labels[sport_key]
+        if label == "MLB":   # lands only once WNBA's labels have been scanned and stored
+            deadline = time.time() + 5.0
+            while not cache._units:
+                if time.time() > deadline:
+                    return None, "Timed out"
+                time.sleep(0.005)
+        return copy.deepcopy(boards[label]), "500"
+
+    snapshot = load_snapshot(SPORTS, fetch, stream=True)
+    opps     = cache.run_scan("promo", CONFIG, snapshot)
+    assert not snapshot.errors
+    assert opps == run_scan("promo", CONFIG, OddsSnapshot(games=boards), workers=1)
+
+    again = cache.run_scan("promo", CONFIG, load_snapshot(SPORTS, fetch, stream=True))
+    assert again == opps
+
+
+def test_label_shared_across_sports_matches_a_full_scan():
+    boards = copy.deepcopy(synthetic_snapshot(20, 4, sport_labels=SPORTS).games)
+    shared = copy.deepcopy(boards["WNBA"][0])
+    shared['id'] += "-relisted"
+    for bm in shared['bookmakers']:
+        for outcome in bm['markets'][0]['outcomes']:
+            outcome['price'] += 15
+    boards["MLB"].append(shared)
+
+    expected = run_scan("promo", CONFIG, OddsSnapshot(games=boards), workers=1)
+    assert ResultCache().run_scan("promo", CONFIG, OddsSnapshot(games=boards)) == expected
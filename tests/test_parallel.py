@@ -0,0 +1,56 @@
+import copy
+import time
+
+from engine import load_snapshot, normalize_config, run_scan, sports_map, synthetic_snapshot
+from engine import parallel
+
+SPORTS = ["WNBA", "MLB"]
+CONFIG = normalize_config("promo", {"book": "DraftKings", "strat": "Bonus Bet", "wager": 25.0, "sports": SPORTS})
+
+
+def gated_fetch(boards, snapshots, timeout=5.0):
+    """A fetch whose MLB payload only lands once the engine has flattened WNBA.
+
+    If the scan waited for the whole stream first, the MLB fetch times out and
+    the sport comes back as an error instead.
+    """
+    labels = {key: label for label, key in sports_map.items()}
+
+    def fetch(sport_key, market='h2h'):
+        label = labels[sport_key]
+        if label == "MLB":
+            deadline = time.time() + timeout
+            while not (snapshots and ("WNBA", market) in snapshots[0]._columns):
+                if time.time() > deadline:
+                    return None, "Timed out"
+                time.sleep(0.005)
+        return copy.deepcopy(boards[label]), "500"
+    return fetch
+
+
+def test_streaming_snapshot_scans_before_last_sport_lands():
+    boards    = synthetic_snapshot(20, 4, sport_labels=SPORTS).games
+    snapshots = []
+    snapshots.append(load_snapshot(SPORTS, gated_fetch(boards, snapshots), stream=True))
+
+    opps = run_scan("promo", CONFIG, snapshots[0])
+    assert not snapshots[0].errors
+    assert {op['sport'] for op in opps} == set(SPORTS)
+    assert opps == run_scan("promo", CONFIG, synthetic_snapshot(20, 4, sport_labels=SPORTS), workers=1)
+
+
+def test_sharded_scan_matches_serial():
+    snapshot = synthetic_snapshot(60, 6)
+    config   = normalize_config("promo", {"book": "DraftKings", "strat": "Bonus Bet", "wager": 25.0})
+    serial   = run_scan("promo", config, snapshot, workers=1)
+    sharded  = run_scan("promo", config, snapshot, workers=3, executor="thread", min_games=1)
+    assert [op['exact_profit'] for op in sharded] == [op['exact_profit'] for op in serial]
+
+
+def test_one_worker_never_starts_a_pool():
+    snapshot = synthetic_snapshot(60, 6)
+    config   = normalize_config("promo", {"book": "DraftKings", "strat": "Bonus Bet", "wager": 25.0})
+    before   = dict(parallel._pools)
+    run_scan("promo", config, snapshot, min_games=1)
+    run_scan("promo", config, snapshot, workers=1, executor="thread", min_games=1)
+    assert parallel._pools == before
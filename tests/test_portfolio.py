@@ -0,0 +1,93 @@
+import itertools
+import random
+
+import pytest
+
+from engine import OddsSnapshot, opp_exposure, optimize_portfolio
+from engine import portfolio
+from engine.portfolio import solve_assignment
+
+BOOKS = ["DraftKings", "FanDuel", "BetMGM", "theScore / ESPN"]
+
+
+def soccer_row(game_id, net_profit, books, wager=10.0):
+    row = {"game_id": game_id, "game": game_id, "net_profit": net_profit}
+    for n, book in enumerate(books, 1):
+        row[f"o{n}_book"], row[f"o{n}_wager"] = book, wager
+    return row
+
+
+def optimize(monkeypatch, rows, **kwargs):
+    """optimize_portfolio over one soccer promo per list of ready-made rows."""
+    promos = [{"name": f"promo {i}", "kind": "soccer", "config": {}} for i in range(len(rows))]
+    ranked = {promo["name"]: opps for promo, opps in zip(promos, rows)}
+    monkeypatch.setattr(portfolio, "run_batch", lambda promos, snapshot, today, top_k: ranked)
+    return optimize_portfolio(promos, OddsSnapshot(games={}), **kwargs)
+
+
+def test_every_soccer_leg_counts_toward_exposure():
+    row = soccer_row("g1", 5.0, BOOKS)
+    assert opp_exposure("soccer", row) == {book: 10.0 for book in BOOKS}
+
+
+def test_four_leg_opp_is_held_to_book_cap(monkeypatch):
+    rows = [[soccer_row("g1", 5.0, BOOKS)]]
+    assert optimize(monkeypatch, rows, exposure_limits={"theScore / ESPN": 50})["unassigned"] == []
+    result = optimize(monkeypatch, rows, exposure_limits={"theScore / ESPN": 5})
+    assert result["unassigned"] == ["promo 0"] and result["total_profit"] == 0.0
+
+
+def test_unprofitable_promo_is_left_unassigned(monkeypatch):
+    rows   = [[soccer_row("g1", 4.0, BOOKS[:3])], [soccer_row("g2", -1.0, BOOKS[:3])]]
+    result = optimize(monkeypatch, rows)
+    assert [a["name"] for a in result["assignments"]] == ["promo 0"]
+    assert result["unassigned"] == ["promo 1"]
+
+
+# ================================================================
+# SOLVER AGAINST BRUTE FORCE
+# ================================================================
+def random_instance(rng):
+    n_resources = rng.randint(0, 3)
+    capacity    = [rng.choice([5.0, 10.0, 20.0]) for _ in range(n_resources)]
+    candidates  = []
+    for _ in range(rng.randint(1, 5)):
+        low = -10 if rng.random() < 0.2 else -2   # some promos have nothing profitable
+        candidates.append([
+            (round(rng.uniform(low, 10 if low == -2 else 0), 2),
+             tuple((r, float(rng.choice([2, 5, 8, 12]))) for r in range(n_resources) if rng.random() < 0.6),
+             rng.randrange(3))
+            for _ in range(rng.randint(0, 4))
+        ])
+    return candidates, capacity, rng.choice([None, 1, 2])
+
+
+def brute_force(candidates, capacity, max_per_game):
+    best = 0.0
+    for picks in itertools.product(*[[None] + list(range(len(promo))) for promo in candidates]):
+        chosen = [promo[c] for promo, c in zip(candidates, picks) if c is not None]
+        if feasible(chosen, capacity, max_per_game):
+            best = max(best, sum(value for value, _, _ in chosen))
+    return best
+
+
+def feasible(chosen, capacity, max_per_game):
+    used, games = [0.0] * len(capacity), {}
+    for _, use, game in chosen:
+        for r, amount in use:
+            used[r] += amount
+        games[game] = games.get(game, 0) + 1
+    return (all(u <= cap + 1e-9 for u, cap in zip(used, capacity))
+            and (max_per_game is None or all(n <= max_per_game for n in games.values())))
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_solver_matches_brute_force(seed):
+    candidates, capacity, max_per_game = random_instance(random.Random(seed))
+    total, picks, optimal = solve_assignment(candidates, capacity, max_per_game)
+    chosen = [promo[c] for promo, c in zip(candidates, picks) if c is not None]
+    assert optimal
+    assert feasible(chosen, capacity, max_per_game)
+    assert all(value > 0 for value, _, _ in chosen)
+    assert total == pytest.approx(sum(value for value, _, _ in chosen))
+    assert total == pytest.approx(brute_force(candidates, capacity, max_per_game))
@@ -0,0 +1,47 @@
+import pytest
+
+from engine import SCANS, normalize_config, rank_by_risk, run_scan, simulate_risk, synthetic_snapshot
+
+SNAPSHOT = synthetic_snapshot(30, 6, sport_labels=["MLB", "FIFA World Cup"])
+
+CONFIGS = {
+    "promo 2-way":   ("promo", {"book": "DraftKings", "strat": "Bonus Bet", "wager": 50.0, "sports": ["MLB"]}),
+    "promo 3-way":   ("promo", {"book": "DraftKings", "strat": "No-Sweat Bet", "wager": 50.0,
+                                "sports": ["FIFA World Cup"]}),
+    "soccer capped": ("soccer", {"book1": "DraftKings", "strat1": "Profit Boost (%)", "boost1": 50, "wager1": 50.0,
+                                 "strat2": "Bonus Bet", "cap2_val": 10.0, "leagues": ["FIFA World Cup"],
+                                 "lookahead_end_date": "2099-01-01"}),
+}
+
+
+def scan(name):
+    kind, fields = CONFIGS[name]
+    config       = normalize_config(kind, fields)
+    return kind, config, run_scan(kind, config, SNAPSHOT, top_k=20)
+
+
+@pytest.mark.parametrize("name", CONFIGS)
+def test_zero_movement_reproduces_locked_profit(name):
+    kind, config, opps = scan(name)
+    rank_key = SCANS[kind].rank_key
+    still    = simulate_risk(kind, config, opps, n_paths=50, price_vol=0.0, fill_fail=0.0)
+    assert opps
+    for op in still:
+        assert op['risk_p05'] == pytest.approx(op[rank_key])
+        assert op['risk_expected'] == pytest.approx(op[rank_key])
+        assert op['risk_loss_chance'] == 0.0
+        assert op['risk_sensitivity'] <= 0.0
+    assert rank_by_risk(still, by="worst") == still
+
+
+@pytest.mark.parametrize("name", CONFIGS)
+def test_fixed_seed_reproduces_ranking(name):
+    kind, config, opps = scan(name)
+    first  = simulate_risk(kind, config, opps, seed=7)
+    again  = simulate_risk(kind, config, opps, seed=7)
+    other  = simulate_risk(kind, config, opps, seed=8)
+    assert first == again
+    assert [op['risk_p05'] for op in first] != [op['risk_p05'] for op in other]
+    ranked = rank_by_risk(first, by="worst")
+    assert ranked == rank_by_risk(again, by="worst")
+    assert [op['risk_p05'] for op in ranked] == sorted((op['risk_p05'] for op in first), reverse=True)
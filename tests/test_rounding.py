@@ -0,0 +1,81 @@
+import itertools
+
+import pytest
+
+from engine import normalize_config, round_stakes, run_scan, synthetic_snapshot
+from engine.constants import CONV_NOSWEAT
+
+SNAPSHOT = synthetic_snapshot(20, 6, sport_labels=["FIFA World Cup"])
+WINDOW   = 12   # whole dollars either side of each exact stake the brute force walks
+
+
+def decimal_profit(price):
+    return price / 100 if price > 0 else 100 / -price
+
+
+def leg_profits(legs, stakes, refund_no_sweat):
+    """Profit on each outcome, written out leg by leg: promo dollars up to the cap, cash beyond it."""
+    spent, refunds, wins = 0.0, [], []
+    for (price, strat, boost, cap), stake in zip(legs, stakes):
+        m     = decimal_profit(price)
+        promo = min(stake, cap) if strat != "Straight Cash" else 0.0
+        cash  = stake - promo
+        assert promo <= cap
+        if strat == "Profit Boost (%)":
+            win, cost, refund = promo * (1 + m * (1 + boost / 100)), promo, 0.0
+        elif strat == "Bonus Bet":
+            win, cost, refund = promo * m, 0.0, 0.0
+        elif strat == "No-Sweat Bet":
+            win, cost, refund = promo * (1 + m), promo, promo * CONV_NOSWEAT if refund_no_sweat else 0.0
+        else:
+            win, cost, refund = 0.0, 0.0, 0.0
+        wins.append(win + cash * (1 + m))
+        refunds.append(refund)
+        spent += cost + cash
+    return [wins[k] + sum(refunds) - refunds[k] - spent for k in range(len(legs))]
+
+
+def brute_force(legs, exact, fixed, refund_no_sweat):
+    """Best worst-case profit over whole-dollar stakes near the exact ones."""
+    ranges = [[exact[j]] if fixed[j] else
+              range(max(0, int(exact[j]) - WINDOW), int(exact[j]) + WINDOW + 1) for j in range(len(legs))]
+    return max(min(leg_profits(legs, stakes, refund_no_sweat)) for stakes in itertools.product(*ranges))
+
+
+SOCCER_CONFIGS = [
+    {"strat1": "Profit Boost (%)", "boost1": 50, "strat2": "Bonus Bet", "cap2_val": 10.0,
+     "strat3": "No-Sweat Bet", "cap3_val": 20.0},
+    {"strat1": "Bonus Bet", "strat2": "Profit Boost (%)", "boost2": 25, "cap2_val": 15.0},
+    {"strat1": "No-Sweat Bet", "strat3": "Bonus Bet", "cap3_val": 500.0},
+]
+
+
+@pytest.mark.parametrize("fields", SOCCER_CONFIGS)
+def test_soccer_rounding_matches_brute_force(fields):
+    config = normalize_config("soccer", dict(fields, book1="DraftKings", wager1=50.0, leagues=["FIFA World Cup"],
+                                             lookahead_end_date="2099-01-01"))
+    opps   = round_stakes("soccer", config, run_scan("soccer", config, SNAPSHOT, top_k=8))
+    assert opps
+    for op in opps:
+        legs    = [(op[f'o{n}_price'], config[f'strat{n}'], config[f'boost{n}'],
+                    config[f'cap{n}_val'] or float('inf')) for n in (1, 2, 3)]
+        exact   = [op[f'o{n}_wager'] for n in (1, 2, 3)]
+        rounded = [op['o1_wager'], op['o2_rounded'], op['o3_rounded']]
+        assert all(stake == int(stake) for stake in rounded[1:])
+        assert min(leg_profits(legs, rounded, False)) == pytest.approx(op['rounded_profit'])
+        assert op['rounded_profit'] == pytest.approx(brute_force(legs, exact, [True, False, False], False))
+
+
+@pytest.mark.parametrize("strat", ["Profit Boost (%)", "Bonus Bet", "No-Sweat Bet"])
+def test_three_way_promo_rounding_matches_brute_force(strat):
+    config = normalize_config("promo", {"book": "DraftKings", "strat": strat, "wager": 50.0, "boost_val": 50,
+                                        "sports": ["FIFA World Cup"]})
+    opps   = round_stakes("promo", config, run_scan("promo", config, SNAPSHOT, top_k=8))
+    assert opps
+    for op in opps:
+        legs    = [(op['s_price'], strat, op['used_boost'], float('inf')),
+                   (op['h1_price'], "Straight Cash", 0, 0.0), (op['h2_price'], "Straight Cash", 0, 0.0)]
+        exact   = [op['wager'], op['exact_hedge1'], op['exact_hedge2']]
+        rounded = [op['wager'], op['rounded_hedge1'], op['rounded_hedge2']]
+        assert min(leg_profits(legs, rounded, True)) == pytest.approx(op['rounded_profit'])
+        assert op['rounded_profit'] == pytest.approx(brute_force(legs, exact, [True, False, False], True))
@@ -0,0 +1,76 @@
+import copy
+
+import pytest
+
+from engine import FetchScheduler, MemorySnapshotCache, sports_map, synthetic_games
+
+SPORT = sports_map["MLB"]
+KEY   = f"{SPORT}:h2h"
+
+
+class FakeOdds:
+    """Sport and event fetches over one synthetic board, counting the calls."""
+
+    def __init__(self, n_games=10):
+        self.board  = synthetic_games(n_games, 4, sport_key=SPORT)
+        self.sport  = 0
+        self.events = []
+
+    def fetch(self, sport_key, market='h2h'):
+        self.sport += 1
+        return copy.deepcopy(self.board), "9000"
+
+    def fetch_event(self, sport_key, event_id, market='h2h'):
+        self.events.append(event_id)
+        game = next((g for g in self.board if g['id'] == event_id), None)
+        if game is None:
+            return None, "HTTP 404"
+        game = copy.deepcopy(game)
+        game['bookmakers'][0]['markets'][0]['outcomes'][0]['price'] += 25
+        return game, "8990"
+
+
+def scheduler(odds, **kwargs):
+    sch = FetchScheduler(odds.fetch, MemorySnapshotCache(), fetch_event=odds.fetch_event, **kwargs)
+    sch.fetch(SPORT)
+    return sch
+
+
+@pytest.mark.parametrize("n_events", [1, 2, 3])
+def test_a_few_events_go_through_the_event_endpoint(n_events):
+    odds       = FakeOdds()
+    sch        = scheduler(odds)
+    fetched_at = sch.cache.entry(KEY)[2]
+    ids        = [game['id'] for game in odds.board[:n_events]]
+
+    games, remaining = sch.refresh_events(SPORT, ids)
+    assert sorted(odds.events) == sorted(ids) and odds.sport == 1
+    assert remaining == "8990"
+    assert [g['id'] for g in games] == [g['id'] for g in odds.board]
+    assert all(games[i] != odds.board[i] for i in range(n_events))
+    assert games[n_events:] == odds.board[n_events:]
+    entry = sch.cache.entry(KEY)
+    assert entry[0] == games and entry[2] == fetched_at   # patched, not made to look freshly fetched
+
+
+def test_more_events_than_max_events_refetch_the_sport():
+    odds = FakeOdds()
+    sch  = scheduler(odds, max_events=3)
+    sch.refresh_events(SPORT, [game['id'] for game in odds.board[:4]])
+    assert odds.events == [] and odds.sport == 2
+
+
+def test_events_cheaper_than_the_sport_skip_max_events():
+    odds = FakeOdds()
+    sch  = scheduler(odds, max_events=1, cost=lambda market: 10, event_cost=lambda market: 1)
+    sch.refresh_events(SPORT, [game['id'] for game in odds.board[:5]])
+    assert len(odds.events) == 5 and odds.sport == 1
+
+
+def test_events_gone_from_the_api_leave_the_board():
+    odds  = FakeOdds()
+    sch   = scheduler(odds)
+    gone  = odds.board[0]['id']
+    odds.board = odds.board[1:]
+    games, _ = sch.refresh_events(SPORT, [gone])
+    assert gone not in {g['id'] for g in games} and len(sch.cache.entry(KEY)[0]) == len(odds.board)
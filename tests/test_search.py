@@ -0,0 +1,67 @@
+import copy
+
+import pytest
+
+from engine import SCANS, OddsSnapshot, normalize_config, run_scan, synthetic_snapshot
+from engine.configs import PROMO_TYPES
+
+SNAPSHOT = synthetic_snapshot(40, 10, sport_labels=["MLB", "FIFA World Cup"])
+
+
+def sharp_snapshot(book="book6"):
+    """SNAPSHOT with `book` beating every other price on every outcome.
+
+    Two hedge legs can never share it, so one of them has to fall back to
+    its outcome's second-best book.
+    """
+    games = copy.deepcopy(SNAPSHOT.games)
+    for game in games["FIFA World Cup"]:
+        listed = {bm["key"]: bm for bm in game["bookmakers"]}
+        if book not in listed:
+            continue
+        for n, outcome in enumerate(listed[book]["markets"][0]["outcomes"]):
+            best = max(bm["markets"][0]["outcomes"][n]["price"] for bm in game["bookmakers"])
+            outcome["price"] = best + 20 if best >= 100 else max(best + 20, 110)
+    return OddsSnapshot(games=games)
+
+
+def scan_both(kind, config, snapshot=SNAPSHOT):
+    """Rankings with and without dominance pruning."""
+    return [run_scan(kind, normalize_config(kind, dict(config, prune_dominated=prune)), snapshot, workers=1)
+            for prune in (True, False)]
+
+
+def best_per_game(opps, rank_key):
+    best = {}
+    for op in opps:
+        best[op['game_id']] = max(best.get(op['game_id'], float('-inf')), op[rank_key])
+    return best
+
+
+@pytest.mark.parametrize("strat", PROMO_TYPES)
+def test_pruning_keeps_two_way_promo_ranking(strat):
+    config = {"book": "DraftKings", "strat": strat, "wager": 50.0, "boost_val": 50, "sports": ["MLB"]}
+    pruned, full = scan_both("promo", config)
+    assert pruned and pruned == full
+
+
+@pytest.mark.parametrize("sharp", [False, True])
+@pytest.mark.parametrize("strat", PROMO_TYPES)
+def test_pruning_keeps_best_three_way_promo(strat, sharp):
+    config = {"book": "DraftKings", "strat": strat, "wager": 50.0, "boost_val": 50, "sports": ["FIFA World Cup"]}
+    pruned, full = scan_both("promo", config, sharp_snapshot() if sharp else SNAPSHOT)
+    assert 0 < len(pruned) < len(full)
+    assert pruned[0] == full[0]
+    assert best_per_game(pruned, "exact_profit") == best_per_game(full, "exact_profit")
+
+
+@pytest.mark.parametrize("sharp", [False, True])
+@pytest.mark.parametrize("strat", PROMO_TYPES)
+def test_pruning_keeps_best_soccer_combination(strat, sharp):
+    config = {"legs": 3, "book1": "DraftKings", "strat1": strat, "boost1": 50, "wager1": 50.0,
+              "leagues": ["FIFA World Cup"], "lookahead_end_date": "2099-01-01"}
+    pruned, full = scan_both("soccer", config, sharp_snapshot() if sharp else SNAPSHOT)
+    rank_key     = SCANS["soccer"].rank_key
+    assert 0 < len(pruned) < len(full)
+    assert pruned[0][rank_key] == full[0][rank_key]
+    assert best_per_game(pruned, rank_key) == best_per_game(full, rank_key)
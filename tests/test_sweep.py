@@ -0,0 +1,44 @@
+from itertools import product
+
+import numpy as np
+import pytest
+
+from engine import SCANS, normalize_config, run_scan, sweep, synthetic_snapshot
+
+SNAPSHOT = synthetic_snapshot(15, 6, sport_labels=["MLB", "FIFA World Cup"])
+
+CASES = [
+    ("promo", {"book": "DraftKings", "strat": "Profit Boost (%)", "sports": ["MLB", "FIFA World Cup"]},
+     {"boost_val": [0, 25, 50], "wager": [10.0, 50.0]}),
+    ("promo", {"book": "DraftKings", "strat": "Bonus Bet", "sports": ["MLB", "FIFA World Cup"]},
+     {"wager": [10.0, 25.0, 100.0]}),
+    ("promo", {"book": "DraftKings", "strat": "No-Sweat Bet", "sports": ["FIFA World Cup"]},
+     {"wager": [20.0, 75.0]}),
+    ("soccer", {"book1": "DraftKings", "strat1": "Profit Boost (%)", "strat2": "Bonus Bet",
+                "leagues": ["FIFA World Cup"], "lookahead_end_date": "2099-01-01"},
+     {"wager1": [25.0, 50.0], "boost1": [0, 50], "cap2_val": [0.0, 10.0]}),
+]
+
+
+@pytest.mark.parametrize("kind, fields, grid", CASES)
+def test_sweep_matches_a_scan_at_every_grid_point(kind, fields, grid):
+    config   = normalize_config(kind, fields)
+    result   = sweep(kind, config, SNAPSHOT, grid)
+    rank_key = SCANS[kind].rank_key
+    assert result["games"]
+
+    for index in product(*(range(len(values)) for values in result["values"])):
+        point = {field: values[i] for field, values, i in zip(result["fields"], result["values"], index)}
+        opps  = run_scan(kind, normalize_config(kind, dict(config, **point)), SNAPSHOT)
+        best  = {}
+        for op in opps:
+            best[op['game_id']] = max(best.get(op['game_id'], -np.inf), op[rank_key])
+
+        swept = {game['game_id']: game['profit'][index] for game in result['games']}
+        assert set(best) <= set(swept)
+        for game_id, profit in swept.items():
+            if game_id in best:
+                assert profit == pytest.approx(best[game_id])
+            else:
+                assert profit <= -10.0   # below the floor the scans report
+        assert result['best'][index] == pytest.approx(max(swept.values()))